@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+"""
+Classification Benchmark - Webpage Analyzer batch scheduling against a stub model
+
+Classifies synthetic pages with a local PydanticAI FunctionModel that sleeps for a
+fixed latency and answers a fraction of requests with HTTP 429, once with the
+original one-`run_sync`-per-page loop and once with the batch scheduler
+(concurrency limit, token bucket, 429 backoff, packing of short pages). Reports
+wall time, requests sent and pages/minute, and checks every page got a category.
+
+Usage:
+    python3 benchmarks/bench_classify.py -n 200 --latency 0.5
+    python3 benchmarks/bench_classify.py -n 200 --concurrency 16 --rate 20 --pack 5 --rate-limited 0.1
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import sys
+import time
+
+# Keep the benchmark output readable
+os.environ.setdefault('PYDANTIC_AI_NO_BANNER', '1')
+
+from pydantic_ai import Agent
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import FunctionModel
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts', 'webpage_analyzer'))
+
+from llm_scheduler import LlmScheduler
+from webpage_analyzer import CategoryAnalysis, WebpageAnalyzer
+
+URL_LINE = re.compile(r'^URL: (\S+)$', re.MULTILINE)
+WORDS = 'login admin password dashboard user account settings report api docs upload file server'.split()
+
+
+def make_pages(count, short_ratio):
+    pages = []
+    for i in range(count):
+        length = random.randint(200, 1400) if random.random() < short_ratio else random.randint(2000, 5000)
+        content = ' '.join(random.choice(WORDS) for _ in range(length // 6))[:length]
+        pages.append({'title': f'Page {i}', 'url': f'https://app{i}.bench.test/', 'content': content})
+    return pages
+
+
+def stub_model(latency, rate_limited, counter):
+    async def respond(messages, info):
+        counter['requests'] += 1
+        await asyncio.sleep(latency)
+        if random.random() < rate_limited:
+            counter['429'] += 1
+            raise ModelHTTPError(429, 'stub', body='rate limited')
+
+        prompt = messages[-1].parts[-1].content
+        tool = info.output_tools[0]
+        answers = [
+            {'url': url, 'matched_category': 'login_portal', 'confidence_score': 0.9, 'summary': 'Stub answer'}
+            for url in URL_LINE.findall(prompt)
+        ]
+        if 'pages' in tool.parameters_json_schema.get('properties', {}):
+            args = {'pages': answers}
+        else:
+            args = {key: value for key, value in answers[0].items() if key != 'url'}
+        return ModelResponse(parts=[ToolCallPart(tool.name, args)])
+
+    return respond
+
+
+def sequential(analyzer, pages):
+    """The original loop: one blocking run_sync per page"""
+    return [(page, analyzer.analyze_content(page)) for page in pages]
+
+
+async def batched(analyzer, pages, scheduler, pack_pages, pack_chars):
+    tasks = []
+    pack = []
+    for page in pages:
+        if pack_pages > 1 and len(page['content']) < pack_chars:
+            pack.append(page)
+            if len(pack) < pack_pages:
+                continue
+            group, pack = pack, []
+        else:
+            group = [page]
+        tasks.append(analyzer.classify_pages(scheduler, group))
+    if pack:
+        tasks.append(analyzer.classify_pages(scheduler, pack))
+    return [result for results in await asyncio.gather(*tasks) for result in results]
+
+
+def report(label, elapsed, pages, results, counter):
+    failed = sum(1 for _, analysis in results if not analysis.matched_category)
+    print(
+        f"{label:<12} {elapsed:8.2f}s  {counter['requests']:5d} requests  {counter['429']:4d} x 429  "
+        f"{len(pages) / elapsed * 60:8.1f} pages/minute  {failed} failed"
+    )
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch classification against a local stub model")
+    parser.add_argument('-n', '--pages', type=int, default=100, help='Number of synthetic pages')
+    parser.add_argument('--short-ratio', type=float, default=0.6, help='Fraction of pages short enough to pack')
+    parser.add_argument('--latency', type=float, default=0.3, help='Stub model latency per request in seconds')
+    parser.add_argument('--rate-limited', type=float, default=0.05, help='Fraction of requests answered with 429')
+    parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight in batch mode')
+    parser.add_argument('--rate', type=float, default=20.0, help='Requests per second in batch mode')
+    parser.add_argument('--pack', type=int, default=4, help='Short pages packed per request (1 disables packing)')
+    parser.add_argument('--pack-chars', type=int, default=1500, help='Pages shorter than this are packed')
+    parser.add_argument('-c', '--config', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts', 'webpage_analyzer', 'config.yaml.sample'), help='Webpage Analyzer config file')
+    parser.add_argument('--skip-sequential', action='store_true', help='Only run the batch scheduler')
+    args = parser.parse_args()
+
+    random.seed(1)
+    pages = make_pages(args.pages, args.short_ratio)
+    analyzer = WebpageAnalyzer(args.config, use_cache=False)
+    print(f"{len(pages)} pages, {sum(len(p['content']) < args.pack_chars for p in pages)} short, "
+          f"stub latency {args.latency}s, {args.rate_limited:.0%} rate limited\n")
+
+    if not args.skip_sequential:
+        counter = {'requests': 0, '429': 0}
+        analyzer.agent = Agent(FunctionModel(stub_model(args.latency, args.rate_limited, counter)), output_type=CategoryAnalysis)
+        start = time.perf_counter()
+        results = sequential(analyzer, pages)
+        report('sequential', time.perf_counter() - start, pages, results, counter)
+
+    counter = {'requests': 0, '429': 0}
+    analyzer.agent = Agent(FunctionModel(stub_model(args.latency, args.rate_limited, counter)), output_type=CategoryAnalysis)
+
+    async def run():
+        scheduler = LlmScheduler(concurrency=args.concurrency, rate=args.rate, base_delay=0.2)
+        return await batched(analyzer, pages, scheduler, args.pack, args.pack_chars), scheduler
+
+    start = time.perf_counter()
+    results, scheduler = asyncio.run(run())
+    failed_batch = report('batched', time.perf_counter() - start, pages, results, counter)
+    print(f"\n{scheduler.summary()}")
+
+    if [page['url'] for page, _ in sorted(results, key=lambda r: int(r[0]['title'].split()[1]))] != [p['url'] for p in pages]:
+        print("MISMATCH: batch results do not cover every page exactly once")
+        sys.exit(1)
+    if failed_batch:
+        print(f"{failed_batch} pages failed in batch mode")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+"""
+DNS Benchmark - cname_domain_finder async resolver throughput
+
+Starts a local stub DNS server on UDP, in its own process so it does not compete
+with the resolver for the event loop, that answers every `*.bench.test` CNAME query
+with one of 50 shared `targetN.cdn.bench.test` names (which have no CNAME of their own,
+so chains are two hops and share suffixes); every `nxdomain_every`-th name returns
+NXDOMAIN, optionally after a simulated delay. The benchmark resolves a generated domain list through cname_domain_finder's async resolver pool,
+reporting queries per minute.
+
+Usage:
+    python3 benchmarks/bench_dns.py -n 50000 -c 2000
+    python3 benchmarks/bench_dns.py -n 20000 -c 500 --delay 0.02 --rate 5000
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import sys
+import time
+
+import dns.message
+import dns.rcode
+import dns.name
+import dns.rrset
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from cname_domain_finder import ResolverPool, resolve_all_async
+
+CDN_TARGET = dns.name.from_text('cdn.bench.test.')
+
+
+class StubDNSProtocol(asyncio.DatagramProtocol):
+    def __init__(self, counter, delay=0.0, nxdomain_every=10):
+        self.counter = counter
+        self.delay = delay
+        self.nxdomain_every = nxdomain_every
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        # Absorb bursts of thousands of in-flight queries without dropping datagrams
+        transport.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+
+    def datagram_received(self, data, addr):
+        with self.counter.get_lock():
+            self.counter.value += 1
+        if self.delay:
+            asyncio.get_running_loop().call_later(self.delay, self.respond, data, addr)
+        else:
+            self.respond(data, addr)
+
+    def respond(self, data, addr):
+        query = dns.message.from_wire(data)
+        response = dns.message.make_response(query)
+        qname = query.question[0].name
+        if qname.is_subdomain(CDN_TARGET):
+            # End of the chain: the CDN name itself has no CNAME
+            response.authority.append(dns.rrset.from_text('bench.test.', 300, 'IN', 'SOA', 'ns.bench.test. admin.bench.test. 1 3600 600 86400 60'))
+        elif self.nxdomain_every and hash(qname.to_text()) % self.nxdomain_every == 0:
+            response.set_rcode(dns.rcode.NXDOMAIN)
+        else:
+            response.answer.append(dns.rrset.from_text(qname, 300, 'IN', 'CNAME', f"target{hash(qname.to_text()) % 50}.cdn.bench.test."))
+        self.transport.sendto(response.to_wire(), addr)
+
+
+def serve(port, counter, ready, delay, nxdomain_every):
+    async def run_server():
+        loop = asyncio.get_running_loop()
+        await loop.create_datagram_endpoint(
+            lambda: StubDNSProtocol(counter, delay, nxdomain_every),
+            local_addr=('127.0.0.1', port),
+        )
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(run_server())
+
+
+async def run(args):
+    domains = [f"host{i}.bench.test" for i in range(args.num)]
+    pool = ResolverPool([f"127.0.0.1:{args.port}"], rate=args.rate, timeout=args.timeout, retries=args.retries)
+
+    start = time.perf_counter()
+    resolved = 0
+    async for result in resolve_all_async(domains, pool, args.concurrency):
+        resolved += bool(result['cnames'])
+    return resolved, time.perf_counter() - start
+
+
+def report(args, resolved, elapsed, served):
+    print(f"Domains:     {args.num} ({resolved} with CNAME)")
+    print(f"Concurrency: {args.concurrency}")
+    print(f"Stub served: {served} queries")
+    print(f"Elapsed:     {elapsed:.2f}s")
+    print(f"Throughput:  {args.num / elapsed * 60:,.0f} queries/minute")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark async CNAME resolution against a local stub DNS server")
+    parser.add_argument('-n', '--num', type=int, default=20000, help='Number of domains to resolve')
+    parser.add_argument('-c', '--concurrency', type=int, default=1000, help='Maximum in-flight queries')
+    parser.add_argument('-p', '--port', type=int, default=5353, help='UDP port for the stub server')
+    parser.add_argument('--delay', type=float, default=0.0, help='Simulated upstream latency per query in seconds')
+    parser.add_argument('--nxdomain-every', type=int, default=10, help='Answer roughly one in N names with NXDOMAIN')
+    parser.add_argument('--rate', type=float, default=0, help='Per-resolver queries per second (0 = unlimited)')
+    parser.add_argument('--timeout', type=float, default=2.0, help='Per-query timeout in seconds')
+    parser.add_argument('--retries', type=int, default=2, help='Retries after a timeout')
+    args = parser.parse_args()
+
+    counter = multiprocessing.Value('L', 0)
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(
+        target=serve, args=(args.port, counter, ready, args.delay, args.nxdomain_every), daemon=True
+    )
+    server.start()
+    try:
+        ready.wait(10)
+        resolved, elapsed = asyncio.run(run(args))
+        report(args, resolved, elapsed, counter.value)
+    finally:
+        server.terminate()
+
+
+if __name__ == '__main__':
+    main()
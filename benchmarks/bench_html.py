@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+"""
+HTML Extraction Benchmark - BeautifulSoup vs the streaming extractor
+
+Runs the extraction the tools do on every fetched page (script srcs, .js links,
+title and visible text) over a corpus of local HTML files, once with the original
+BeautifulSoup `html.parser` code and once with common.html_extract, reports MB/s
+for each and checks that both produce the same output.
+
+Usage:
+    python3 benchmarks/bench_html.py fetched-webpages/*.html
+    python3 benchmarks/bench_html.py -r 5 ~/recon/target/.livemonitor/pages/
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from common.html_extract import extract_html
+
+
+def soup_extract(html):
+    """The BeautifulSoup code previously used by js_downloader, keyword_hunter and webpage_analyzer"""
+    soup = BeautifulSoup(html, 'html.parser')
+    script_srcs = sorted({script.get('src') for script in soup.find_all('script', src=True) if script.get('src')})
+    js_links = sorted({link.get('href') for link in soup.find_all('link', rel='stylesheet')
+                       if link.get('href') and link.get('href').endswith('.js')})
+    title = soup.find('title').get_text() if soup.find('title') else ''
+    for script in soup(['script', 'style']):
+        script.decompose()
+    return script_srcs, js_links, title, soup.get_text()
+
+
+def fast_extract(html):
+    summary = extract_html(html)
+    return sorted(set(summary.script_srcs)), sorted(set(summary.js_links())), summary.title or '', summary.text
+
+
+def load_corpus(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in names)
+        else:
+            files.extend(glob.glob(path))
+
+    corpus = []
+    for filename in sorted(set(files)):
+        with open(filename, 'r', encoding='utf-8', errors='replace') as f:
+            corpus.append(f.read())
+    return corpus
+
+
+def bench(label, extract, corpus, rounds):
+    total_bytes = sum(len(html.encode('utf-8')) for html in corpus)
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        results = [extract(html) for html in corpus]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<16} {best:8.3f}s  {total_bytes / best / 1e6:8.2f} MB/s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML script/link/text extraction over local files")
+    parser.add_argument('paths', nargs='+', help='Files, directories or globs of HTML pages')
+    parser.add_argument('-r', '--rounds', type=int, default=3, help='Rounds per extractor (best is reported)')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.paths)
+    if not corpus:
+        print("No files found")
+        sys.exit(1)
+    print(f"Corpus: {len(corpus)} files, {sum(len(html) for html in corpus) / 1e6:.2f}M chars\n")
+
+    soup_results = bench('BeautifulSoup', soup_extract, corpus, args.rounds)
+    fast_results = bench('html_extract', fast_extract, corpus, args.rounds)
+
+    mismatches = [i for i, (a, b) in enumerate(zip(soup_results, fast_results)) if a != b]
+    if mismatches:
+        print(f"\nMISMATCH in {len(mismatches)} of {len(corpus)} files")
+        sys.exit(1)
+    print(f"\nOutputs identical ({sum(len(r[0]) + len(r[1]) for r in fast_results)} URLs)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+"""
+Metrics Benchmark - cost of the stage timers, counters and profiling hook
+
+Times `-n` iterations of an empty block, then the same block wrapped in each of the
+hooks the tools put around their stages: `metrics.stage()`, `metrics.count()`,
+`metrics.add_bytes()` and `metrics.profile()` with profiling off. Each is also run
+from `--threads` threads at once, since the tools record from thread pools. It
+reports the cost per call above the empty block, and how that compares with
+`--stage-ms`, a typical short stage (a regex scan of a small page).
+
+Usage:
+    python3 benchmarks/bench_metrics.py -n 1000000
+    python3 benchmarks/bench_metrics.py -n 200000 --threads 8 --stage-ms 0.5
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from common.metrics import Metrics
+
+
+def empty(metrics, count):
+    for _ in range(count):
+        pass
+
+
+def stage(metrics, count):
+    for _ in range(count):
+        with metrics.stage('bench'):
+            pass
+
+
+def counter(metrics, count):
+    for _ in range(count):
+        metrics.count('bench')
+
+
+def add_bytes(metrics, count):
+    for _ in range(count):
+        metrics.add_bytes('bench', 1024)
+
+
+def profile_off(metrics, count):
+    for _ in range(count):
+        with metrics.profile('https://example.com/'):
+            pass
+
+
+def timed(function, count, threads):
+    """Seconds per call of function's loop body, running on `threads` threads at once"""
+    metrics = Metrics('bench')
+    per_thread = count // threads
+    workers = [threading.Thread(target=function, args=(metrics, per_thread)) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - start) / (per_thread * threads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cost of the metrics hooks")
+    parser.add_argument('-n', '--iterations', type=int, default=1000000, help='Calls per hook')
+    parser.add_argument('--threads', type=int, default=4, help='Threads for the concurrent run')
+    parser.add_argument('--stage-ms', type=float, default=1.0, help='Duration of a typical short stage, for comparison')
+    args = parser.parse_args()
+
+    hooks = [('stage()', stage), ('count()', counter), ('add_bytes()', add_bytes), ('profile() off', profile_off)]
+    for threads in (1, args.threads):
+        baseline = timed(empty, args.iterations, threads)
+        print(f"{threads} thread{'s' if threads > 1 else ''}:")
+        for label, function in hooks:
+            cost = timed(function, args.iterations, threads) - baseline
+            share = cost / (args.stage_ms / 1000) * 100
+            print(f"  {label:<14} {cost * 1e9:7.0f} ns per call  ({share:.3f}% of a {args.stage_ms:g} ms stage)")
+
+
+if __name__ == '__main__':
+    main()
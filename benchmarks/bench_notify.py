@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+
+"""
+Notify Benchmark - coalesced background notifications against one webhook per finding
+
+Starts a local stub Discord webhook that enforces a per-webhook bucket (`--limit`
+requests per `--per` seconds). Like Discord, it answers with X-RateLimit-* headers
+and a 429 with `retry_after` once the bucket is empty. It rejects content over
+2000 characters and can fail every Nth request with a 500. Findings spread over
+`--targets` targets are then sent two ways:
+
+- baseline: one blocking POST per finding, with no retry, the way the tools used
+  to send through discord_notify
+- notifier: common/notify.py, queued from the scan and sent in the background
+
+For each way it reports how long the scan was blocked, the total time until
+delivery, messages posted, 429s, and findings delivered, lost or duplicated.
+
+Usage:
+    python3 benchmarks/bench_notify.py -n 300 --targets 20
+    python3 benchmarks/bench_notify.py -n 500 --fail-every 7 --window 0.5
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from common.notify import MAX_MESSAGE, Notifier
+
+MARKER = re.compile(r'finding-(\d+)\b')
+
+
+class StubWebhook(ThreadingHTTPServer):
+    def __init__(self, limit, per, fail_every):
+        super().__init__(('127.0.0.1', 0), WebhookHandler)
+        self.limit = limit
+        self.per = per
+        self.fail_every = fail_every
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.window_start = time.time()
+        self.used = 0
+        self.stats = Counter()
+        self.delivered = Counter()
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        content = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['content']
+        with server.lock:
+            server.stats['requests'] += 1
+            now = time.time()
+            if now - server.window_start >= server.per:
+                server.window_start, server.used = now, 0
+            reset_after = server.per - (now - server.window_start)
+            if server.used >= server.limit:
+                server.stats['429'] += 1
+                return self.reply(429, {'message': 'You are being rate limited.', 'retry_after': round(reset_after, 3), 'global': False}, 0, reset_after)
+            server.used += 1
+            remaining = server.limit - server.used
+            if server.fail_every and server.stats['requests'] % server.fail_every == 0:
+                server.stats['500'] += 1
+                return self.reply(500, {'message': 'Internal error'}, remaining, reset_after)
+            if len(content) > MAX_MESSAGE:
+                server.stats['too_long'] += 1
+                return self.reply(400, {'content': ['Must be 2000 or fewer in length.']}, remaining, reset_after)
+            server.stats['messages'] += 1
+            for number in MARKER.findall(content):
+                server.delivered[int(number)] += 1
+        self.reply(204, None, remaining, reset_after)
+
+    def reply(self, status, body, remaining, reset_after):
+        data = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        self.send_header('X-RateLimit-Limit', str(self.server.limit))
+        self.send_header('X-RateLimit-Remaining', str(remaining))
+        self.send_header('X-RateLimit-Reset-After', f"{reset_after:.3f}")
+        if status == 429:
+            self.send_header('Retry-After', str(max(1, round(reset_after))))
+        if data:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def findings(count, targets):
+    for number in range(count):
+        target = f"target{number % targets}.example"
+        body = (
+            f"Found 1 matches on https://{target}/page{number}:\n\n**API Keys**\n"
+            f"• Match: `api_key = \"finding-{number}\"` \n• Source: https://{target}/static/app.{number}.js\n"
+            f"• Context: `Line 1, col 4021: ...{'x' * 120}...`\n• Type: JavaScript"
+        )
+        yield target, body
+
+
+def report(label, server, count, blocked, elapsed):
+    stats = server.stats
+    delivered = server.delivered
+    lost = sum(1 for number in range(count) if not delivered[number])
+    duplicated = sum(1 for number in range(count) if delivered[number] > 1)
+    print(
+        f"{label:<9} scan blocked {blocked:6.2f}s  delivered after {elapsed:6.2f}s  "
+        f"{stats['messages']:4d} messages  {stats['429']:4d} x 429  {stats['500']:3d} x 500  "
+        f"{count - lost:4d}/{count} findings delivered  {duplicated} duplicated  {stats['too_long']} too long"
+    )
+
+
+def run_baseline(url, server, count, targets):
+    server.reset()
+    session = requests.Session()
+    start = time.time()
+    for target, body in findings(count, targets):
+        try:
+            session.post(url, json={'content': f"🔍 **Keyword Hunter Results** \n\n{body}"}, timeout=15)
+        except requests.RequestException:
+            pass
+    elapsed = time.time() - start
+    report('baseline', server, count, elapsed, elapsed)
+
+
+def run_notifier(url, server, count, targets, window):
+    server.reset()
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.time()
+        notifier = Notifier(url, '🔍 **Keyword Hunter Results**', outbox=os.path.join(directory, 'outbox.sqlite'), window=window, flush_timeout=120)
+        for target, body in findings(count, targets):
+            notifier.queue(target, body)
+        blocked = time.time() - start
+        notifier.close()
+        elapsed = time.time() - start
+        report('notifier', server, count, blocked, elapsed)
+        print(f"          {notifier.summary()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark notification delivery against a rate-limited stub webhook")
+    parser.add_argument('-n', '--findings', type=int, default=300, help='Number of findings to notify')
+    parser.add_argument('--targets', type=int, default=20, help='Number of distinct targets the findings belong to')
+    parser.add_argument('--limit', type=int, default=5, help='Stub webhook requests allowed per bucket')
+    parser.add_argument('--per', type=float, default=2.0, help='Stub webhook bucket length in seconds')
+    parser.add_argument('--fail-every', type=int, default=0, help='Answer every Nth request with a 500')
+    parser.add_argument('--window', type=float, default=1.0, help='Notifier coalescing window in seconds')
+    parser.add_argument('--skip-baseline', action='store_true', help='Only run the notifier')
+    args = parser.parse_args()
+
+    server = StubWebhook(args.limit, args.per, args.fail_every)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/webhooks/1/bench"
+    print(f"{args.findings} findings over {args.targets} targets, webhook allows {args.limit} requests per {args.per:g}s\n")
+
+    if not args.skip_baseline:
+        run_baseline(url, server, args.findings, args.targets)
+        # Let the stub's bucket refill between runs
+        time.sleep(args.per)
+    run_notifier(url, server, args.findings, args.targets, args.window)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
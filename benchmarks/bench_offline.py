@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+"""
+Offline Scan Benchmark - Keyword Hunter --scan throughput per process count
+
+Scans a local corpus (e.g. js_downloader's fetched-webpages/) with the offline
+scanner at each process count and reports files/s and MB/s, and checks that every
+run finds the same matches. Run it twice to measure with the files in the page cache.
+
+Usage:
+    python3 benchmarks/bench_offline.py fetched-webpages/
+    python3 benchmarks/bench_offline.py -j 1,2,4,8 -c scripts/keyword_hunter/config.yaml ~/recon/*/.urlmonitor_files
+"""
+
+import argparse
+import os
+import sys
+
+import yaml
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts')
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, 'keyword_hunter'))
+
+from offline_scan import OfflineScan, expand_paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline keyword scanning per process count")
+    parser.add_argument('paths', nargs='+', help='Files, directories or globs of JS/HTML to scan')
+    parser.add_argument('-c', '--config', default=os.path.join(SCRIPTS_DIR, 'keyword_hunter', 'config.yaml.sample'), help='Keyword Hunter config file')
+    parser.add_argument('-j', '--jobs', default=f"1,{os.cpu_count() or 1}", help='Comma-separated process counts')
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f)
+    files = expand_paths(args.paths)
+    print(f"{len(files)} files, {sum(os.path.getsize(path) for path in files if os.path.isfile(path)) / 1024 / 1024:.1f} MB\n")
+
+    baseline = None
+    for jobs in sorted({int(jobs) for jobs in args.jobs.split(',')}):
+        scan = OfflineScan(config, 5 * 1024 * 1024, 1024 * 1024, max(4096, 2 * config.get('context_window', 150)))
+        found = [(result['path'], len(result['matches'])) for result in scan.run(files, jobs)]
+        baseline = baseline or found
+        print(f"-j {jobs:<3} {scan.summary()}{'' if found == baseline else '  MISMATCH'}")
+
+
+if __name__ == '__main__':
+    main()
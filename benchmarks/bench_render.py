@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+"""
+Render Benchmark - full vs light Chrome profile
+
+Renders a list of URLs in headless Chrome once per profile (same settle wait as the
+tools) and reports pages/minute, bytes transferred, requests blocked, and the script
+URLs seen in the network log beyond the page's static `<script src>` tags. Needs
+Chrome and chromedriver; use real pages, since blocking only helps when there are
+images, fonts and trackers to block.
+
+Usage:
+    python3 benchmarks/bench_render.py -f live.diff
+    python3 benchmarks/bench_render.py -f urls.txt -n 50 --profiles light
+"""
+
+import argparse
+import os
+import sys
+import time
+from urllib.parse import urljoin
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from common.browser import PROFILES, BrowserProfile
+from common.html_extract import extract_html
+from common.settle import PageSettler
+
+
+def render_all(profile, urls, settler):
+    browser = BrowserProfile(profile, capture_scripts=True)
+    driver = browser.create_driver()
+    extra_scripts = 0
+    failed = 0
+    start = time.perf_counter()
+    try:
+        for url in urls:
+            try:
+                browser.start_page(driver)
+                driver.get(url)
+                settler.wait(driver, url)
+                browser.finish_page(driver, url)
+            except Exception as e:
+                print(f"  {profile}: {url}: {e}")
+                failed += 1
+                continue
+            static = {urljoin(url, src) for src in extract_html(driver.page_source, collect_text=False).script_srcs}
+            extra_scripts += len(set(browser.pop_script_urls(url)) - static)
+    finally:
+        driver.quit()
+    return time.perf_counter() - start, browser, extra_scripts, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the full and light Chrome rendering profiles")
+    parser.add_argument('-f', '--file', required=True, help='File with one URL per line')
+    parser.add_argument('-n', '--limit', type=int, default=20, help='Number of URLs to render per profile')
+    parser.add_argument('--profiles', default=','.join(PROFILES), help='Comma-separated profiles to run')
+    parser.add_argument('--settle-timeout', type=float, default=10, help='Settle ceiling per page in seconds')
+    args = parser.parse_args()
+
+    with open(args.file) as f:
+        urls = [line.strip() for line in f if line.strip() and not line.startswith('#')][:args.limit]
+    urls = [url if url.startswith(('http://', 'https://')) else 'https://' + url for url in urls]
+    print(f"{len(urls)} URLs\n")
+
+    for profile in args.profiles.split(','):
+        elapsed, browser, extra_scripts, failed = render_all(profile, urls, PageSettler(timeout=args.settle_timeout))
+        stats = browser.stats
+        pages = max(stats['pages'], 1)
+        print(
+            f"{profile:<6} {elapsed:7.1f}s  {stats['pages'] / elapsed * 60:6.1f} pages/minute  "
+            f"{stats['bytes'] / 1024 / 1024:7.1f} MB ({stats['bytes'] / pages / 1024:6.0f} KB/page)  "
+            f"{stats['blocked']:5d} blocked  {extra_scripts:4d} scripts only in the network log  {failed} failed"
+        )
+
+
+if __name__ == '__main__':
+    main()
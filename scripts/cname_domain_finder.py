@@ -3,71 +3,443 @@
 """
 CNAME Domain Finder - Multi-threaded CNAME Record Discovery Tool
 
-This script reads domains from stdin and discovers their CNAME records using concurrent DNS queries.
-It outputs unique CNAME records to stdout and saves detailed query results to cname_queries.txt.
-Supports configurable threading for performance optimization.
+This script reads domains from stdin, follows their CNAME chains with concurrent DNS
+queries and prints each unique CNAME record as it is discovered.
+
+Features:
+- Multi-threaded lookups, or an asyncio mode (--async) that keeps thousands of queries
+  in flight from one process
+- Async queries spread over a list of resolvers with per-resolver rate limits, timeouts
+  and retries
+- Full CNAME chains, streamed as one JSON line per domain (chain, rcode, TTL, rcode of
+  the last name) to cname_queries.jsonl as results arrive
+- Resumable runs (--resume) that skip domains already in that file
+- TTL-aware cache of every hop (negative answers with the SOA minimum), in memory and
+  optionally in SQLite (--cache), so shared chain suffixes are resolved once
+- Lazy input with a bounded number of queries in flight
+- Per-stage timings and rcode counts (--metrics) and a cProfile dump of the run (--profile)
 
 Usage:
     cat domains.txt | python3 cname_domain_finder.py -t 10 output.txt
     echo "example.com" | python3 cname_domain_finder.py
+    cat subdomains.txt | python3 cname_domain_finder.py --async -c 2000 -r 1.1.1.1,8.8.8.8 --rate 500
+    cat subdomains.txt | python3 cname_domain_finder.py --async --resume output.txt
+    cat subdomains.txt | python3 cname_domain_finder.py --async --cache ~/recon/target/.dnscache.sqlite
+    cat subdomains.txt | python3 cname_domain_finder.py --async --metrics cname.prom
 """
 
+import asyncio
+import dns.asyncresolver
+import dns.exception
+import dns.rdatatype
 import dns.resolver
+import itertools
+import json
+import os
+import sqlite3
 import sys
+import threading
+import time
 import concurrent.futures
 
-def gather_cname_records(domain):
+from common.metrics import Metrics
+from common.rate_limit import AsyncTokenBucket
+
+RETRY_RCODES = ('TIMEOUT', 'SERVFAIL', 'ERROR')
+MAX_CHAIN = 16
+DEFAULT_NEGATIVE_TTL = 300
+
+metrics = Metrics('cname_domain_finder')
+
+class DnsCache:
+    """Per-hop CNAME cache honoring record TTLs, in memory and optionally persisted to SQLite"""
+
+    def __init__(self, path=None):
+        self.memory = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.db = None
+        if path:
+            path = os.path.expanduser(path)
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.execute('PRAGMA synchronous=NORMAL')
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS hops (name TEXT PRIMARY KEY, target TEXT, rcode TEXT NOT NULL, expires REAL NOT NULL)'
+            )
+
+    def get(self, name):
+        """Return an unexpired (target, rcode, remaining ttl) hop for name, or None"""
+        now = time.time()
+        with self.lock:
+            hop = self.memory.get(name)
+            if hop is None and self.db:
+                hop = self.db.execute('SELECT target, rcode, expires FROM hops WHERE name = ?', (name,)).fetchone()
+                if hop:
+                    self.memory[name] = hop
+            if hop and hop[2] > now:
+                self.hits += 1
+                return hop[0], hop[1], int(hop[2] - now)
+            self.misses += 1
+        return None
+
+    def put(self, name, target, rcode, ttl):
+        """Cache a hop until its TTL runs out; transient failures are never cached"""
+        if rcode in RETRY_RCODES or not ttl:
+            return
+        hop = (target, rcode, time.time() + ttl)
+        with self.lock:
+            self.memory[name] = hop
+            if self.db:
+                self.db.execute('INSERT OR REPLACE INTO hops (name, target, rcode, expires) VALUES (?, ?, ?, ?)', (name,) + hop)
+                self.writes += 1
+                if self.writes % 1000 == 0:
+                    self.db.commit()
+
+    def summary(self):
+        return f"DNS cache: {self.hits} hits, {self.misses} misses"
+
+    def close(self):
+        if self.db:
+            with self.lock:
+                self.db.commit()
+                self.db.close()
+
+class ChainWalk:
+    """Follows a domain's CNAME chain one hop at a time, independent of how hops are resolved"""
+
+    def __init__(self, domain):
+        self.domain = domain
+        self.cnames = []
+        self.ttls = []
+        self.rcode = None
+        self.terminal_rcode = None
+        # Name whose hop is needed next, None once the chain is complete
+        self.name = domain
+
+    def feed(self, hop):
+        target, rcode, ttl = hop
+        if self.rcode is None:
+            self.rcode = rcode
+        if ttl is not None and target:
+            self.ttls.append(ttl)
+
+        # Stop at the end of the chain, on a loop, or at the depth limit
+        if not target or target == self.domain or target in self.cnames or len(self.cnames) >= MAX_CHAIN:
+            self.terminal_rcode = rcode
+            self.name = None
+        else:
+            self.cnames.append(target)
+            self.name = target
+
+    def result(self):
+        """JSONL record: the CNAME chain, first-hop rcode, lowest TTL and rcode of the chain's last name"""
+        return {
+            'domain': self.domain,
+            'cnames': self.cnames,
+            'rcode': self.rcode,
+            'ttl': min(self.ttls) if self.ttls else None,
+            'terminal_rcode': self.terminal_rcode,
+        }
+
+def negative_ttl(exc):
+    """TTL for caching a negative answer: the SOA minimum from the authority section"""
+    if isinstance(exc, dns.resolver.NXDOMAIN):
+        responses = list(exc.responses().values())
+    else:
+        responses = [exc.kwargs.get('response')]
+    for response in responses:
+        for rrset in getattr(response, 'authority', []):
+            if rrset.rdtype == dns.rdatatype.SOA:
+                return min(rrset.ttl, rrset[0].minimum)
+    return DEFAULT_NEGATIVE_TTL
+
+def hop_from_answers(answers):
+    return answers[0].target.to_text().rstrip('.'), 'NOERROR', answers.rrset.ttl
+
+def hop_from_error(exc):
+    if isinstance(exc, dns.resolver.NXDOMAIN):
+        return None, 'NXDOMAIN', negative_ttl(exc)
+    if isinstance(exc, dns.resolver.NoAnswer):
+        return None, 'NOERROR', negative_ttl(exc)
+    if isinstance(exc, dns.resolver.Timeout):
+        return None, 'TIMEOUT', None
+    if isinstance(exc, dns.resolver.NoNameservers):
+        return None, 'SERVFAIL', None
+    raise exc
+
+def query_hop(name):
     try:
-        answers = dns.resolver.resolve(domain, 'CNAME')
-        cname_records = [answer.to_text().rstrip('.') for answer in answers]
-        return cname_records
-    except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN, dns.resolver.Timeout):
-        return []
+        with metrics.stage('query_hop'):
+            return hop_from_answers(dns.resolver.resolve(name, 'CNAME'))
+    except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN, dns.resolver.Timeout, dns.resolver.NoNameservers) as exc:
+        return hop_from_error(exc)
 
-def main(output_file=None, num_threads=1):
-    # Read domains from standard input
-    domains = sys.stdin.readlines()
+def gather_cname_records(domain, cache):
+    with metrics.stage('gather_cname_records'):
+        walk = ChainWalk(domain)
+        while walk.name:
+            name = walk.name
+            hop = cache.get(name)
+            if hop is None:
+                hop = query_hop(name)
+                cache.put(name, *hop)
+            walk.feed(hop)
+        return walk.result()
 
-    unique_cname_records = set()
-    cname_queries = {}
+def parse_resolver(address):
+    """Split 'ip', 'ip:port' or '[ipv6]:port' into (ip, port)"""
+    if address.startswith('['):
+        host, _, port = address[1:].partition(']:')
+        return host.rstrip(']'), int(port or 53)
+    if address.count(':') == 1:
+        host, port = address.split(':')
+        return host, int(port)
+    return address, 53
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
-        future_to_domain = {executor.submit(gather_cname_records, domain.strip()): domain for domain in domains}
+class ResolverPool:
+    """Round-robin set of single-nameserver async resolvers, each with its own rate limit"""
+
+    def __init__(self, nameservers=None, rate=0, timeout=2.0, retries=2):
+        if not nameservers:
+            nameservers = dns.asyncresolver.Resolver().nameservers
+        self.timeout = timeout
+        self.retries = retries
+        # Hop queries in flight, so concurrent chains through the same target share one query
+        self.inflight = {}
+        self.resolvers = []
+        for address in nameservers:
+            host, port = parse_resolver(address)
+            resolver = dns.asyncresolver.Resolver(configure=False)
+            # Set the port first: newer dnspython binds it when nameservers are assigned
+            resolver.port = port
+            resolver.nameservers = [host]
+            resolver.timeout = timeout
+            resolver.lifetime = timeout
+            self.resolvers.append((resolver, AsyncTokenBucket(rate)))
+        self.cycle = itertools.cycle(self.resolvers)
 
-        for future in concurrent.futures.as_completed(future_to_domain):
-            domain = future_to_domain[future]
-            print(domain.rstrip())
+    async def resolve(self, domain, rdtype='CNAME'):
+        """Resolve with the next resolver, retrying timeouts on the following ones"""
+        for attempt in range(self.retries + 1):
+            resolver, bucket = next(self.cycle)
+            await bucket.acquire()
             try:
-                cname_records = future.result()
-                for record in cname_records:
-                    unique_cname_records.add(record.rstrip("."))
-                cname_queries[domain] = cname_records
-            except Exception as exc:
-                print(f"Domain {domain} generated an exception: {exc}")
-
-    if output_file:
-        with open(output_file, 'w') as file:
-            for record in unique_cname_records:
-                file.write(record + '\n')
-    else:
-        for record in unique_cname_records:
-            print(record)
+                return await resolver.resolve(domain, rdtype)
+            except (dns.resolver.Timeout, dns.resolver.NoNameservers):
+                if attempt == self.retries:
+                    raise
+
+async def query_hop_async(name, pool, cache):
+    try:
+        # Includes the wait for the resolver's rate limit and any retries
+        with metrics.stage('query_hop'):
+            hop = hop_from_answers(await pool.resolve(name, 'CNAME'))
+    except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN, dns.resolver.Timeout, dns.resolver.NoNameservers) as exc:
+        hop = hop_from_error(exc)
+    cache.put(name, *hop)
+    return hop
 
-    # Write CNAME query results to cname_queries.txt
-    with open('cname_queries.txt', 'w') as file:
-        for domain, records in cname_queries.items():
-            file.write(f"Domain: {domain}\n")
-            for record in records:
-                file.write(f"  CNAME: {record}\n")
-            file.write("\n")
+async def gather_cname_records_async(domain, pool, cache):
+    with metrics.stage('gather_cname_records'):
+        walk = ChainWalk(domain)
+        while walk.name:
+            name = walk.name
+            hop = cache.get(name)
+            if hop is None:
+                task = pool.inflight.get(name)
+                if task is None:
+                    task = asyncio.ensure_future(query_hop_async(name, pool, cache))
+                    pool.inflight[name] = task
+                    task.add_done_callback(lambda _, name=name: pool.inflight.pop(name, None))
+                hop = await asyncio.shield(task)
+            walk.feed(hop)
+        return walk.result()
+
+async def resolve_domain_async(domain, pool, cache):
+    """gather_cname_records_async, with malformed names and other DNS errors as an ERROR row"""
+    try:
+        return await gather_cname_records_async(domain, pool, cache)
+    except (dns.exception.DNSException, ValueError) as exc:
+        return error_result(domain, exc)
+
+def resolve_all(domains, num_threads, window, cache):
+    """Resolve domains on a thread pool with at most `window` submitted at once, yielding results"""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
+        pending = {}
+        for domain in domains:
+            if len(pending) >= window:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    yield future_result(pending.pop(future), future)
+            pending[executor.submit(gather_cname_records, domain, cache)] = domain
+
+        for future in concurrent.futures.as_completed(pending):
+            yield future_result(pending[future], future)
+
+def future_result(domain, future):
+    try:
+        return future.result()
+    except Exception as exc:
+        return error_result(domain, exc)
+
+def error_result(domain, exc):
+    print(f"Domain {domain} generated an exception: {exc}")
+    return {'domain': domain, 'cnames': [], 'rcode': 'ERROR', 'ttl': None, 'terminal_rcode': None}
+
+async def resolve_all_async(domains, pool, concurrency, cache=None):
+    """Resolve domains with at most `concurrency` queries in flight, yielding results"""
+    cache = cache or DnsCache()
+    pending = set()
+    for domain in domains:
+        if len(pending) >= concurrency:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+        pending.add(asyncio.ensure_future(resolve_domain_async(domain, pool, cache)))
+
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            yield task.result()
+
+class ResultWriter:
+    """Streams JSONL results and newly seen unique CNAMEs to disk, flushing after every domain"""
+
+    def __init__(self, output_file=None, jsonl_file='cname_queries.jsonl', resume=False):
+        self.done = set()
+        self.unique_cname_records = set()
+        if resume:
+            self.load(jsonl_file)
+            if output_file and os.path.exists(output_file):
+                with open(output_file, 'r') as file:
+                    self.unique_cname_records.update(line.strip() for line in file if line.strip())
+
+        mode = 'a' if resume else 'w'
+        self.jsonl = open(jsonl_file, mode)
+        if resume and self.jsonl.tell() and not self.ends_with_newline(jsonl_file):
+            self.jsonl.write('\n')
+        self.output = open(output_file, mode) if output_file else sys.stdout
+
+    def load(self, jsonl_file):
+        """Collect domains (and their CNAMEs) already present in a previous run's output"""
+        if not os.path.exists(jsonl_file):
+            return
+        with open(jsonl_file, 'r') as file:
+            for line in file:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave a truncated last line; that domain is simply redone
+                    continue
+                # Transient failures are retried on resume; a newer line supersedes the old one
+                if result['rcode'] not in RETRY_RCODES:
+                    self.done.add(result['domain'])
+                self.unique_cname_records.update(result['cnames'])
+
+    @staticmethod
+    def ends_with_newline(path):
+        with open(path, 'rb') as file:
+            file.seek(-1, os.SEEK_END)
+            return file.read(1) == b'\n'
+
+    def pending(self, lines):
+        """Stripped domains from lines that are not blank and not already resolved"""
+        for line in lines:
+            domain = line.strip()
+            if domain and domain not in self.done:
+                self.done.add(domain)
+                yield domain
+
+    def write(self, result):
+        metrics.count(f"rcode_{result['rcode']}")
+        print(result['domain'])
+        self.jsonl.write(json.dumps(result) + '\n')
+        self.jsonl.flush()
+        for record in result['cnames']:
+            if record not in self.unique_cname_records:
+                self.unique_cname_records.add(record)
+                self.output.write(record + '\n')
+        self.output.flush()
+
+    def close(self):
+        self.jsonl.close()
+        if self.output is not sys.stdout:
+            self.output.close()
+
+def finish(writer, cache, metrics_file=None):
+    writer.close()
+    cache.close()
+    print(cache.summary(), file=sys.stderr)
+    print(metrics.summary(), file=sys.stderr)
+    if metrics_file:
+        metrics.write(metrics_file)
+
+def main(output_file=None, num_threads=1, jsonl_file='cname_queries.jsonl', resume=False, window=None, cache_file=None,
+         metrics_file=None):
+    writer = ResultWriter(output_file, jsonl_file, resume)
+    cache = DnsCache(cache_file)
+    try:
+        # Read domains from standard input as they are needed
+        domains = writer.pending(sys.stdin)
+        for result in resolve_all(domains, num_threads, window or num_threads * 4, cache):
+            writer.write(result)
+    finally:
+        finish(writer, cache, metrics_file)
+
+async def main_async(output_file=None, concurrency=1000, nameservers=None, rate=0, timeout=2.0, retries=2,
+                     jsonl_file='cname_queries.jsonl', resume=False, cache_file=None, metrics_file=None):
+    writer = ResultWriter(output_file, jsonl_file, resume)
+    cache = DnsCache(cache_file)
+    pool = ResolverPool(nameservers, rate=rate, timeout=timeout, retries=retries)
+    try:
+        async for result in resolve_all_async(writer.pending(sys.stdin), pool, concurrency, cache):
+            writer.write(result)
+    finally:
+        finish(writer, cache, metrics_file)
 
 if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description="Gather CNAME records from a list of domains.")
     parser.add_argument('-t', type=int, default=1, help="Number of concurrent threads to run the CNAME queries")
+    parser.add_argument('--async', dest='use_async', action='store_true', help="Use the asyncio resolver instead of threads")
+    parser.add_argument('-c', '--concurrency', type=int, default=1000, help="Maximum in-flight queries in async mode")
+    parser.add_argument('-r', '--resolvers', help="Comma-separated resolvers (ip or ip:port) for async mode, defaults to /etc/resolv.conf")
+    parser.add_argument('--rate', type=float, default=0, help="Maximum queries per second per resolver in async mode (0 = unlimited)")
+    parser.add_argument('--timeout', type=float, default=2.0, help="Per-query timeout in seconds in async mode")
+    parser.add_argument('--retries', type=int, default=2, help="Retries on other resolvers after a timeout in async mode")
+    parser.add_argument('-j', '--jsonl', default='cname_queries.jsonl', help="JSONL file for per-domain results")
+    parser.add_argument('--resume', action='store_true', help="Skip domains already in the JSONL file and append to it")
+    parser.add_argument('--cache', help="SQLite file for the TTL-honoring DNS cache, e.g. ~/recon/TARGET/.dnscache.sqlite")
+    parser.add_argument('--metrics', help="Write stage timings and rcode counts at exit: JSON, or a Prometheus textfile if it ends in .prom")
+    parser.add_argument('--profile', metavar='DIR', help="Write a cProfile dump of the whole run to DIR (with --async; worker threads are not profiled)")
     parser.add_argument('output_file', nargs='?', help="Optional output file to write the results")
 
     args = parser.parse_args()
 
-    main(output_file=args.output_file, num_threads=args.t)
+    if args.profile:
+        metrics.enable_profiling(args.profile)
+
+    # Domains are resolved concurrently (on threads or one event loop), so the run is profiled as a whole
+    with metrics.profile('run'):
+        if args.use_async:
+            nameservers = args.resolvers.split(',') if args.resolvers else None
+            asyncio.run(main_async(
+                output_file=args.output_file,
+                concurrency=args.concurrency,
+                nameservers=nameservers,
+                rate=args.rate,
+                timeout=args.timeout,
+                retries=args.retries,
+                jsonl_file=args.jsonl,
+                resume=args.resume,
+                cache_file=args.cache,
+                metrics_file=args.metrics,
+            ))
+        else:
+            main(output_file=args.output_file, num_threads=args.t, jsonl_file=args.jsonl, resume=args.resume, cache_file=args.cache,
+                 metrics_file=args.metrics)
@@ -0,0 +1 @@
+"""Shared helpers for the Python recon scripts (keyword_hunter, webpage_analyzer, ...)"""
@@ -0,0 +1,170 @@
+"""
+Browser - Headless Chrome profiles for the Selenium fetchers
+
+Creates the Chrome drivers used by Keyword Hunter and Webpage Analyzer. The `full`
+profile loads pages like a normal browser. The `light` profile disables images and
+blocks fonts, media, images and known ad / tracker hosts through CDP
+`Network.setBlockedURLs`, since none of them matter for regex hunting or text
+classification. Both profiles record Chrome's performance log. From it they count
+the bytes transferred and blocked requests per page, and collect the script URLs the
+page actually requested, including chunks loaded at runtime that no static
+`<script src>` mentions.
+"""
+
+import json
+import threading
+from collections import Counter
+from functools import lru_cache
+
+import tldextract
+
+from common.fetcher import USER_AGENT
+
+PROFILES = ('full', 'light')
+
+# The bundled Public Suffix List snapshot, private suffixes included so every
+# *.herokuapp.com or *.cloudfront.net tenant is its own site; never fetched or cached
+EXTRACT = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None, include_psl_private_domains=True)
+
+BLOCKED_EXTENSIONS = [
+    'png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'bmp', 'ico', 'svg',
+    'woff', 'woff2', 'ttf', 'otf', 'eot',
+    'mp4', 'webm', 'ogg', 'mp3', 'wav', 'm4a', 'mov',
+]
+
+BLOCKED_HOSTS = [
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'googleadservices.com', 'adservice.google.com', 'fonts.googleapis.com', 'fonts.gstatic.com',
+    'connect.facebook.net', 'hotjar.com', 'clarity.ms', 'bat.bing.com', 'scorecardresearch.com',
+    'quantserve.com', 'criteo.com', 'taboola.com', 'outbrain.com', 'nr-data.net',
+]
+
+
+def blocked_url_patterns(extensions, hosts):
+    """Network.setBlockedURLs wildcard patterns for file extensions and whole hosts"""
+    patterns = []
+    for extension in extensions:
+        patterns += [f'*.{extension}', f'*.{extension}?*']
+    for host in hosts:
+        patterns += [f'*://{host}/*', f'*://*.{host}/*']
+    return patterns
+
+
+@lru_cache(maxsize=4096)
+def site(host):
+    """Registrable domain of a hostname (shop.acme.co.uk -> acme.co.uk), or the host itself if it has none"""
+    host = (host or '').lower().rstrip('.')
+    parts = EXTRACT(host)
+    if not parts.domain or not parts.suffix:
+        return host
+    return f"{parts.domain}.{parts.suffix}"
+
+
+def parse_network_log(entries):
+    """Script URLs requested, bytes received and requests blocked, from performance log entries"""
+    scripts = []
+    received = 0
+    blocked = 0
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, TypeError, ValueError):
+            continue
+        method = message.get('method')
+        params = message.get('params', {})
+        if method == 'Network.requestWillBeSent':
+            if params.get('type') == 'Script':
+                url = params.get('request', {}).get('url', '')
+                if url.startswith(('http://', 'https://')) and url not in scripts:
+                    scripts.append(url)
+        elif method == 'Network.loadingFinished':
+            received += int(params.get('encodedDataLength') or 0)
+        elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+            blocked += 1
+    return scripts, received, blocked
+
+
+class BrowserProfile:
+    def __init__(self, profile='full', blocked_hosts=(), capture_scripts=False):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown render profile {profile!r}, expected one of {', '.join(PROFILES)}")
+        self.profile = profile
+        self.blocked_patterns = blocked_url_patterns(BLOCKED_EXTENSIONS, BLOCKED_HOSTS + list(blocked_hosts))
+        self.capture_scripts = capture_scripts
+        self.scripts = {}
+        self.stats = Counter()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, profile=None, capture_scripts=False):
+        return cls(
+            profile=profile or config.get('render_profile', 'full'),
+            blocked_hosts=config.get('blocked_hosts') or [],
+            capture_scripts=capture_scripts,
+        )
+
+    def create_driver(self):
+        """Launch headless Chrome with this profile"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+
+        options = Options()
+        options.add_argument('--headless')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--disable-gpu')
+        options.add_argument('--window-size=1920,1080')
+        options.add_argument(f'--user-agent={USER_AGENT}')
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        if self.profile == 'light':
+            options.add_argument('--blink-settings=imagesEnabled=false')
+            options.add_argument('--mute-audio')
+            options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+
+        driver = webdriver.Chrome(options=options)
+        driver.set_page_load_timeout(30)
+        if self.profile == 'light':
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_patterns})
+        return driver
+
+    def read_log(self, driver):
+        try:
+            return driver.get_log('performance')
+        except Exception:
+            # Drivers without performance logging still render
+            return []
+
+    def start_page(self, driver):
+        """Call before driver.get(): drops log entries left over from the previous page"""
+        self.read_log(driver)
+
+    def finish_page(self, driver, url):
+        """Call once the page has settled: records its traffic and the scripts it requested"""
+        scripts, received, blocked = parse_network_log(self.read_log(driver))
+        with self.lock:
+            self.stats['pages'] += 1
+            self.stats['bytes'] += received
+            self.stats['blocked'] += blocked
+            self.stats['scripts'] += len(scripts)
+            if self.capture_scripts:
+                self.scripts[url] = scripts
+
+    def pop_script_urls(self, url):
+        """Script URLs requested while rendering url (once; empty if it was not rendered)"""
+        with self.lock:
+            return self.scripts.pop(url, [])
+
+    def summary(self):
+        """One-line rendering traffic statistics for this run"""
+        with self.lock:
+            stats = dict(self.stats)
+        pages = stats.get('pages', 0)
+        if not pages:
+            return f"Browser ({self.profile} profile): no pages rendered"
+        megabytes = stats.get('bytes', 0) / 1024 / 1024
+        return (
+            f"Browser ({self.profile} profile): {pages} pages, {megabytes:.1f} MB transferred "
+            f"({stats.get('bytes', 0) / pages / 1024:.0f} KB/page), {stats.get('blocked', 0)} requests blocked, "
+            f"{stats.get('scripts', 0)} script requests"
+        )
@@ -0,0 +1,215 @@
+"""
+Daemon - Serve tool runs over a local Unix socket
+
+Lets a long-running tool process keep its browsers, compiled patterns, AI agent and
+HTTP pools warm between runs. A client sends one JSON job per connection. Jobs run
+one at a time in arrival order on the daemon's job thread, and everything the job
+prints is streamed back to the client, followed by its exit status. When no daemon
+is listening, `submit` returns None and the client runs the job itself.
+"""
+
+import io
+import json
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+
+DEFAULT_DIR = '~/.cache/bb-scripts'
+STOP = None
+
+
+def socket_path(name, path=None):
+    """Socket path for a tool: `path` if given, else <DEFAULT_DIR>/<name>.sock"""
+    return os.path.expanduser(path or os.path.join(DEFAULT_DIR, f'{name}.sock'))
+
+
+def send(conn, message):
+    conn.sendall((json.dumps(message) + '\n').encode())
+
+
+class JobOutput(io.TextIOBase):
+    """sys.stdout replacement that streams a job's output to its client"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.lock = threading.Lock()
+        self.connected = True
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        if text and self.connected:
+            with self.lock:
+                try:
+                    send(self.conn, {'output': text})
+                except OSError:
+                    # The client went away (Ctrl-C); the job still runs to completion
+                    self.connected = False
+        return len(text)
+
+
+class JobServer:
+    def __init__(self, path, handler, accepts=None):
+        """
+        handler(job) runs a job dict and returns its exit status. accepts(job)
+        returns None if this daemon can run the job, or the reason it cannot
+        (e.g. it was started with a different config).
+        """
+        self.path = path
+        self.handler = handler
+        self.accepts = accepts or (lambda job: None)
+        self.jobs = queue.Queue()
+        self.console = sys.stdout
+
+    def log(self, message):
+        print(f"[{time.strftime('%H:%M:%S')}] {message}", file=self.console, flush=True)
+
+    def bind(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        if os.path.exists(self.path):
+            # A socket file left behind by a daemon that did not exit cleanly
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+                raise RuntimeError(f"A daemon is already listening on {self.path}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(self.path)
+            finally:
+                probe.close()
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        os.chmod(self.path, 0o600)
+        server.listen(64)
+        return server
+
+    def serve_forever(self):
+        server = self.bind()
+        worker = threading.Thread(target=self.run_jobs, daemon=True)
+        worker.start()
+        self.log(f"Listening on {self.path} (pid {os.getpid()})")
+
+        try:
+            while True:
+                conn, _ = server.accept()
+                if not self.handle_connection(conn):
+                    break
+        except KeyboardInterrupt:
+            self.log("Interrupted")
+        finally:
+            server.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+        # Queued jobs finish before the daemon exits
+        self.jobs.put(STOP)
+        worker.join()
+        self.log("Stopped")
+
+    def handle_connection(self, conn):
+        """Read one request; returns False when the daemon should stop"""
+        try:
+            line = conn.makefile('r').readline()
+            request = json.loads(line) if line else {}
+        except (OSError, ValueError) as e:
+            self.log(f"Bad request: {e}")
+            conn.close()
+            return True
+
+        kind = request.get('type')
+        if kind == 'ping':
+            send(conn, {'status': 0, 'pid': os.getpid(), 'queued': self.jobs.qsize()})
+            conn.close()
+        elif kind == 'stop':
+            send(conn, {'status': 0})
+            conn.close()
+            return False
+        elif kind == 'job':
+            reason = self.accepts(request)
+            if reason:
+                send(conn, {'error': reason})
+                conn.close()
+            else:
+                if self.jobs.qsize():
+                    send(conn, {'output': f"Queued behind {self.jobs.qsize()} jobs\n"})
+                self.jobs.put((conn, request))
+        else:
+            send(conn, {'error': f"Unknown request type {kind!r}"})
+            conn.close()
+        return True
+
+    def run_jobs(self):
+        while True:
+            item = self.jobs.get()
+            if item is STOP:
+                return
+            conn, job = item
+            self.run_job(conn, job)
+
+    def run_job(self, conn, job):
+        output = JobOutput(conn)
+        start = time.time()
+        status = 1
+        sys.stdout = output
+        try:
+            status = self.handler(job) or 0
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            print(f"Error: {e}")
+        finally:
+            sys.stdout = self.console
+
+        try:
+            send(conn, {'status': status})
+        except OSError:
+            pass
+        conn.close()
+        self.log(f"Job with {len(job.get('urls', []))} URLs finished in {time.time() - start:.1f}s (status {status})")
+
+
+def request(path, message, out=None):
+    """
+    Send a request to the daemon at path, streaming its output to out (stdout).
+    Returns the exit status, or None if no daemon is listening or it declined.
+    """
+    out = out or sys.stdout
+    if not os.path.exists(path):
+        return None
+
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        conn.close()
+        return None
+
+    with conn:
+        send(conn, message)
+        for line in conn.makefile('r'):
+            reply = json.loads(line)
+            if 'output' in reply:
+                out.write(reply['output'])
+                out.flush()
+            elif 'error' in reply:
+                print(f"Daemon on {path} declined the job: {reply['error']}")
+                return None
+            elif 'status' in reply:
+                return reply['status']
+
+    print(f"Daemon on {path} closed the connection before the job finished")
+    return 1
+
+
+def submit(path, job, out=None):
+    """Run a job dict on the daemon at path; see request()"""
+    return request(path, dict(job, type='job'), out)
+
+
+def stop(path):
+    """Ask the daemon at path to finish its queued jobs and exit; False if none is running"""
+    return request(path, {'type': 'stop'}) is not None
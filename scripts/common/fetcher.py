@@ -0,0 +1,132 @@
+"""
+Tiered Fetcher - Static-first page fetching with Selenium escalation
+
+Fetches a URL with a plain HTTP request first and only escalates to the browser
+when the response looks like it needs JavaScript rendering: an empty SPA root
+element, a script-heavy body with little visible text, or a failed request.
+Non-HTML responses (JSON, JS, plain text) never go to the browser.
+"""
+
+import re
+import threading
+from collections import Counter
+
+import requests
+
+USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+HTML_TYPES = ('text/html', 'application/xhtml')
+
+SPA_ROOT = re.compile(
+    r'<app-root\b[^>]*>\s*</app-root\s*>'
+    r'|<(div|main)\b[^>]*\bid\s*=\s*["\']?(?:root|app|__next|__nuxt|svelte|q-app)(?=["\'\s/>])[^>]*>\s*</\1\s*>',
+    re.IGNORECASE,
+)
+NOSCRIPT_HINT = re.compile(r'<noscript\b[^>]*>[^<]*(?:enable|requires?)\s+javascript', re.IGNORECASE)
+SCRIPT_OR_STYLE = re.compile(r'<(script|style)\b[^>]*>(.*?)</\1\s*>', re.IGNORECASE | re.DOTALL)
+SCRIPT_TAG = re.compile(r'<script\b', re.IGNORECASE)
+TAG = re.compile(r'<[^>]+>')
+WHITESPACE = re.compile(r'\s+')
+
+
+class FetchResult:
+    def __init__(self, url, body, content_type, tier, reason):
+        self.url = url
+        self.body = body
+        self.content_type = content_type
+        self.tier = tier
+        self.reason = reason
+
+    @property
+    def is_html(self):
+        return self.tier == 'browser' or self.content_type.startswith(HTML_TYPES)
+
+
+def visible_text_length(html):
+    """Rough length of the text a user would see, without parsing the document"""
+    text = SCRIPT_OR_STYLE.sub(' ', html)
+    text = TAG.sub(' ', text)
+    return len(WHITESPACE.sub(' ', text).strip())
+
+
+class TieredFetcher:
+    def __init__(self, enabled=True, timeout=10, min_text=200, script_ratio=5.0, session=None):
+        self.enabled = enabled
+        self.timeout = timeout
+        self.min_text = min_text
+        self.script_ratio = script_ratio
+        if session is None:
+            session = requests.Session()
+            session.headers['User-Agent'] = USER_AGENT
+        self.session = session
+        self.tiers = Counter()
+        self.reasons = Counter()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, session=None):
+        return cls(
+            enabled=config.get('static_fetch', True),
+            min_text=int(config.get('static_min_text', 200)),
+            session=session,
+        )
+
+    def needs_rendering(self, response):
+        """Return the reason the response needs a browser, or None if the static body is enough"""
+        if response.status_code >= 400:
+            return f'http-{response.status_code}'
+
+        content_type = response.headers.get('Content-Type', '').lower()
+        if content_type and not content_type.startswith(HTML_TYPES):
+            return None
+
+        html = response.text
+        if SPA_ROOT.search(html):
+            return 'spa-root'
+        if NOSCRIPT_HINT.search(html):
+            return 'noscript'
+
+        text_length = visible_text_length(html)
+        scripts = len(SCRIPT_TAG.findall(html))
+        if scripts and text_length < self.min_text:
+            return 'little-text'
+
+        script_bytes = sum(len(match.group(2)) for match in SCRIPT_OR_STYLE.finditer(html) if match.group(1).lower() == 'script')
+        if scripts and script_bytes > self.script_ratio * max(text_length, 1):
+            return 'script-heavy'
+        return None
+
+    def fetch(self, url, render):
+        """Fetch url statically, falling back to render(url) -> page source when needed"""
+        reason = 'static-disabled'
+        if self.enabled:
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+                reason = self.needs_rendering(response)
+                if reason is None:
+                    self.record('static', 'static')
+                    content_type = response.headers.get('Content-Type', 'text/html').lower()
+                    return FetchResult(response.url, response.text, content_type, 'static', 'static')
+            except requests.RequestException as e:
+                reason = f'error-{type(e).__name__}'
+
+        body = render(url)
+        self.record('browser', reason)
+        return FetchResult(url, body, 'text/html', 'browser', reason)
+
+    def record(self, tier, reason):
+        with self.lock:
+            self.tiers[tier] += 1
+            if tier == 'browser':
+                self.reasons[reason] += 1
+
+    def summary(self):
+        """One-line count of pages served by each tier"""
+        with self.lock:
+            static = self.tiers['static']
+            browser = self.tiers['browser']
+            reasons = ', '.join(f"{reason}: {count}" for reason, count in self.reasons.most_common())
+        line = f"Fetch tiers: {static} static, {browser} browser"
+        if reasons:
+            line += f" ({reasons})"
+        return line + f" - {static} browser loads skipped"
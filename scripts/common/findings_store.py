@@ -0,0 +1,235 @@
+"""
+Findings Store - Persistent, deduplicated findings for Keyword Hunter and Webpage Analyzer
+
+Records every keyword match and page classification in one SQLite database, so
+that a finding is only printed and notified the first time it is seen. Later runs
+bump its last_seen time and count instead. Keyword matches are deduplicated per
+target (the registrable domain of the page they were found on, from the Public
+Suffix List), group, pattern and match, so a secret that moves to a new
+hash-versioned bundle is not reported again.
+Classifications are deduplicated per page URL and category. `scripts/findings.py`
+queries the history without rescanning anything.
+"""
+
+import hashlib
+import ipaddress
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+from common.browser import site
+
+DEFAULT_PATH = '~/.cache/bb-scripts/findings.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS findings (
+    fingerprint TEXT PRIMARY KEY,
+    tool TEXT NOT NULL,
+    target TEXT NOT NULL,
+    category TEXT NOT NULL,
+    pattern TEXT,
+    match TEXT,
+    match_hash TEXT NOT NULL,
+    source_url TEXT NOT NULL,
+    page_url TEXT NOT NULL,
+    content_type TEXT,
+    context TEXT,
+    confidence REAL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    seen_count INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS findings_target ON findings (target, category, first_seen);
+CREATE INDEX IF NOT EXISTS findings_category ON findings (category, first_seen);
+CREATE INDEX IF NOT EXISTS findings_match_hash ON findings (match_hash);
+CREATE INDEX IF NOT EXISTS findings_source_url ON findings (source_url);
+CREATE INDEX IF NOT EXISTS findings_first_seen ON findings (first_seen);
+"""
+
+# Bumped when target_of() changes; older stores are retargeted from their page URLs on open
+SCHEMA_VERSION = 1
+
+COLUMNS = [
+    'fingerprint', 'tool', 'target', 'category', 'pattern', 'match', 'match_hash', 'source_url',
+    'page_url', 'content_type', 'context', 'confidence', 'first_seen', 'last_seen', 'seen_count',
+]
+
+
+def target_of(url):
+    """
+    The site a finding belongs to: the URL's (or bare host's) registrable domain. Local
+    files without a recorded URL belong to their directory, which is per site for
+    .urlmonitor_files.
+    """
+    if '://' not in url and os.sep in url:
+        return os.path.dirname(os.path.abspath(url))
+    host = urlparse(url).hostname if '://' in url else url
+    if not host:
+        return url
+    try:
+        return str(ipaddress.ip_address(host))
+    except ValueError:
+        return site(host)
+
+
+def digest(*parts):
+    return hashlib.sha256('\0'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+class FindingsStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        # Both tools (and pipeline.py) may write at the same time
+        self.db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript(SCHEMA)
+        if self.db.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+            self.retarget()
+        self.lock = threading.Lock()
+        self.stats = Counter()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.get('findings_store_file', DEFAULT_PATH))
+
+    def retarget(self):
+        """Recompute every finding's target (and keyword fingerprint) from its page URL"""
+        with self.db:
+            rows = self.db.execute(
+                'SELECT fingerprint, tool, target, category, pattern, match_hash, page_url FROM findings'
+            ).fetchall()
+            for fingerprint, tool, target, category, pattern, match_hash, page_url in rows:
+                new_target = target_of(page_url)
+                if new_target == target:
+                    continue
+                new_fingerprint = fingerprint
+                if tool == 'keyword_hunter':
+                    new_fingerprint = digest(tool, new_target, category, pattern, match_hash)
+                self.db.execute(
+                    'UPDATE OR IGNORE findings SET target = ?, fingerprint = ? WHERE fingerprint = ?',
+                    (new_target, new_fingerprint, fingerprint),
+                )
+            self.db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def record(self, rows):
+        """Insert or refresh rows; returns the ones seen for the first time, in order"""
+        now = time.time()
+        new = []
+        with self.lock, self.db:
+            seen_now = set()
+            for row in rows:
+                if row['fingerprint'] in seen_now:
+                    self.stats['repeated'] += 1
+                    continue
+                seen_now.add(row['fingerprint'])
+                cursor = self.db.execute(
+                    'UPDATE findings SET last_seen = ?, seen_count = seen_count + 1, source_url = ?, page_url = ? '
+                    'WHERE fingerprint = ?',
+                    (now, row['source_url'], row['page_url'], row['fingerprint']),
+                )
+                if cursor.rowcount:
+                    self.stats['repeated'] += 1
+                    continue
+                values = dict(row, first_seen=now, last_seen=now, seen_count=1)
+                self.db.execute(
+                    f"INSERT INTO findings ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                    [values.get(column) for column in COLUMNS],
+                )
+                self.stats['new'] += 1
+                new.append(row)
+        return new
+
+    def record_matches(self, page_url, matches):
+        """Record keyword matches found on page_url; returns the matches not reported before"""
+        target = target_of(page_url)
+        rows = []
+        for match in matches:
+            match_hash = digest(match['match'])
+            rows.append({
+                'fingerprint': digest('keyword_hunter', target, match['group'], match['pattern'], match_hash),
+                'tool': 'keyword_hunter',
+                'target': target,
+                'category': match['group'],
+                'pattern': match['pattern'],
+                'match': match['match'],
+                'match_hash': match_hash,
+                'source_url': match['source_url'],
+                'page_url': page_url,
+                'content_type': match['content_type'],
+                'context': match['line_context'],
+                'finding': match,
+            })
+        return [row['finding'] for row in self.record(rows)]
+
+    def record_classification(self, finding):
+        """Record a page classification; True if this page was not given this category before"""
+        analysis = finding['analysis']
+        if not analysis.matched_category:
+            # Failed classifications are retried, not remembered
+            return True
+        url = finding['url']
+        return bool(self.record([{
+            'fingerprint': digest('webpage_analyzer', url, analysis.matched_category),
+            'tool': 'webpage_analyzer',
+            'target': target_of(url),
+            'category': analysis.matched_category,
+            'match': finding['title'],
+            'match_hash': digest(finding['title']),
+            'source_url': url,
+            'page_url': url,
+            'content_type': 'Classification',
+            'context': analysis.summary,
+            'confidence': analysis.confidence_score,
+        }]))
+
+    def query(self, target=None, category=None, tool=None, since=None, until=None, match=None, source=None, limit=None):
+        """Stored findings, newest first. target is matched by site, category case-insensitively"""
+        clauses, params = [], []
+        if target:
+            clauses.append('target = ?')
+            params.append(target_of(target))
+        if category:
+            clauses.append('category = ? COLLATE NOCASE')
+            params.append(category)
+        if tool:
+            clauses.append('tool = ?')
+            params.append(tool)
+        if since is not None:
+            clauses.append('first_seen >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('first_seen < ?')
+            params.append(until)
+        if match:
+            clauses.append("match LIKE ? ESCAPE '\\'")
+            params.append(f"%{escape_like(match)}%")
+        if source:
+            clauses.append("source_url LIKE ? ESCAPE '\\'")
+            params.append(f"%{escape_like(source)}%")
+
+        sql = f"SELECT {', '.join(COLUMNS)} FROM findings"
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY first_seen DESC'
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+        with self.lock:
+            return [dict(zip(COLUMNS, row)) for row in self.db.execute(sql, params)]
+
+    def summary(self):
+        """One-line count of new and already reported findings this run"""
+        with self.lock:
+            stats = dict(self.stats)
+        return f"Findings store: {stats.get('new', 0)} new, {stats.get('repeated', 0)} already reported ({self.path})"
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def escape_like(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
@@ -0,0 +1,211 @@
+"""
+HTML Extract - Lightweight extraction of script URLs, title and text from HTML
+
+A `html.parser.HTMLParser` subclass that only tracks the few things the tools need
+(`<script src>`, `<link href>`, the first `<title>` and the visible text) instead of
+building a full BeautifulSoup tree. It uses the same tokenizer and tag-closing rules
+as BeautifulSoup's `html.parser` builder, so it returns the same URLs, title and
+text as the `soup.find_all(...)` / `soup.get_text()` code it replaces.
+"""
+
+import re
+from html.entities import html5
+from html.parser import HTMLParser
+
+# Elements BeautifulSoup closes immediately instead of pushing onto the open-tag stack
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+    'menuitem', 'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound',
+    'command', 'frame', 'image', 'isindex', 'nextid', 'spacer',
+])
+
+# Elements whose strings BeautifulSoup stores as Script, Stylesheet, TemplateString,
+# ... instead of plain text, so they are left out of get_text()
+SKIPPED_TEXT = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+
+# Elements inside which whitespace-only strings are kept as-is
+PRESERVE_WHITESPACE = frozenset(['pre', 'textarea'])
+
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+DECIMAL_REFERENCE = re.compile('^([0-9]+)(.*)')
+HEX_REFERENCE = re.compile('^([0-9a-f]+)(.*)')
+
+
+def numeric_character(number):
+    """Character for a numeric reference, mapping Windows-1252 code points like BeautifulSoup"""
+    if number == 0 or number > 0x10ffff or 0xd800 <= number <= 0xdfff:
+        return '\ufffd'
+    if 0x80 <= number <= 0x9f:
+        try:
+            return bytes([number]).decode('cp1252')
+        except UnicodeDecodeError:
+            pass
+    return chr(number)
+
+
+class HtmlSummary:
+    def __init__(self, script_srcs, links, title, text):
+        self.script_srcs = script_srcs
+        self.links = links
+        self.title = title
+        self.text = text
+
+    def js_links(self, rel='stylesheet'):
+        """hrefs of <link rel=...> elements that point at .js files"""
+        return [href for link_rel, href in self.links if rel in link_rel and href.endswith('.js')]
+
+
+class HtmlExtractor(HTMLParser):
+    """
+    feed() the document, then close() to get an HtmlSummary. Text is only
+    collected when collect_text is set.
+    """
+
+    def __init__(self, collect_text=True):
+        super().__init__(convert_charrefs=False)
+        self.collect_text = collect_text
+        self.stack = []
+        self.skip_depth = 0
+        self.preserve_depth = 0
+        self.pending = []
+        self.already_closed = []
+        self.script_srcs = []
+        self.links = []
+        self.title_parts = None
+        self.title_depth = None
+        self.text_parts = []
+
+    def flush(self, cdata=False):
+        """Finish the current run of text, collapsing it like BeautifulSoup does"""
+        if not self.pending:
+            return
+        skipped = self.skip_depth and not cdata
+        data = ''.join(self.pending)
+        self.pending = []
+        if not self.preserve_depth and not data.strip(ASCII_SPACES):
+            data = '\n' if '\n' in data else ' '
+        if self.title_depth is not None and not skipped:
+            self.title_parts.append(data)
+        if self.collect_text and not skipped:
+            self.text_parts.append(data)
+
+    def handle_starttag(self, tag, attrs):
+        self.open_element(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            # BeautifulSoup ignores the </br> that may follow a <br>
+            self.already_closed.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        # <script/> and friends open and close in one step
+        self.open_element(tag, attrs)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.already_closed:
+            self.already_closed.remove(tag)
+        else:
+            self.close_element(tag)
+
+    def open_element(self, tag, attrs):
+        self.flush()
+        if tag == 'script':
+            src = dict(attrs).get('src')
+            if src:
+                self.script_srcs.append(src)
+        elif tag == 'link':
+            attributes = dict(attrs)
+            href = attributes.get('href')
+            if href:
+                self.links.append(((attributes.get('rel') or '').split(), href))
+
+        if tag in VOID_ELEMENTS:
+            return
+
+        self.stack.append(tag)
+        if tag in SKIPPED_TEXT:
+            self.skip_depth += 1
+        if tag in PRESERVE_WHITESPACE:
+            self.preserve_depth += 1
+        if tag == 'title' and self.title_parts is None:
+            self.title_parts = []
+            self.title_depth = len(self.stack)
+
+    def close_element(self, tag):
+        self.flush()
+        # Close the most recent open element with this name and everything inside it;
+        # end tags with no matching open element are ignored
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index] == tag:
+                break
+        else:
+            return
+
+        for name in self.stack[index:]:
+            if name in SKIPPED_TEXT:
+                self.skip_depth -= 1
+            if name in PRESERVE_WHITESPACE:
+                self.preserve_depth -= 1
+        del self.stack[index:]
+        if self.title_depth is not None and len(self.stack) < self.title_depth:
+            self.title_depth = None
+
+    def handle_data(self, data):
+        # Strings inside script, style, ... are dropped, unless they are CDATA sections
+        if (self.title_depth is not None or self.collect_text) and not self.skip_depth:
+            self.pending.append(data)
+
+    def handle_entityref(self, name):
+        # Unknown entities are kept as literal text, without their semicolon
+        self.handle_data(html5.get(name + ';') or html5.get(name) or '&' + name)
+
+    def handle_charref(self, name):
+        base, reference = 10, DECIMAL_REFERENCE
+        if name.startswith(('x', 'X')):
+            name, base, reference = name[1:], 16, HEX_REFERENCE
+
+        extra = ''
+        try:
+            number = int(name, base)
+        except ValueError:
+            # A reference not terminated by ';' ends at the first non-digit
+            match = reference.search(name)
+            if match is None:
+                number, extra = None, name
+            else:
+                number, extra = int(match.group(1), base), match.group(2)
+
+        if number is not None:
+            self.handle_data(numeric_character(number))
+        if extra:
+            self.handle_data(extra)
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def handle_decl(self, decl):
+        self.flush()
+
+    def handle_pi(self, data):
+        self.flush()
+
+    def unknown_decl(self, data):
+        # <![CDATA[...]]> sections always count as text, like BeautifulSoup's CData strings
+        self.flush()
+        if data.startswith('CDATA[') and (self.title_depth is not None or self.collect_text):
+            self.pending.append(data[6:])
+            self.flush(cdata=True)
+
+    def close(self):
+        super().close()
+        self.flush()
+        title = ''.join(self.title_parts) if self.title_parts is not None else None
+        return HtmlSummary(self.script_srcs, self.links, title, ''.join(self.text_parts))
+
+
+def extract_html(document, collect_text=True):
+    """Parse a complete HTML document (str or bytes) and return its HtmlSummary"""
+    if isinstance(document, bytes):
+        document = document.decode('utf-8', errors='replace')
+    extractor = HtmlExtractor(collect_text=collect_text)
+    extractor.feed(document)
+    return extractor.close()
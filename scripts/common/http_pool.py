@@ -0,0 +1,115 @@
+"""
+HTTP Pool - Shared keep-alive HTTP client with per-host concurrency limits
+
+One `requests.Session` backed by a connection pool large enough for the worker
+count, so repeated requests to the same host reuse TLS connections, plus a
+thread pool that fetches many URLs concurrently while capping the number of
+in-flight requests per host.
+"""
+
+import concurrent.futures
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from common.fetcher import USER_AGENT
+
+
+class HostLimiter:
+    def __init__(self, per_host=6):
+        self.per_host = per_host
+        self.semaphores = defaultdict(lambda: threading.BoundedSemaphore(self.per_host))
+        self.lock = threading.Lock()
+
+    def acquire(self, url):
+        """Take one of the request slots for url's host, returning the semaphore to release"""
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            semaphore = self.semaphores[host]
+        semaphore.acquire()
+        return semaphore
+
+    @contextmanager
+    def slot(self, url):
+        """Hold one of the per-host request slots for url's host"""
+        semaphore = self.acquire(url)
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+class SlotRelease:
+    """Closes a streamed response and releases its host slot, once"""
+
+    def __init__(self, close, semaphore):
+        self.close = close
+        self.semaphore = semaphore
+        self.released = False
+
+    def __call__(self):
+        try:
+            self.close()
+        finally:
+            if not self.released:
+                self.released = True
+                self.semaphore.release()
+
+
+def create_session(pool_size=16):
+    """requests.Session with a connection pool sized for pool_size concurrent requests"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+class HttpPool:
+    def __init__(self, max_workers=16, per_host=6, timeout=10):
+        self.timeout = timeout
+        self.session = create_session(max_workers)
+        self.limiter = HostLimiter(per_host)
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            max_workers=int(config.get('http_workers', 16)),
+            per_host=int(config.get('http_per_host', 6)),
+        )
+
+    def get(self, url, **kwargs):
+        """
+        GET through the shared session, waiting for a free slot on url's host. With
+        stream=True the slot is held until the response is closed, so use it as a
+        context manager.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        if not kwargs.get('stream'):
+            with self.limiter.slot(url):
+                return self.session.get(url, **kwargs)
+
+        semaphore = self.limiter.acquire(url)
+        try:
+            response = self.session.get(url, **kwargs)
+        except BaseException:
+            semaphore.release()
+            raise
+        response.close = SlotRelease(response.close, semaphore)
+        return response
+
+    def map(self, fn, items):
+        """Run fn over items concurrently, yielding (item, result) as each completes"""
+        future_to_item = {self.executor.submit(fn, item): item for item in items}
+        for future in concurrent.futures.as_completed(future_to_item):
+            yield future_to_item[future], future.result()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
@@ -0,0 +1,89 @@
+"""
+Library Filter - Precise skipping of third-party JavaScript libraries
+
+Compiles the library names and CDN hosts from `libraries.yaml` into one regex each.
+Names match a script's filename (`jquery.min.js`, `jquery-3.7.1.js`) or an npm-CDN
+path segment (`/vue@3.4.0/`), never an arbitrary substring. After the name only a
+version and build qualifiers (`min`, `core`, `with-locales`, `production`...) may
+follow, so first-party scripts like `vendors~main.js`, `/gtm-config/app.js` or
+`react-app.js` are still fetched. Known library bundles can also be listed by
+SHA-256 and skipped after download wherever they are served from.
+"""
+
+import os
+import re
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+
+import yaml
+
+DEFAULT_LIBRARIES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'libraries.yaml')
+
+# Build qualifiers a library's own filenames use (lodash.core.min.js, moment-with-locales.js)
+BUILD_QUALIFIERS = [
+    'min', 'slim', 'bundle', 'umd', 'esm', 'cjs', 'amd', 'global', 'browser', 'runtime', 'common',
+    'core', 'all', 'full', 'lite', 'with-locales', 'locales', 'debug', 'dev', 'development', 'prod', 'production',
+]
+
+# What may follow a library name in its filename: an optional version, then build qualifiers
+VERSION_SUFFIX = rf"(?:[.\-@]v?\d[\w.\-]*)?(?:[.\-](?:{'|'.join(BUILD_QUALIFIERS)}))*\.m?js$"
+
+
+class LibraryFilter:
+    def __init__(self, names=(), hosts=(), hashes=()):
+        # Longest names first so e.g. react-dom is tried before react
+        names = sorted({name.lower() for name in names}, key=len, reverse=True)
+        hosts = sorted({host.lower() for host in hosts}, key=len, reverse=True)
+        alternation = '|'.join(re.escape(name) for name in names)
+        self.path_regex = re.compile(
+            rf'/(?:{alternation})(?:@[^/]*/|{VERSION_SUFFIX})'
+        ) if names else None
+        self.host_regex = re.compile(
+            rf'(?:^|\.)(?:{"|".join(re.escape(host) for host in hosts)})$'
+        ) if hosts else None
+        self.hashes = {sha256.lower() for sha256 in hashes}
+        self.stats = Counter()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path=None):
+        with open(os.path.expanduser(path or DEFAULT_LIBRARIES_FILE), 'r') as f:
+            data = yaml.safe_load(f) or {}
+        return cls(data.get('names') or [], data.get('hosts') or [], data.get('hashes') or [])
+
+    @classmethod
+    def from_config(cls, config):
+        return cls.from_file(config.get('libraries_file'))
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def is_library_url(self, url):
+        """Check an absolute script URL against the library hosts and names"""
+        parsed = urlparse(url)
+        if self.host_regex and self.host_regex.search((parsed.hostname or '').lower()):
+            self.count('host')
+            return True
+        if self.path_regex and self.path_regex.search(parsed.path.lower()):
+            self.count('name')
+            return True
+        return False
+
+    def is_library_hash(self, sha256):
+        """Check the SHA-256 of a downloaded bundle against the allowlist"""
+        if sha256 in self.hashes:
+            self.count('hash')
+            return True
+        return False
+
+    def summary(self):
+        """One-line count of the scripts skipped this run"""
+        with self.lock:
+            stats = dict(self.stats)
+        return (
+            "Libraries skipped: "
+            f"{stats.get('host', 0)} by host, {stats.get('name', 0)} by name, "
+            f"{stats.get('hash', 0)} by content hash"
+        )
@@ -0,0 +1,196 @@
+"""
+Metrics - Stage timers, counters and byte totals for the Python tools
+
+Each tool keeps one Metrics object and wraps its stages (DNS lookups, fetch,
+render, settle, JS download, regex scan, model call...) in `with
+metrics.stage(name):`. A stage records its call count, total and maximum wall
+time. Totals add up each call's wall time, so stages that run concurrently can
+sum to more than the run took. At exit, `write(path)` saves a JSON summary, or a
+Prometheus textfile (for node_exporter's textfile collector) when the path ends in
+`.prom`.
+
+`profile(key)` is the opt-in per-URL cProfile hook. When profiling is not enabled
+it returns a shared no-op context, so it costs one attribute check per URL. When
+enabled, URLs are profiled one at a time: cProfile follows a single thread and
+only one profiler can be active at once. The JS downloads and model calls a URL
+hands to other threads are not in its profile.
+"""
+
+import cProfile
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+
+NO_PROFILE = nullcontext()
+UNSAFE = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+class Stage:
+    """Context manager timing one call of a stage"""
+
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Profile:
+    """Context manager writing a cProfile dump for one URL"""
+
+    def __init__(self, metrics, key):
+        self.metrics = metrics
+        self.key = key
+        self.profiler = cProfile.Profile()
+
+    def __enter__(self):
+        self.metrics.profile_lock.acquire()
+        self.metrics.local.profiling = True
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.disable()
+        self.metrics.local.profiling = False
+        self.metrics.profile_lock.release()
+        self.profiler.dump_stats(self.metrics.profile_path(self.key))
+        return False
+
+
+class Metrics:
+    def __init__(self, tool):
+        self.tool = tool
+        self.lock = threading.Lock()
+        self.profile_dir = None
+        self.profile_lock = threading.Lock()
+        self.local = threading.local()
+        self.reset()
+
+    def reset(self):
+        """Start a new run, such as a daemon's next job; profiling stays as it was"""
+        with self.lock:
+            self.started_at = time.time()
+            self.start = time.perf_counter()
+            self.stages = {}
+            self.counters = Counter()
+            self.bytes = Counter()
+
+    def stage(self, name):
+        """`with metrics.stage(name):` times one call of a stage"""
+        return Stage(self, name)
+
+    def observe(self, name, seconds):
+        with self.lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                self.stages[name] = [1, seconds, seconds]
+            else:
+                stage[0] += 1
+                stage[1] += seconds
+                stage[2] = max(stage[2], seconds)
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    def add_bytes(self, name, value):
+        with self.lock:
+            self.bytes[name] += value
+
+    def enable_profiling(self, directory):
+        self.profile_dir = os.path.expanduser(directory)
+        os.makedirs(self.profile_dir, exist_ok=True)
+
+    def profile(self, key):
+        """`with metrics.profile(url):` dumps a cProfile of the block when profiling is enabled"""
+        # A block inside a URL's profile (pipeline.py's extraction) is part of that profile
+        if self.profile_dir is None or getattr(self.local, 'profiling', False):
+            return NO_PROFILE
+        return Profile(self, key)
+
+    def profile_path(self, key):
+        # Readable and unique: the URL's safe characters plus a short hash of the whole URL
+        slug = UNSAFE.sub('_', key.split('://', 1)[-1]).strip('_')[:80]
+        digest = hashlib.sha256(key.encode()).hexdigest()[:8]
+        return os.path.join(self.profile_dir, f"{self.tool}-{slug}-{digest}.prof")
+
+    def snapshot(self):
+        """All metrics as a JSON-serializable dict"""
+        with self.lock:
+            stages = {
+                name: {'calls': calls, 'seconds': round(total, 6), 'avg': round(total / calls, 6), 'max': round(longest, 6)}
+                for name, (calls, total, longest) in self.stages.items()
+            }
+            return {
+                'tool': self.tool,
+                'started_at': self.started_at,
+                'elapsed': round(time.perf_counter() - self.start, 6),
+                'stages': stages,
+                'counters': dict(self.counters),
+                'bytes': dict(self.bytes),
+            }
+
+    def prometheus(self):
+        """All metrics in the Prometheus text exposition format"""
+        data = self.snapshot()
+        tool = data['tool']
+        lines = [
+            '# HELP bbscripts_run_seconds Wall time of the run',
+            '# TYPE bbscripts_run_seconds gauge',
+            f'bbscripts_run_seconds{{tool="{tool}"}} {data["elapsed"]}',
+            '# HELP bbscripts_run_timestamp_seconds Start time of the run',
+            '# TYPE bbscripts_run_timestamp_seconds gauge',
+            f'bbscripts_run_timestamp_seconds{{tool="{tool}"}} {data["started_at"]:.3f}',
+        ]
+        series = [
+            ('stage_calls', 'Calls of each stage', 'counter', {name: stage['calls'] for name, stage in data['stages'].items()}, 'stage'),
+            ('stage_seconds', 'Total wall time spent in each stage', 'counter', {name: stage['seconds'] for name, stage in data['stages'].items()}, 'stage'),
+            ('stage_max_seconds', 'Longest single call of each stage', 'gauge', {name: stage['max'] for name, stage in data['stages'].items()}, 'stage'),
+            ('events', 'Events counted during the run', 'counter', data['counters'], 'name'),
+            ('bytes', 'Bytes processed during the run', 'counter', data['bytes'], 'name'),
+        ]
+        for metric, help_text, kind, values, label in series:
+            if not values:
+                continue
+            name = f'bbscripts_{metric}_total' if kind == 'counter' else f'bbscripts_{metric}'
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for key, value in sorted(values.items()):
+                lines.append(f'{name}{{tool="{tool}",{label}="{key}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write a JSON summary, or a Prometheus textfile if path ends in .prom"""
+        path = os.path.expanduser(path)
+        text = self.prometheus() if path.endswith('.prom') else json.dumps(self.snapshot(), indent=2) + '\n'
+        # Written next to the target and renamed, so collectors never read half a file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def summary(self, limit=8):
+        """One line with the stages that took the most time"""
+        with self.lock:
+            stages = sorted(self.stages.items(), key=lambda item: item[1][1], reverse=True)
+        if not stages:
+            return "Stage times: nothing recorded"
+        parts = [f"{name} {calls}x {duration(total / calls)} avg ({total:.1f}s)" for name, (calls, total, _) in stages[:limit]]
+        return "Stage times: " + ', '.join(parts)
+
+
+def duration(seconds):
+    return f"{seconds * 1000:.1f}ms" if seconds < 1 else f"{seconds:.2f}s"
@@ -0,0 +1,317 @@
+"""
+Notify - Coalescing Discord webhook dispatcher with a durable outbox
+
+Tools queue one text block per finding with the target (site) it belongs to.
+Blocks are written to a SQLite outbox and the call returns at once. A background
+sender thread, started by the first block queued, waits until a target's oldest block is `window` seconds old, then
+packs all of that target's blocks into as few messages as Discord's 2000-character
+limit allows. Each message is posted over one keep-alive session.
+
+A 429 is retried after its Retry-After (header or JSON `retry_after`). When the
+rate-limit headers say the bucket is empty, the sender waits for it to reset
+before the next post. Connection errors and 5xx responses leave the blocks in the
+outbox with exponential backoff. Blocks still unsent at exit, or after a crash,
+are sent by the next process that queues to the outbox. Rows are leased while a sender
+holds them, and the lease is renewed before every post and while waiting out a rate
+limit, so several processes can share one outbox without sending twice.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+import requests
+
+DEFAULT_OUTBOX = '~/.cache/bb-scripts/outbox.sqlite'
+
+# Discord rejects message content longer than this
+MAX_MESSAGE = 2000
+
+# Seconds a sender may hold rows before another process may take them over
+LEASE = 120
+
+SENT, RETRY, DROP, LOST = 'sent', 'retry', 'drop', 'lost'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    webhook TEXT NOT NULL,
+    title TEXT NOT NULL,
+    target TEXT NOT NULL,
+    body TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    lease_until REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (next_attempt, lease_until);
+"""
+
+
+def is_configured(webhook_url):
+    return bool(webhook_url) and 'YOUR_WEBHOOK_URL' not in webhook_url
+
+
+def pack(title, target, bodies, limit=MAX_MESSAGE):
+    """Group bodies (id, text) into messages under limit: returns [(content, [ids])]"""
+    header = f"{title} - {target}\n\n"
+    room = limit - len(header)
+    messages = []
+    parts, ids, size = [], [], 0
+    for row_id, body in bodies:
+        if len(body) > room:
+            body = body[:room - 3] + '...'
+        if parts and size + len(body) > room:
+            messages.append((header + '\n\n'.join(parts), ids))
+            parts, ids, size = [], [], 0
+        parts.append(body)
+        ids.append(row_id)
+        size += len(body) + 2
+    if parts:
+        messages.append((header + '\n\n'.join(parts), ids))
+    return messages
+
+
+class Notifier:
+    def __init__(self, webhook_url, title, outbox=DEFAULT_OUTBOX, window=10.0, flush_timeout=30.0, max_attempts=8):
+        self.webhook_url = webhook_url
+        self.title = title
+        self.path = os.path.expanduser(outbox)
+        self.window = window
+        self.flush_timeout = flush_timeout
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        # Queued rows survive a crash of this process; only a power loss can lose the last ones
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+        self.owner = f"{os.getpid()}:{id(self)}"
+        self.lock = threading.Lock()
+        self.session = requests.Session()
+        self.stats = Counter()
+        # Time before which the webhook's rate-limit bucket is known to be empty
+        self.blocked_until = 0.0
+        self.deadline = None
+        self.left = None
+        self.wake = threading.Event()
+        self.stopping = False
+        # Started on the first queue(), so runs that never notify leave the outbox alone
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    @classmethod
+    def from_config(cls, config, title):
+        """Notifier for the config's discord_webhook_url, or None if it is not configured"""
+        webhook_url = config.get('discord_webhook_url')
+        if not is_configured(webhook_url):
+            return None
+        return cls(
+            webhook_url,
+            title,
+            outbox=config.get('notify_outbox_file', DEFAULT_OUTBOX),
+            window=float(config.get('notify_window', 10)),
+            flush_timeout=float(config.get('notify_flush_timeout', 30)),
+        )
+
+    def queue(self, target, body):
+        """Add a finding's text to the outbox; it is sent with the target's other findings"""
+        with self.lock:
+            self.db.execute(
+                'INSERT INTO outbox (webhook, title, target, body, created_at) VALUES (?, ?, ?, ?, ?)',
+                (self.webhook_url, self.title, target, body, time.time()),
+            )
+            self.stats['queued'] += 1
+            if not self.thread.ident:
+                self.thread.start()
+        self.wake.set()
+
+    def run(self):
+        while not self.stopping:
+            try:
+                delay = self.send_due()
+            except Exception as e:
+                print(f"Error sending Discord notifications: {e}")
+                delay = self.window
+            self.wake.wait(delay)
+            self.wake.clear()
+
+    def claim(self, flush):
+        """Lease the rows that are due; returns ({(webhook, title, target): [(id, body)]}, seconds until more are due)"""
+        now = time.time()
+        with self.lock:
+            self.db.execute('BEGIN IMMEDIATE')
+            try:
+                rows = self.db.execute(
+                    'SELECT id, webhook, title, target, body, created_at FROM outbox '
+                    'WHERE next_attempt <= ? AND lease_until <= ? ORDER BY id',
+                    (now, now),
+                ).fetchall()
+                groups = {}
+                oldest = {}
+                for row_id, webhook, title, target, body, created_at in rows:
+                    key = (webhook, title, target)
+                    groups.setdefault(key, []).append((row_id, body))
+                    oldest[key] = min(oldest.get(key, created_at), created_at)
+
+                # A target is sent once its oldest block has waited out the window
+                due = {key: bodies for key, bodies in groups.items() if flush or now - oldest[key] >= self.window}
+                ids = [row_id for bodies in due.values() for row_id, _ in bodies]
+                for start in range(0, len(ids), 500):
+                    batch = ids[start:start + 500]
+                    self.db.execute(
+                        f"UPDATE outbox SET lease_until = ?, lease_owner = ? WHERE id IN ({', '.join('?' * len(batch))})",
+                        [now + LEASE, self.owner] + batch,
+                    )
+                self.db.execute('COMMIT')
+            except Exception:
+                self.db.execute('ROLLBACK')
+                raise
+
+        waiting = [self.window - (now - oldest[key]) for key in groups if key not in due]
+        return due, max(0.1, min(waiting, default=self.window))
+
+    def send_due(self, flush=False):
+        due, delay = self.claim(flush or self.deadline is not None)
+        for (webhook, title, target), bodies in due.items():
+            for content, ids in pack(title, target, bodies):
+                outcome = self.post(webhook, content, ids)
+                self.finish(ids, outcome)
+        return delay
+
+    def renew(self, ids):
+        """Extend this sender's lease on ids; False (and the rest released) if any was taken over"""
+        placeholders = ', '.join('?' * len(ids))
+        with self.lock:
+            renewed = self.db.execute(
+                f"UPDATE outbox SET lease_until = ? WHERE lease_owner = ? AND id IN ({placeholders})",
+                [time.time() + LEASE, self.owner] + ids,
+            ).rowcount
+            if renewed == len(ids):
+                return True
+            self.db.execute(
+                f"UPDATE outbox SET lease_until = 0 WHERE lease_owner = ? AND id IN ({placeholders})",
+                [self.owner] + ids,
+            )
+        print(f"Lost the lease on {len(ids) - renewed} queued Discord notifications to another sender")
+        return False
+
+    def post(self, webhook, content, ids):
+        while True:
+            # Another process may claim rows whose lease ran out, so hold it while waiting
+            if not self.renew(ids):
+                return LOST
+            wait = self.blocked_until - time.time()
+            if wait > 0:
+                if self.deadline and time.time() + wait > self.deadline:
+                    return RETRY
+                time.sleep(min(wait, LEASE / 4))
+                continue
+            try:
+                response = self.session.post(webhook, json={'content': content}, timeout=15)
+            except requests.RequestException as e:
+                print(f"Error sending Discord notification: {e}")
+                return RETRY
+
+            # Wait for the bucket to refill instead of running into a 429
+            if response.headers.get('X-RateLimit-Remaining') == '0':
+                reset_after = float(response.headers.get('X-RateLimit-Reset-After') or 1)
+                self.blocked_until = max(self.blocked_until, time.time() + reset_after)
+
+            if response.status_code < 300:
+                self.stats['messages'] += 1
+                return SENT
+            if response.status_code == 429:
+                self.stats['rate_limited'] += 1
+                self.blocked_until = max(self.blocked_until, time.time() + retry_after(response))
+                continue
+            if response.status_code >= 500:
+                print(f"Discord webhook returned {response.status_code}, will retry")
+                return RETRY
+            print(f"Discord webhook rejected a message ({response.status_code}): {response.text[:200]}")
+            return DROP
+
+    def finish(self, ids, outcome):
+        if outcome == LOST:
+            # The rows now belong to the sender that took them over
+            return
+        placeholders = ', '.join('?' * len(ids))
+        with self.lock:
+            if outcome == RETRY:
+                self.db.execute(
+                    f"UPDATE outbox SET attempts = attempts + 1, lease_until = 0, "
+                    f"next_attempt = ? + MIN(300, 1 << attempts) WHERE id IN ({placeholders})",
+                    [time.time()] + ids,
+                )
+                dropped = self.db.execute(
+                    f"DELETE FROM outbox WHERE attempts >= ? AND id IN ({placeholders})",
+                    [self.max_attempts] + ids,
+                ).rowcount
+                self.stats['dropped'] += dropped
+                if dropped:
+                    print(f"Dropped {dropped} Discord notifications after {self.max_attempts} attempts")
+            else:
+                self.db.execute(f"DELETE FROM outbox WHERE id IN ({placeholders})", ids)
+                self.stats['sent' if outcome == SENT else 'dropped'] += len(ids)
+
+    def pending(self):
+        if self.left is not None:
+            return self.left
+        with self.lock:
+            return self.db.execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+
+    def close(self):
+        """Send everything queued (up to flush_timeout); what is left stays in the outbox"""
+        if not self.thread.ident:
+            self.session.close()
+            self.left = self.pending()
+            with self.lock:
+                self.db.close()
+            return
+        self.deadline = time.time() + self.flush_timeout
+        while time.time() < self.deadline:
+            self.wake.set()
+            with self.lock:
+                # Rows due before the deadline, including those this sender is posting now
+                due = self.db.execute(
+                    'SELECT COUNT(*) FROM outbox WHERE next_attempt <= ? AND (lease_until <= ? OR lease_owner = ?)',
+                    (self.deadline, time.time(), self.owner),
+                ).fetchone()[0]
+            if not due:
+                break
+            time.sleep(0.05)
+        self.stopping = True
+        self.wake.set()
+        self.thread.join(timeout=max(0.0, self.deadline - time.time()) + 1)
+        self.session.close()
+        left = self.pending()
+        # A sender still posting past the deadline is a daemon thread and ends with the process
+        if not self.thread.is_alive():
+            with self.lock:
+                self.db.close()
+            self.left = left
+
+    def summary(self):
+        """One-line notification statistics for this run"""
+        with self.lock:
+            stats = dict(self.stats)
+        pending = self.pending()
+        return (
+            f"Notifications: {stats.get('queued', 0)} queued, {stats.get('sent', 0)} sent in "
+            f"{stats.get('messages', 0)} messages, {stats.get('rate_limited', 0)} rate limited, "
+            f"{stats.get('dropped', 0)} dropped, {pending} left in the outbox"
+        )
+
+
+def retry_after(response):
+    """Seconds to wait after a 429, from the Retry-After header or Discord's JSON body"""
+    try:
+        return float(response.json().get('retry_after'))
+    except (ValueError, TypeError, AttributeError):
+        pass
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return 1.0
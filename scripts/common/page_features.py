@@ -0,0 +1,258 @@
+"""
+Page Features - Token-budgeted extraction of the high-signal parts of an HTML page
+
+Instead of taking the first few thousand characters of get_text(), collect the parts
+of a page that say what it is for, in priority order: meta tags, headings, forms
+and their fields, link text, then the remaining visible text. Each section has a
+share of a token budget; space a section does not use goes to the next ones in
+priority order. The document is fed to the parser in chunks and parsing stops once
+every section has filled its share, or a fixed lookahead after enough has been
+collected to fill the budget, so large pages are not walked to the end for text
+that would be thrown away.
+"""
+
+import re
+from html.parser import HTMLParser
+
+# Rough token estimate for prompt text
+CHARS_PER_TOKEN = 4
+
+# (section, share of the token budget), highest priority first
+SECTIONS = [
+    ('meta', 0.10),
+    ('headings', 0.15),
+    ('forms', 0.25),
+    ('links', 0.15),
+    ('text', 0.35),
+]
+
+# Once enough has been collected to fill the budget, keep parsing this much further for
+# higher-priority sections (a login form below a long header) and then stop
+LOOKAHEAD = 64 * 1024
+
+FEED_CHUNK = 16 * 1024
+MAX_TITLE = 200
+MAX_ITEM = 200
+MAX_HREF = 40
+
+META_NAMES = frozenset([
+    'description', 'keywords', 'generator', 'application-name', 'author',
+    'og:title', 'og:site_name', 'og:description', 'twitter:title',
+])
+HEADINGS = frozenset(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+SKIPPED = frozenset(['script', 'style', 'template', 'svg'])
+# Elements whose text is recorded as a link, form control or heading rather than as text
+LABELLED = frozenset(['a', 'button', 'label', 'option', 'title']) | HEADINGS
+WHITESPACE = re.compile(r'\s+')
+
+
+def clean(text, limit=MAX_ITEM):
+    return WHITESPACE.sub(' ', text).strip()[:limit]
+
+
+class PageFeatures:
+    def __init__(self, title, sections, scanned, complete):
+        self.title = title
+        self.sections = sections
+        self.scanned = scanned
+        self.complete = complete
+
+    def render(self, token_budget):
+        """Prompt text filling token_budget by section priority"""
+        # Leave room for the section labels and newlines
+        budget = token_budget * CHARS_PER_TOKEN - 12 * len(SECTIONS)
+        allowance = {name: int(budget * share) for name, share in SECTIONS}
+        sizes = {name: sum(len(item) + 3 for item in self.sections[name]) for name, _ in SECTIONS}
+
+        # Shares a section does not need go to the sections after it
+        spare = 0
+        for name, _ in SECTIONS:
+            spare += allowance[name] - min(allowance[name], sizes[name])
+        for name, _ in SECTIONS:
+            extra = min(spare, max(0, sizes[name] - allowance[name]))
+            allowance[name] += extra
+            spare -= extra
+
+        lines = []
+        for name, _ in SECTIONS:
+            items = []
+            remaining = allowance[name]
+            for item in self.sections[name]:
+                if remaining <= 0:
+                    break
+                items.append(item[:remaining])
+                remaining -= len(item) + 3
+            if items:
+                separator = ' ' if name == 'text' else ' | '
+                lines.append(f"{name.capitalize()}: {separator.join(items)}")
+        return '\n'.join(lines)
+
+
+class FeatureExtractor(HTMLParser):
+    """
+    feed() chunks of a document until `full`, then close() to get its PageFeatures.
+    """
+
+    def __init__(self, token_budget):
+        super().__init__(convert_charrefs=True)
+        self.budget = token_budget * CHARS_PER_TOKEN
+        self.shares = {name: int(self.budget * share) for name, share in SECTIONS}
+        self.sections = {name: [] for name, _ in SECTIONS}
+        self.sizes = {name: 0 for name, _ in SECTIONS}
+        self.skip_depth = 0
+        self.title = None
+        self.capture = None
+        self.capture_parts = []
+        self.form = None
+        self.loose_fields = []
+        self.scanned = 0
+        self.filled_at = None
+        self.seen = set()
+
+    @property
+    def full(self):
+        """True once every section has its share, or LOOKAHEAD after the budget could be filled"""
+        if all(self.sizes[name] >= self.shares[name] for name in self.sizes):
+            return True
+        if self.filled_at is None:
+            if sum(min(size, self.budget) for size in self.sizes.values()) >= self.budget:
+                self.filled_at = self.scanned
+            return False
+        return self.scanned - self.filled_at >= LOOKAHEAD
+
+    def add(self, section, item):
+        # Sections keep collecting past their share (up to the whole budget) so that
+        # space left by other sections can be filled
+        if item and self.sizes[section] < self.budget:
+            if section in ('headings', 'links'):
+                if (section, item) in self.seen:
+                    return
+                self.seen.add((section, item))
+            self.sections[section].append(item)
+            self.sizes[section] += len(item) + 1
+
+    def add_field(self, field):
+        if self.sizes['forms'] < self.budget:
+            fields = self.form[1] if self.form is not None else self.loose_fields
+            fields.append(field)
+            self.sizes['forms'] += len(field) + 2
+
+    def feed(self, data):
+        self.scanned += len(data)
+        super().feed(data)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED:
+            self.skip_depth += 1
+        if self.skip_depth:
+            return
+        attributes = dict(attrs)
+
+        if tag == 'meta':
+            name = (attributes.get('name') or attributes.get('property') or '').lower()
+            content = attributes.get('content')
+            if name in META_NAMES and content:
+                self.add('meta', f"{name}: {clean(content)}")
+        elif tag in LABELLED:
+            self.finish_capture()
+            self.capture = (tag, attributes)
+            self.capture_parts = []
+        elif tag == 'form':
+            self.finish_form()
+            method = (attributes.get('method') or 'get').upper()
+            self.form = (f"form {method} {clean(attributes.get('action') or '', MAX_HREF)}".rstrip(), [])
+            self.sizes['forms'] += len(self.form[0]) + 3
+        elif tag == 'input':
+            kind = (attributes.get('type') or 'text').lower()
+            name = attributes.get('name') or attributes.get('id') or ''
+            if kind in ('submit', 'button', 'reset'):
+                label = attributes.get('value') or name
+                self.add_field(f'{kind} "{clean(label, 60)}"')
+            else:
+                hint = attributes.get('placeholder') or attributes.get('aria-label') or ''
+                field = f"{kind} {clean(name, 60)}".rstrip()
+                self.add_field(f'{field} "{clean(hint, 60)}"' if hint else field)
+        elif tag in ('select', 'textarea'):
+            name = attributes.get('name') or attributes.get('id')
+            if name:
+                self.add_field(f"{tag} {clean(name, 60)}")
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in ('meta', 'input'):
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif self.skip_depth:
+            return
+        elif self.capture and self.capture[0] == tag:
+            self.finish_capture()
+        elif tag == 'form':
+            self.finish_form()
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        if self.capture:
+            self.capture_parts.append(data)
+            if len(self.capture_parts) > 20:
+                # An element left open (<a> without </a>) does not swallow the page
+                self.finish_capture()
+        else:
+            self.add('text', clean(data))
+
+    def finish_capture(self):
+        if not self.capture:
+            return
+        tag, attributes = self.capture
+        text = clean(''.join(self.capture_parts))
+        self.capture = None
+        self.capture_parts = []
+
+        if tag == 'title':
+            if self.title is None:
+                self.title = text[:MAX_TITLE]
+        elif tag in HEADINGS:
+            if text:
+                self.add('headings', f"{tag} {text}")
+        elif tag == 'a':
+            text = text or clean(attributes.get('aria-label') or attributes.get('title') or '')
+            # The path says more than the query string and fragment
+            href = (attributes.get('href') or '').split('?')[0].split('#')[0]
+            if not href or href.startswith('javascript:'):
+                self.add('text', text)
+            else:
+                self.add('links', f"{text} ({clean(href, MAX_HREF)})" if text else clean(href, MAX_HREF))
+        elif tag in ('button', 'label'):
+            if text:
+                self.add_field(f'{tag} "{clean(text, 60)}"')
+        elif tag == 'option':
+            # Option lists are long and rarely tell what a page is for
+            pass
+
+    def finish_form(self):
+        # Form sizes were counted field by field as they were collected
+        if self.form is not None:
+            header, fields = self.form
+            self.form = None
+            self.sections['forms'].append(f"{header} [{', '.join(fields)}]")
+
+    def close(self, complete=True):
+        super().close()
+        self.finish_capture()
+        self.finish_form()
+        if self.loose_fields:
+            self.sections['forms'].append(f"fields [{', '.join(self.loose_fields)}]")
+        return PageFeatures(self.title, self.sections, self.scanned, complete)
+
+
+def extract_features(document, token_budget=500):
+    """Parse an HTML document (str or bytes) until token_budget is filled and return its PageFeatures"""
+    if isinstance(document, bytes):
+        document = document.decode('utf-8', errors='replace')
+    extractor = FeatureExtractor(token_budget)
+    while extractor.scanned < len(document) and not extractor.full:
+        extractor.feed(document[extractor.scanned:extractor.scanned + FEED_CHUNK])
+    return extractor.close(complete=extractor.scanned >= len(document))
@@ -0,0 +1,46 @@
+"""
+Rate Limit - Token buckets for pacing requests to external services
+
+`TokenBucket` keeps the (thread-safe) token count and `AsyncTokenBucket` waits on it
+from asyncio tasks. Buckets allow bursts of up to `burst` requests and refill at
+`rate` tokens per second; a rate of 0 or less disables limiting.
+"""
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self):
+        """Take a token if one is available, otherwise return the seconds until one is"""
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+class AsyncTokenBucket(TokenBucket):
+    async def acquire(self):
+        """Wait without blocking the event loop until a token is available"""
+        while True:
+            wait = self.delay()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
@@ -0,0 +1,87 @@
+"""
+Page Settle - Adaptive wait for Selenium page loads
+
+Replaces a fixed sleep after page load with a poll that returns as soon as the page
+is quiet: `document.readyState` is complete and neither the DOM mutation count nor
+the number of loaded resources (a network idle proxy) has changed for a short quiet
+window. A ceiling bounds the wait for pages that never go quiet.
+"""
+
+import threading
+import time
+
+SETTLE_SCRIPT = """
+if (!window.__bbSettle) {
+    window.__bbSettle = {mutations: 0};
+    new MutationObserver(function (records) {
+        window.__bbSettle.mutations += records.length;
+    }).observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+return [document.readyState, window.__bbSettle.mutations, performance.getEntriesByType('resource').length];
+"""
+
+
+class PageSettler:
+    def __init__(self, timeout=10.0, quiet_window=0.5, poll_interval=0.1):
+        self.timeout = timeout
+        self.quiet_window = quiet_window
+        self.poll_interval = poll_interval
+        self.timings = []
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            timeout=float(config.get('settle_timeout', 10)),
+            quiet_window=float(config.get('settle_quiet_window', 0.5)),
+        )
+
+    def wait(self, driver, url=None):
+        """Block until the page in driver is quiet or the ceiling is hit, returns seconds waited"""
+        start = time.monotonic()
+        last_state = None
+        quiet_since = None
+        timed_out = True
+
+        while time.monotonic() - start < self.timeout:
+            try:
+                ready_state, mutations, resources = driver.execute_script(SETTLE_SCRIPT)
+            except Exception:
+                # Page navigated or script blocked, keep polling until the ceiling
+                ready_state, mutations, resources = None, None, None
+
+            now = time.monotonic()
+            state = (mutations, resources)
+            if ready_state == 'complete' and state == last_state:
+                if quiet_since is None:
+                    quiet_since = now
+                elif now - quiet_since >= self.quiet_window:
+                    timed_out = False
+                    break
+            else:
+                quiet_since = None
+            last_state = state
+            time.sleep(self.poll_interval)
+
+        elapsed = time.monotonic() - start
+        with self.lock:
+            self.timings.append((url, elapsed, timed_out))
+        return elapsed
+
+    def summary(self):
+        """One-line distribution of recorded settle times"""
+        with self.lock:
+            durations = sorted(elapsed for _, elapsed, _ in self.timings)
+            timeouts = sum(1 for _, _, timed_out in self.timings if timed_out)
+        if not durations:
+            return "Settle times: no pages loaded"
+
+        def percentile(p):
+            return durations[min(len(durations) - 1, int(p * len(durations)))]
+
+        return (
+            f"Settle times over {len(durations)} pages: "
+            f"min {durations[0]:.2f}s, median {percentile(0.5):.2f}s, "
+            f"p90 {percentile(0.9):.2f}s, max {durations[-1]:.2f}s, "
+            f"{timeouts} hit the {self.timeout:.0f}s ceiling"
+        )
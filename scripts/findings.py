@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""
+Findings - Query the findings recorded by Keyword Hunter and Webpage Analyzer
+
+Reads the findings store (common/findings_store.py) that both tools and
+pipeline.py write to, without rescanning anything. Filters combine: target site,
+keyword group or category, tool, time range, and substrings of the match or
+source URL. Prints one finding per line, or JSON lines with --json. --counts
+prints the number of findings per target and group instead.
+
+Usage:
+    python3 findings.py -t example.com -g "JWT Tokens" --since 30d
+    python3 findings.py --tool webpage_analyzer -g login_portal --since 2026-10-01
+    python3 findings.py --match AKIA --json | jq .source_url
+    python3 findings.py --counts --since 7d
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+from common.findings_store import DEFAULT_PATH, FindingsStore
+
+RELATIVE = re.compile(r'^(\d+)([mhdw])$')
+UNITS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400}
+
+
+def parse_time(value):
+    """Timestamp from a relative age (30m, 12h, 30d, 2w) or a date (2026-10-01, 2026-10-01T12:00)"""
+    match = RELATIVE.match(value)
+    if match:
+        return time.time() - int(match.group(1)) * UNITS[match.group(2)]
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an age like 30d or a date like 2026-10-01, got {value!r}")
+
+
+def format_finding(finding):
+    seen = datetime.fromtimestamp(finding['first_seen']).strftime('%Y-%m-%d %H:%M')
+    repeats = f" (seen {finding['seen_count']} times)" if finding['seen_count'] > 1 else ''
+    if finding['tool'] == 'webpage_analyzer':
+        detail = f"{finding['source_url']} {finding['match'] or ''} (confidence: {finding['confidence']:.2f})"
+    else:
+        detail = f"{(finding['match'] or '')[:100]}  {finding['source_url']}"
+    return f"{seen}  {finding['target']}  [{finding['category']}]  {detail}{repeats}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query recorded keyword findings and page classifications")
+    parser.add_argument('-t', '--target', help='Target site, host or URL (findings are grouped by site, e.g. example.com)')
+    parser.add_argument('-g', '--group', help='Keyword group (e.g. "JWT Tokens") or page category (e.g. login_portal)')
+    parser.add_argument('--tool', choices=['keyword_hunter', 'webpage_analyzer'], help='Only findings from this tool')
+    parser.add_argument('--since', type=parse_time, help='First seen at or after: age (30d, 12h) or date (2026-10-01)')
+    parser.add_argument('--until', type=parse_time, help='First seen before: age or date')
+    parser.add_argument('--match', help='Substring of the matched text (or page title)')
+    parser.add_argument('--source', help='Substring of the source URL')
+    parser.add_argument('-n', '--limit', type=int, help='At most this many findings, newest first')
+    parser.add_argument('--json', action='store_true', help='Print JSON lines with every stored field')
+    parser.add_argument('--counts', action='store_true', help='Print the number of findings per target and group')
+    parser.add_argument('--db', default=DEFAULT_PATH, help=f'Findings store path (default {DEFAULT_PATH})')
+    args = parser.parse_args()
+
+    store = FindingsStore(args.db)
+    try:
+        findings = store.query(
+            target=args.target,
+            category=args.group,
+            tool=args.tool,
+            since=args.since,
+            until=args.until,
+            match=args.match,
+            source=args.source,
+            limit=args.limit,
+        )
+    finally:
+        store.close()
+
+    if args.counts:
+        counts = Counter((finding['target'], finding['category']) for finding in findings)
+        for (target, category), count in counts.most_common():
+            print(f"{count:6d}  {target}  [{category}]")
+    elif args.json:
+        for finding in findings:
+            print(json.dumps(finding))
+    else:
+        for finding in findings:
+            print(format_finding(finding))
+
+    if not findings:
+        print("No findings match", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,107 +4,329 @@
 JavaScript File Downloader - Multi-threaded JS File Discovery and Download Tool
 
 This script discovers and downloads JavaScript files from web pages provided via stdin.
-It filters out common libraries (jQuery, Bootstrap, etc.) and saves unique JS files with
-source attribution. Supports multi-threading for concurrent downloads and verbose output.
+It skips third-party libraries (by filename, CDN host or known bundle hash; see
+common/libraries.yaml) and saves unique JS files with source attribution. JS URLs are
+deduplicated across all pages before download, and bodies are saved once under their
+SHA-256 (<sha256>.js) with a manifest.jsonl that maps each webpage URL -> JS URL ->
+content hash. Each page is fetched once by a pool of page workers; the JS URLs it
+references go onto a shared queue drained by a pool of JS workers. Every worker has its
+own keep-alive session, requests have a timeout and are capped per host, and a
+pages/s and bytes/s summary is printed at the end. --metrics writes per-stage timings
+and counters (JSON or a Prometheus textfile) and --profile a cProfile dump per page.
 
 Usage:
     cat urls.txt | python3 js_downloader.py -t 5 -v
     echo "https://example.com" | python3 js_downloader.py --threads 10 --verbose
+    cat urls.txt | python3 js_downloader.py -t 8 -j 32 --timeout 15 --per-host 4
+    cat urls.txt | python3 js_downloader.py -t 8 --metrics js_downloader.prom
 """
 
+import hashlib
+import json
 import os
-import requests
 import threading
 import sys
-import uuid
 import time
 import random
 import string
+from collections import Counter
+from itertools import chain
 from queue import Queue
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from click import command, option, secho, style
 
-# List of common libraries to ignore
-COMMON_LIBRARIES = [
-    'jquery', 'bootstrap', 'angular', 'react', 'vue', 'lodash', 'moment', 'underscore'
-]
+from common.html_extract import extract_html
+from common.http_pool import HostLimiter, create_session
+from common.library_filter import LibraryFilter
+from common.metrics import Metrics
 
 # Directory to save webpages
 DOWNLOADS_DIR = 'fetched-webpages'
 
+# Maps each webpage URL -> JS URL -> content hash, one JSON object per line
+MANIFEST_FILE = 'manifest.jsonl'
+
+# Marks the end of a work queue; each worker consumes exactly one
+STOP = None
+
 def generate_random_string(length=16):
     characters = string.ascii_letters + string.digits
     return ''.join(random.choices(characters.lower(), k=length))
 
-# Function to download a single JS file
-def download_js_file(url, webpage_url, verbose):
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            filename = os.path.join(DOWNLOADS_DIR, generate_random_string() + ".js")
-            with open(filename, 'wb') as file:
+
+class DownloadStats:
+    def __init__(self):
+        self.counts = Counter()
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+
+    def add(self, key, amount=1):
+        with self.lock:
+            self.counts[key] += amount
+
+    def summary(self):
+        """One-line throughput statistics for this run"""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        with self.lock:
+            counts = dict(self.counts)
+        pages = counts.get('pages', 0)
+        total_bytes = counts.get('bytes', 0)
+        return (
+            f"Fetched {pages} pages ({counts.get('page_failures', 0)} failed), "
+            f"{counts.get('js', 0)} JS files ({counts.get('js_failures', 0)} failed, "
+            f"{counts.get('js_duplicate_urls', 0)} duplicate URLs skipped, "
+            f"{counts.get('js_duplicate_content', 0)} duplicate contents not saved), "
+            f"{total_bytes / 1024 / 1024:.1f} MB in {elapsed:.1f}s: "
+            f"{pages / elapsed:.1f} pages/s, {total_bytes / 1024 / elapsed:.1f} KB/s"
+        )
+
+
+class JsStore:
+    """
+    Content-addressed JS output: each unique body is saved once as <sha256>.js and
+    manifest.jsonl records every (webpage, JS URL, sha256) reference, including
+    references to URLs that were already downloaded for another page.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.hashes = {}
+        self.waiting = {}
+        self.saved = set()
+        self.manifest = open(os.path.join(directory, MANIFEST_FILE), 'a')
+
+    def claim(self, js_url, webpage_url):
+        """Record a reference to js_url, returns True if it still has to be downloaded"""
+        with self.lock:
+            if js_url in self.hashes:
+                if self.hashes[js_url]:
+                    self.write_manifest(webpage_url, js_url, self.hashes[js_url])
+                return False
+            if js_url in self.waiting:
+                self.waiting[js_url].append(webpage_url)
+                return False
+            self.waiting[js_url] = [webpage_url]
+            return True
+
+    def save(self, js_url, webpage_url, content):
+        """Save downloaded content, returns (sha256, whether it was new)"""
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = os.path.join(self.directory, sha256 + '.js')
+        with self.lock:
+            new = sha256 not in self.saved and not os.path.exists(path)
+            self.saved.add(sha256)
+        if new:
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as file:
                 file.write(f"// Webpage URL: {webpage_url}\n".encode())
-                file.write(f"// Source: {url}\n".encode())
-                file.write(response.content)
-            if verbose:
-                secho(f"[OK] {url}", fg='green')
-        else:
-            if verbose:
-                secho(f"[FAILED] {url} - HTTP status: {response.status_code}", fg='red')
-    except Exception as e:
-        if verbose:
-            secho(f"[FAILED] {url}", fg='red')
-
-# Function to download a single webpage
-def download_webpage(url, verbose):
-    try:
-        response = requests.get(url)
+                file.write(f"// Source: {js_url}\n".encode())
+                file.write(content)
+            os.replace(tmp_path, path)
+        self.resolve(js_url, sha256)
+        return sha256, new
+
+    def resolve(self, js_url, sha256):
+        """Write manifest rows for every page waiting on js_url (sha256 is None on failure)"""
+        with self.lock:
+            self.hashes[js_url] = sha256
+            for webpage_url in self.waiting.pop(js_url, []):
+                if sha256:
+                    self.write_manifest(webpage_url, js_url, sha256)
+
+    def write_manifest(self, webpage_url, js_url, sha256):
+        # Lock must be held
+        self.manifest.write(json.dumps({'webpage': webpage_url, 'js_url': js_url, 'sha256': sha256}) + '\n')
+
+    def close(self):
+        with self.lock:
+            self.manifest.close()
+
+
+class Downloader:
+    def __init__(self, verbose, timeout=10, per_host=6, libraries=None):
+        self.verbose = verbose
+        self.timeout = timeout
+        self.libraries = libraries or LibraryFilter.from_file()
+        self.limiter = HostLimiter(per_host)
+        self.stats = DownloadStats()
+        self.metrics = Metrics('js_downloader')
+        self.js_queue = Queue()
+        self.store = JsStore(DOWNLOADS_DIR)
+
+    def get(self, session, url):
+        with self.limiter.slot(url):
+            return session.get(url, timeout=self.timeout)
+
+    # Function to download a single JS file
+    def download_js_file(self, session, url, webpage_url):
+        try:
+            with self.metrics.stage('download_js_file'):
+                response = self.get(session, url)
+            if response.status_code == 200 and self.is_library_bundle(response.content):
+                self.store.resolve(url, None)
+                if self.verbose:
+                    secho(f"[SKIPPED] {url} - known library bundle", fg='bright_black')
+            elif response.status_code == 200:
+                with self.metrics.stage('save_js'):
+                    sha256, new = self.store.save(url, webpage_url, response.content)
+                self.stats.add('js')
+                self.stats.add('bytes', len(response.content))
+                if not new:
+                    self.stats.add('js_duplicate_content')
+                if self.verbose:
+                    secho(f"[OK] {url}" + ("" if new else f" (same content as {sha256[:12]})"), fg='green')
+            else:
+                self.store.resolve(url, None)
+                self.stats.add('js_failures')
+                if self.verbose:
+                    secho(f"[FAILED] {url} - HTTP status: {response.status_code}", fg='red')
+        except Exception as e:
+            self.store.resolve(url, None)
+            self.stats.add('js_failures')
+            if self.verbose:
+                secho(f"[FAILED] {url} - {e}", fg='red')
+
+    def is_library_bundle(self, content):
+        return bool(self.libraries.hashes) and self.libraries.is_library_hash(hashlib.sha256(content).hexdigest())
+
+    # Function to save a single webpage
+    def save_webpage(self, url, content):
         filename = os.path.join(DOWNLOADS_DIR, generate_random_string() + ".html")
         with open(filename, 'wb') as file:
             file.write(f"<!-- Webpage URL: {url}-->\n".encode())
-            file.write(response.content)
-        if verbose:
-            secho(f"[OK] {url}", fg='green')
-    except Exception as e:
-        if verbose:
-            secho(f"[FAILED] {url}", fg='red')
-
-def fetch_website(url, verbose):
-    """Fetches the HTML content of the website and all of its JavaScript resources"""
-    try:
-        response = requests.get(url)
-        if verbose:
-            secho(f"[INFO] Downloading webpage at {url}...", fg="bright_black")
-        download_webpage(url, verbose)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        js_files = set()
-        for script in soup.find_all('script'):
-            src = script.get('src')
-            if src:
-                js_files.add(src)
-        for link in soup.find_all('link', rel='stylesheet'):
-            href = link.get('href')
-            if href and href.endswith('.js'):
-                js_files.add(href)
+            file.write(content)
+
+    def fetch_website(self, session, url):
+        """Fetches the HTML content of the website once and queues its JavaScript resources"""
+        with self.metrics.profile(url):
+            self.fetch_and_queue(session, url)
+
+    def fetch_and_queue(self, session, url):
+        try:
+            if self.verbose:
+                secho(f"[INFO] Downloading webpage at {url}...", fg="bright_black")
+            with self.metrics.stage('fetch_website'):
+                response = self.get(session, url)
+            self.save_webpage(url, response.content)
+            self.stats.add('pages')
+            self.stats.add('bytes', len(response.content))
+            if self.verbose:
+                secho(f"[OK] {url}", fg='green')
+        except Exception as e:
+            self.stats.add('page_failures')
+            if self.verbose:
+                secho(f"[FAILED] {url} - {e}", fg='red')
+            return
+
+        try:
+            with self.metrics.stage('extract_html'):
+                summary = extract_html(response.content, collect_text=False)
+        except Exception:
+            return
+        js_files = set(summary.script_srcs)
+        js_files.update(summary.js_links())
         if len(js_files) == 0:
-            if verbose:
+            if self.verbose:
                 secho(f"[INFO] No JS files in {url}", fg="bright_black")
             return
-        if verbose:
-            secho(f"[INFO] Downloading {len(js_files)} JS files at {url}...", fg="bright_black")
+        if self.verbose:
+            secho(f"[INFO] Queueing {len(js_files)} JS files at {url}...", fg="bright_black")
         for js_file in js_files:
-            if not any(lib in js_file for lib in COMMON_LIBRARIES):
-                download_js_file(urljoin(url, js_file), url, verbose)
-    except Exception:
-        pass
+            js_url = urljoin(url, js_file)
+            if self.libraries.is_library_url(js_url):
+                continue
+            if self.store.claim(js_url, url):
+                self.js_queue.put((js_url, url))
+            else:
+                self.stats.add('js_duplicate_urls')
+
+    def page_worker(self, page_queue, pool_size):
+        session = create_session(pool_size)
+        try:
+            while True:
+                url = page_queue.get()
+                if url is STOP:
+                    break
+                self.fetch_website(session, url)
+        finally:
+            session.close()
+
+    def js_worker(self, pool_size):
+        session = create_session(pool_size)
+        try:
+            while True:
+                item = self.js_queue.get()
+                if item is STOP:
+                    break
+                self.download_js_file(session, *item)
+        finally:
+            session.close()
+
+    def run(self, websites, threads, js_threads):
+        """Fetch pages with `threads` workers while `js_threads` workers drain the JS queue; returns the number of pages"""
+        # Bounded so a huge stdin list is fed to the workers as they go
+        page_queue = Queue(maxsize=threads * 4)
+        pool_size = self.limiter.per_host
+
+        page_workers = [threading.Thread(target=self.page_worker, args=(page_queue, pool_size)) for _ in range(threads)]
+        js_workers = [threading.Thread(target=self.js_worker, args=(pool_size,)) for _ in range(js_threads)]
+        for thread in page_workers + js_workers:
+            thread.start()
+
+        received = 0
+        for website in websites:
+            page_queue.put(website)
+            received += 1
+        for _ in page_workers:
+            page_queue.put(STOP)
+        for thread in page_workers:
+            thread.join()
+
+        # All pages are done, so nothing more will be queued for the JS workers
+        for _ in js_workers:
+            self.js_queue.put(STOP)
+        for thread in js_workers:
+            thread.join()
+        self.store.close()
+        return received
+
+    def write_metrics(self, path):
+        """Write stage timings along with this run's download counts"""
+        with self.stats.lock:
+            counts = dict(self.stats.counts)
+        for key, value in counts.items():
+            if key == 'bytes':
+                self.metrics.add_bytes('downloaded', value)
+            else:
+                self.metrics.count(key, value)
+        try:
+            self.metrics.write(path)
+        except OSError as e:
+            secho(f"Error writing metrics to {path}: {e}", fg="red")
+
+
+def read_urls(stream):
+    """Yields the non-blank lines of stream as they arrive"""
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield line
+
 
 @command()
-@option('-t', '--threads', default=1, help='Number of threads to use')
+@option('-t', '--threads', default=1, help='Number of threads fetching webpages')
+@option('-j', '--js-threads', default=None, type=int, help='Number of threads downloading JS files (default: 2x --threads)')
+@option('--timeout', default=10.0, help='Per-request timeout in seconds')
+@option('--per-host', default=6, help='Maximum concurrent requests to a single host')
+@option('--libraries', default=None, help='Library filter file (default: common/libraries.yaml)')
+@option('--metrics', 'metrics_file', default=None, help='Write stage timings and counters at exit: JSON, or a Prometheus textfile if it ends in .prom')
+@option('--profile', 'profile_dir', default=None, help='Write a cProfile dump per webpage to this directory (pages are then fetched one at a time)')
 @option('-v', '--verbose', is_flag=True, help='Print verbose logs')
-def main(threads, verbose):
-    websites = [line.strip() for line in sys.stdin]
-    if len(websites) == 0:
+def main(threads, js_threads, timeout, per_host, libraries, metrics_file, profile_dir, verbose):
+    websites = read_urls(sys.stdin)
+    first = next(websites, None)
+    if first is None:
         secho("No URLs received from STDIN", fg="red")
         return
 
@@ -114,25 +336,18 @@ def main(threads, verbose):
     if not os.path.exists(DOWNLOADS_DIR):
         os.makedirs(DOWNLOADS_DIR)
 
-    queue = Queue()
+    threads = max(1, threads)
+    downloader = Downloader(verbose, timeout=timeout, per_host=per_host, libraries=LibraryFilter.from_file(libraries))
+    if profile_dir:
+        downloader.metrics.enable_profiling(profile_dir)
+    received = downloader.run(chain([first], websites), threads, max(1, js_threads or threads * 2))
     if verbose:
-        secho(f"Received {len(websites)} websites", fg="blue")
-    for website in websites:
-        queue.put(website)
-
-    def worker():
-        while not queue.empty():
-            url = queue.get()
-            fetch_website(url, verbose)
-            queue.task_done()
-
-    threads = [threading.Thread(target=worker) for _ in range(threads)]
-    for thread in threads:
-        thread.start()
-
-    queue.join()
-    for thread in threads:
-        thread.join()
+        secho(f"Received {received} websites", fg="blue")
+    secho(downloader.stats.summary(), fg="blue")
+    secho(downloader.libraries.summary(), fg="blue")
+    secho(downloader.metrics.summary(), fg="blue")
+    if metrics_file:
+        downloader.write_metrics(metrics_file)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,222 @@
+"""
+JS Cache - Content-addressed on-disk cache for Keyword Hunter
+
+Stores downloaded JavaScript by SHA-256 of its bytes and remembers, per URL, the
+ETag / Last-Modified validators and the hash last served. Scan results are
+memoized per (content hash, ruleset key), so an unchanged bundle costs one
+conditional GET and a lookup, and the same bundle served from many subdomains
+is scanned once. Blobs are evicted least-recently-used once the size cap is hit.
+"""
+
+import codecs
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    encoding TEXT,
+    sha256 TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    sha256 TEXT NOT NULL,
+    ruleset TEXT NOT NULL,
+    matches TEXT NOT NULL,
+    PRIMARY KEY (sha256, ruleset)
+);
+CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs (last_access);
+CREATE INDEX IF NOT EXISTS urls_sha256 ON urls (sha256);
+"""
+
+
+def decode_chunks(chunks, encoding=None):
+    """Incrementally decode an iterable of byte chunks into text chunks"""
+    decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+    for chunk in chunks:
+        yield decoder.decode(chunk)
+    yield decoder.decode(b'', final=True)
+
+
+def iter_file(path, chunk_size):
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            yield data
+
+
+class JsCache:
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024):
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(self.directory, 'blobs'), exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(self.directory, 'index.sqlite'), check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.stats = Counter()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config.get('js_cache_dir', '~/.cache/bb-scripts/js'),
+            max_bytes=int(config.get('js_cache_max_mb', 512)) * 1024 * 1024,
+        )
+
+    def blob_path(self, sha256):
+        return os.path.join(self.directory, 'blobs', sha256[:2], sha256 + '.js')
+
+    def lookup(self, url):
+        """Return (etag, last_modified, encoding, sha256) cached for url, or None"""
+        with self.lock:
+            row = self.db.execute(
+                'SELECT etag, last_modified, encoding, sha256 FROM urls WHERE url = ?', (url,)
+            ).fetchone()
+        if row and os.path.exists(self.blob_path(row[3])):
+            return row
+        return None
+
+    def conditional_headers(self, entry):
+        """If-None-Match / If-Modified-Since headers for a cached url entry"""
+        headers = {}
+        if entry:
+            etag, last_modified = entry[0], entry[1]
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def read(self, sha256, encoding=None):
+        """Decoded content of a cached blob"""
+        with open(self.blob_path(sha256), 'rb') as f:
+            content = f.read()
+        with self.lock:
+            self.db.execute('UPDATE blobs SET last_access = ? WHERE sha256 = ?', (time.time(), sha256))
+            self.db.commit()
+        return content.decode(encoding or 'utf-8', errors='replace')
+
+    def iter_text(self, sha256, encoding=None, chunk_size=1024 * 1024):
+        """Decoded content of a cached blob as chunks of at most chunk_size bytes"""
+        with self.lock:
+            self.db.execute('UPDATE blobs SET last_access = ? WHERE sha256 = ?', (time.time(), sha256))
+            self.db.commit()
+        return decode_chunks(iter_file(self.blob_path(sha256), chunk_size), encoding)
+
+    def revalidated(self, url):
+        """Record a 304 Not Modified for url"""
+        with self.lock:
+            self.stats['revalidated'] += 1
+            self.db.execute('UPDATE urls SET fetched_at = ? WHERE url = ?', (time.time(), url))
+            self.db.commit()
+
+    def store(self, url, content, etag=None, last_modified=None, encoding=None):
+        """Store downloaded bytes for url, returns their SHA-256"""
+        return self.store_stream(url, [content], etag=etag, last_modified=last_modified, encoding=encoding)
+
+    def store_stream(self, url, chunks, etag=None, last_modified=None, encoding=None):
+        """Store a download from an iterable of byte chunks without holding it in memory"""
+        digest = hashlib.sha256()
+        size = 0
+        tmp_path = os.path.join(self.directory, 'blobs', f"download.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                f.write(chunk)
+
+        sha256 = digest.hexdigest()
+        path = self.blob_path(sha256)
+        now = time.time()
+
+        with self.lock:
+            known = self.db.execute('SELECT 1 FROM blobs WHERE sha256 = ?', (sha256,)).fetchone()
+            if known and os.path.exists(path):
+                self.stats['unchanged'] += 1
+                os.remove(tmp_path)
+            else:
+                self.stats['downloaded'] += 1
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+            self.db.execute(
+                'INSERT OR REPLACE INTO blobs (sha256, size, last_access) VALUES (?, ?, ?)',
+                (sha256, size, now),
+            )
+            self.db.execute(
+                'INSERT OR REPLACE INTO urls (url, etag, last_modified, encoding, sha256, fetched_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (url, etag, last_modified, encoding, sha256, now),
+            )
+            self.db.commit()
+            self.evict()
+        return sha256
+
+    def size(self, sha256):
+        """Size in bytes of a cached blob"""
+        return os.path.getsize(self.blob_path(sha256))
+
+    def get_results(self, sha256, ruleset):
+        """Memoized scan results for (content hash, ruleset), or None"""
+        with self.lock:
+            row = self.db.execute(
+                'SELECT matches FROM results WHERE sha256 = ? AND ruleset = ?', (sha256, ruleset)
+            ).fetchone()
+            self.stats['scan_hits' if row else 'scan_misses'] += 1
+        return json.loads(row[0]) if row else None
+
+    def put_results(self, sha256, ruleset, matches):
+        with self.lock:
+            self.db.execute(
+                'INSERT OR REPLACE INTO results (sha256, ruleset, matches) VALUES (?, ?, ?)',
+                (sha256, ruleset, json.dumps(matches)),
+            )
+            self.db.commit()
+
+    def evict(self):
+        """Drop least recently used blobs until the cache fits max_bytes (lock must be held)"""
+        total = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for sha256, size in self.db.execute('SELECT sha256, size FROM blobs ORDER BY last_access').fetchall():
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self.blob_path(sha256))
+            except FileNotFoundError:
+                pass
+            self.db.execute('DELETE FROM blobs WHERE sha256 = ?', (sha256,))
+            self.db.execute('DELETE FROM results WHERE sha256 = ?', (sha256,))
+            self.db.execute('DELETE FROM urls WHERE sha256 = ?', (sha256,))
+            self.stats['evicted'] += 1
+            total -= size
+        self.db.commit()
+
+    def summary(self):
+        """One-line hit/miss statistics for this run"""
+        with self.lock:
+            stats = dict(self.stats)
+        return (
+            "JS cache: "
+            f"{stats.get('revalidated', 0)} revalidated (304), "
+            f"{stats.get('unchanged', 0)} unchanged, "
+            f"{stats.get('downloaded', 0)} downloaded, "
+            f"scan results {stats.get('scan_hits', 0)} hits / {stats.get('scan_misses', 0)} misses, "
+            f"{stats.get('evicted', 0)} evicted"
+        )
+
+    def close(self):
+        with self.lock:
+            self.db.close()
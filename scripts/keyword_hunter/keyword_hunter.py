@@ -11,45 +11,77 @@ Features:
 - Dynamic content analysis with Selenium WebDriver
 - Configurable regex patterns for different security categories
 - JavaScript file discovery and analysis
-- Discord notifications via discord-notify library
+- Discord notifications coalesced per target through a durable outbox
 - Library filtering to reduce false positives
+- Batch mode with a pool of reused browsers for URL lists
+- Daemon mode that keeps browsers, patterns and HTTP pools warm between runs
+- Offline mode that scans downloaded JS / HTML files on every core
+- Findings store that only reports matches not seen in earlier runs
+- Per-stage timings and counters (--metrics) and per-URL cProfile dumps (--profile)
 - Integration with reconnaissance pipelines
 
 Usage:
     python3 keyword_hunter.py -u https://example.com -c config.yaml
     echo "https://example.com" | python3 keyword_hunter.py
+    python3 keyword_hunter.py -f urls.txt -w 4
+    python3 keyword_hunter.py --daemon -w 4    # later runs are sent to this process
+    python3 keyword_hunter.py --scan ../../fetched-webpages/ -j 8
+    python3 keyword_hunter.py -f urls.txt --metrics hunter.prom --profile profiles/
 """
 
 import sys
-import re
+import hashlib
 import yaml
 import argparse
-import requests
 import os
+import threading
+import concurrent.futures
+from itertools import chain
 from urllib.parse import urljoin, urlparse
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
 import time
-from discord_notify import Notifier
 
-# Common libraries to ignore (similar to js_downloader.py)
-COMMON_LIBRARIES = [
-    'jquery', 'bootstrap', 'angular', 'react', 'vue', 'lodash', 'moment', 
-    'underscore', 'backbone', 'ember', 'knockout', 'mootools', 'prototype',
-    'dojo', 'extjs', 'yui', 'zepto', 'axios', 'googleapis', 'cloudflare',
-    'fontawesome', 'google-analytics', 'gtag', 'facebook', 'twitter', 'crazyegg',
-    'gtm', 'polyfill', 'vendor'
-]
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Selenium is imported where it is used, so that a run handed to a daemon does not pay for it
+from common import daemon
+from common.browser import BrowserProfile, site
+from common.fetcher import TieredFetcher
+from common.findings_store import FindingsStore, target_of
+from common.html_extract import extract_html
+from common.http_pool import HttpPool
+from common.library_filter import LibraryFilter
+from common.metrics import Metrics
+from common.notify import Notifier
+from common.settle import PageSettler
+from js_cache import JsCache, decode_chunks
+from offline_scan import OfflineScan, expand_paths
+from pattern_engine import PatternEngine
 
 class KeywordHunter:
-    def __init__(self, config_file='config.yaml'):
+    def __init__(self, config_file='config.yaml', use_cache=True, render_profile=None, use_store=True):
         self.config = self.load_config(config_file)
+        self.patterns = PatternEngine(self.config.get('keywords', []))
+        self.ruleset_key = f"{self.patterns.ruleset_hash}:{self.config.get('context_window', 150)}"
+        self.cache = JsCache.from_config(self.config) if use_cache and self.config.get('js_cache', True) else None
+        self.libraries = LibraryFilter.from_config(self.config)
+        self.store = FindingsStore.from_config(self.config) if use_store and self.config.get('findings_store', True) else None
+        # Bodies above the threshold are scanned in chunks; the window overlap must fit the
+        # longest expected match and the context shown around it
+        self.stream_threshold = int(float(self.config.get('stream_threshold_mb', 5)) * 1024 * 1024)
+        self.chunk_size = int(self.config.get('stream_chunk_kb', 1024)) * 1024
+        self.stream_overlap = max(int(self.config.get('max_match_length', 4096)), 2 * self.config.get('context_window', 150))
+        self.settler = PageSettler.from_config(self.config)
+        self.browser = BrowserProfile.from_config(self.config, render_profile, capture_scripts=True)
+        self.http = HttpPool.from_config(self.config)
+        self.fetcher = TieredFetcher.from_config(self.config, session=self.http.session)
+        self.notifier = Notifier.from_config(self.config, '🔍 **Keyword Hunter Results**')
+        self.metrics = Metrics('keyword_hunter')
         self.driver = None
+        self.drivers = []
         self.findings = []
+        self.local = threading.local()
+        self.pool = None
+        self.pool_workers = 0
 
     def load_config(self, config_file):
         try:
@@ -60,124 +92,311 @@ class KeywordHunter:
             sys.exit(1)
 
     def setup_webdriver(self):
-        options = Options()
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--window-size=1920,1080')
-        options.add_argument('--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
-        
-        self.driver = webdriver.Chrome(options=options)
-        self.driver.set_page_load_timeout(30)
+        self.driver = self.create_webdriver()
+
+    def create_webdriver(self):
+        driver = self.browser.create_driver()
+        self.drivers.append(driver)
+        return driver
+
+    def get_thread_webdriver(self):
+        """Return the webdriver owned by the current worker thread, launching it on first use"""
+        driver = getattr(self.local, 'driver', None)
+        if driver is None:
+            driver = self.create_webdriver()
+            self.local.driver = driver
+        return driver
 
     def is_common_library(self, url):
-        """Check if URL contains common library patterns"""
-        url_lower = url.lower()
-        return any(lib in url_lower for lib in COMMON_LIBRARIES)
+        """Check if an absolute script URL is a known third-party library"""
+        return self.libraries.is_library_url(url)
 
-    def extract_js_urls(self, soup, base_url):
+    def extract_js_urls(self, page_source, base_url):
         """Extract JavaScript URLs from HTML"""
         js_urls = set()
         
         # Find script tags with src attributes
-        for script in soup.find_all('script', src=True):
-            src = script.get('src')
-            if src and not self.is_common_library(src):
-                full_url = urljoin(base_url, src)
+        for src in extract_html(page_source, collect_text=False).script_srcs:
+            full_url = urljoin(base_url, src)
+            if not self.is_common_library(full_url):
                 js_urls.add(full_url)
                 
         return js_urls
 
-    def get_js_content(self, js_url):
-        """Fetch JavaScript content"""
+    def read_bounded(self, chunks):
+        """Read decoded body chunks up to the stream threshold; returns them and whether the body ended"""
+        # Content-Length is the compressed size, so the decoded bytes are counted as they arrive
+        head = []
+        size = 0
+        for chunk in chunks:
+            head.append(chunk)
+            size += len(chunk)
+            if size > self.stream_threshold:
+                return head, False
+        return head, True
+
+    def scan_js(self, js_url):
+        """Fetch and scan a JavaScript file, timed as the scan_js stage"""
+        self.metrics.count('js_files')
+        with self.metrics.stage('scan_js'):
+            return self.fetch_and_scan_js(js_url)
+
+    def fetch_and_scan_js(self, js_url):
+        """Fetch and scan a JavaScript file, reusing memoized results for content scanned before"""
+        sha256 = None
         try:
-            response = requests.get(js_url, timeout=10)
-            if response.status_code == 200:
-                return response.text
+            entry = self.cache.lookup(js_url) if self.cache else None
+            headers = self.cache.conditional_headers(entry) if entry else {}
+            with self.http.get(js_url, headers=headers, stream=True) as response:
+                if response.status_code == 304 and entry:
+                    self.metrics.count('js_revalidated')
+                    self.cache.revalidated(js_url)
+                    sha256, encoding = entry[3], entry[2]
+                elif response.status_code != 200:
+                    return []
+                elif self.cache:
+                    # Downloads go straight to the cache on disk, never fully into memory
+                    encoding = response.encoding
+                    sha256 = self.cache.store_stream(
+                        js_url,
+                        response.iter_content(self.chunk_size),
+                        etag=response.headers.get('ETag'),
+                        last_modified=response.headers.get('Last-Modified'),
+                        encoding=encoding,
+                    )
+                    self.metrics.add_bytes('js_downloaded', self.cache.size(sha256))
+                else:
+                    chunks = response.iter_content(self.chunk_size)
+                    head, complete = self.read_bounded(chunks)
+                    if not complete:
+                        return self.search_stream(decode_chunks(chain(head, chunks), response.encoding), 'JavaScript', js_url)
+                    content = b''.join(head)
+                    if self.libraries.hashes and self.libraries.is_library_hash(hashlib.sha256(content).hexdigest()):
+                        return []
+                    self.metrics.add_bytes('js_downloaded', len(content))
+                    return self.search_keywords(''.join(decode_chunks([content], response.encoding)), 'JavaScript', js_url)
         except Exception as e:
+            self.metrics.count('js_errors')
             print(f"Error fetching JS from {js_url}: {e}")
-        return ""
+            return []
+
+        # Known library bundles are skipped wherever they are served from
+        if self.libraries.is_library_hash(sha256):
+            return []
+
+        cached = self.cache.get_results(sha256, self.ruleset_key)
+        if cached is not None:
+            self.metrics.count('js_results_cached')
+            return [dict(match, source_url=js_url) for match in cached]
+
+        if self.cache.size(sha256) > self.stream_threshold:
+            chunks = self.cache.iter_text(sha256, encoding, self.chunk_size)
+            matches = self.search_stream(chunks, 'JavaScript', js_url)
+        else:
+            matches = self.search_keywords(self.cache.read(sha256, encoding), 'JavaScript', js_url)
+
+        self.cache.put_results(
+            sha256,
+            self.ruleset_key,
+            [{key: value for key, value in match.items() if key != 'source_url'} for match in matches],
+        )
+        return matches
 
     def search_keywords(self, content, content_type, source_url):
         """Search for keywords in content using regex patterns"""
+        self.metrics.add_bytes('scanned', len(content))
+        with self.metrics.stage('search_keywords'):
+            return self.patterns.search(content, content_type, source_url, self.config.get('context_window', 150))
+
+    def search_stream(self, chunks, content_type, source_url):
+        """Search for keywords in an iterable of text chunks with bounded memory"""
+        window = self.config.get('context_window', 150)
+        with self.metrics.stage('search_stream'):
+            return self.patterns.search_chunks(self.counted(chunks), content_type, source_url, window, self.stream_overlap)
+
+    def counted(self, chunks):
+        """Pass chunks through, adding their length to the scanned bytes"""
+        for chunk in chunks:
+            self.metrics.add_bytes('scanned', len(chunk))
+            yield chunk
+
+    def hunt_url(self, url, driver=None):
+        """Main hunting function for a single URL, returns the matches found for it"""
+        print(f"Hunting keywords in: {url}")
         matches = []
+        self.metrics.count('urls')
         
-        for keyword_group in self.config.get('keywords', []):
-            group_name = keyword_group.get('name', 'Unknown')
-            patterns = keyword_group.get('patterns', [])
-            
-            for pattern in patterns:
-                try:
-                    regex_matches = re.finditer(pattern, content, re.IGNORECASE | re.MULTILINE)
-                    for match in regex_matches:
-                        matches.append({
-                            'group': group_name,
-                            'pattern': pattern,
-                            'match': match.group(0),
-                            'content_type': content_type,
-                            'source_url': source_url,
-                            'line_context': self.get_line_context(content, match.start())
-                        })
-                except re.error as e:
-                    print(f"Invalid regex pattern '{pattern}': {e}")
-                    
-        return matches
+        with self.metrics.profile(url), self.metrics.stage('hunt_url'):
+            try:
+                # Fetch statically, rendering with Selenium only when the page needs JS
+                with self.metrics.stage('fetch'):
+                    result = self.fetcher.fetch(url, lambda page_url: self.render_page(page_url, driver))
+                print(f"  Fetched via {result.tier} ({result.reason})")
+                self.metrics.count(f'fetched_{result.tier}')
+                self.metrics.add_bytes('pages', len(result.body))
+                matches = self.new_findings(url, self.hunt_page(url, result))
+                        
+            except Exception as e:
+                self.metrics.count('url_errors')
+                print(f"Error hunting {url}: {e}")
 
-    def get_line_context(self, content, position):
-        """Get line context around a match position"""
-        lines = content[:position].split('\n')
-        line_num = len(lines)
-        current_line = content.split('\n')[line_num - 1] if line_num <= len(content.split('\n')) else ""
-        return f"Line {line_num}: {current_line.strip()}"
+        self.metrics.count('matches', len(matches))
+        self.findings.extend(matches)
+        return matches
 
-    def hunt_url(self, url):
-        """Main hunting function for a single URL"""
-        print(f"Hunting keywords in: {url}")
+    def hunt_page(self, url, result):
+        """Search a fetched page (a FetchResult) and the JS files it loads"""
+        matches = []
+        page_source = result.body
         
-        try:
-            # Load page with Selenium to handle dynamic content
-            self.driver.get(url)
+        # Search in HTML content
+        matches.extend(self.search_keywords(page_source, 'HTML' if result.is_html else 'Response', url))
+        
+        # Extract and analyze JavaScript files (JSON and other non-HTML responses have none)
+        js_urls = set()
+        if result.is_html:
+            js_urls = self.extract_js_urls(page_source, url)
+        
+        # Scripts the browser requested, such as chunks loaded at runtime, from the page's own site
+        for js_url in self.browser.pop_script_urls(url):
+            if site(urlparse(js_url).hostname) == site(urlparse(url).hostname) and not self.is_common_library(js_url):
+                js_urls.add(js_url)
+        
+        # Download the page's scripts concurrently, scanning each as it arrives
+        for js_url, js_matches in self.http.map(self.scan_js, js_urls):
+            print(f"  Analyzing JS: {js_url}")
+            matches.extend(js_matches)
+        return matches
+
+    def new_findings(self, url, matches):
+        """Record the matches found for url, returning only those not reported in earlier runs"""
+        if not self.store or not matches:
+            return matches
+        new = self.store.record_matches(url, matches)
+        if len(new) < len(matches):
+            print(f"  {len(matches) - len(new)} matches already reported for {url}")
+        return new
+
+    def render_page(self, url, driver=None):
+        """Load url in a browser and return the page source after JS execution"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        driver = driver or self.driver or self.get_thread_webdriver()
+
+        # Load page with Selenium to handle dynamic content
+        self.browser.start_page(driver)
+        with self.metrics.stage('render'):
+            driver.get(url)
             
             # Wait for page to load and execute JavaScript
-            WebDriverWait(self.driver, 10).until(
+            WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
-            
-            # Wait a bit more for async JS to load
-            time.sleep(3)
-            
-            # Get final page source after JS execution
-            page_source = self.driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
-            
-            # Search in HTML content
-            html_matches = self.search_keywords(page_source, 'HTML', url)
-            self.findings.extend(html_matches)
-            
-            # Extract and analyze JavaScript files
-            js_urls = self.extract_js_urls(soup, url)
-            
-            for js_url in js_urls:
-                print(f"  Analyzing JS: {js_url}")
-                js_content = self.get_js_content(js_url)
-                if js_content:
-                    js_matches = self.search_keywords(js_content, 'JavaScript', js_url)
-                    self.findings.extend(js_matches)
-                    
-        except Exception as e:
-            print(f"Error hunting {url}: {e}")
+        
+        # Wait until async JS has finished loading and the DOM is quiet
+        with self.metrics.stage('settle'):
+            settle_time = self.settler.wait(driver, url)
+        print(f"  Page settled in {settle_time:.2f}s")
+        self.browser.finish_page(driver, url)
+        
+        # Get final page source after JS execution
+        return driver.page_source
+
+    def start_pool(self, workers):
+        """Keep one pool of worker threads (and so their browsers) for every batch"""
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        self.pool_workers = workers
+
+    def hunt_urls(self, urls, workers=1):
+        """Hunt many URLs with a pool of browsers, reporting each URL as it completes"""
+        start = time.time()
+        if self.pool:
+            workers = self.pool_workers
+
+        executor = self.pool or concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        try:
+            future_to_url = {executor.submit(self.hunt_url, url): url for url in urls}
+
+            for future in concurrent.futures.as_completed(future_to_url):
+                url = future_to_url[future]
+                try:
+                    matches = future.result()
+                except Exception as e:
+                    print(f"Error hunting {url}: {e}")
+                    continue
+                print(f"\n--- {url} ---")
+                self.output_findings(matches)
+                self.notify_discord(matches, url)
+        finally:
+            if executor is not self.pool:
+                executor.shutdown()
 
-    def output_findings(self):
+        elapsed = time.time() - start
+        rate = len(urls) / elapsed * 60 if elapsed > 0 else 0
+        self.print_stats()
+        print(self.metrics.summary())
+        print(f"Hunted {len(urls)} URLs in {elapsed:.1f}s ({rate:.1f} URLs/minute, {workers} workers)")
+
+    def hunt_files(self, paths, jobs=None, notify=False):
+        """Scan downloaded files on a process pool, reporting each file with matches"""
+        files = expand_paths(paths)
+        if not files:
+            print("No files to scan")
+            return
+
+        scan = OfflineScan(self.config, self.stream_threshold, self.chunk_size, self.stream_overlap)
+        print(f"Scanning {len(files)} files with {jobs or os.cpu_count()} processes")
+        for result in scan.run(files, jobs):
+            self.metrics.observe('scan_file', result['seconds'])
+            self.metrics.count('files')
+            self.metrics.count('matches', len(result['matches']))
+            self.metrics.add_bytes('scanned', result['size'])
+            if result['error']:
+                print(f"Error scanning {result['path']}: {result['error']}")
+                continue
+            page_url = result['webpages'][0] if result['webpages'] else result['source_url']
+            matches = self.new_findings(page_url, result['matches'])
+            if not matches:
+                continue
+            self.findings.extend(matches)
+            print(f"\n--- {result['path']} ---")
+            if result['webpages']:
+                more = f" (+{len(result['webpages']) - 3} more)" if len(result['webpages']) > 3 else ''
+                print(f"Loaded by: {', '.join(result['webpages'][:3])}{more}")
+            self.output_findings(matches)
+            if notify:
+                self.notify_discord(matches, page_url)
+        print(scan.summary())
+        if self.store:
+            print(self.store.summary())
+        print(self.metrics.summary())
+
+    def print_stats(self):
+        """Print fetch, settle, library filter and cache statistics for this run"""
+        print(self.fetcher.summary())
+        print(self.settler.summary())
+        print(self.browser.summary())
+        print(self.libraries.summary())
+        if self.cache:
+            print(self.cache.summary())
+        if self.store:
+            print(self.store.summary())
+
+    def output_findings(self, findings=None):
         """Output findings to STDOUT"""
-        if not self.findings:
+        if findings is None:
+            findings = self.findings
+
+        if not findings:
             print("No keyword matches found.")
             return
             
         print(f"\n=== KEYWORD HUNTING RESULTS ===")
-        print(f"Found {len(self.findings)} matches:\n")
+        print(f"Found {len(findings)} matches:\n")
         
-        for finding in self.findings[:3]:  # Only show first 3 findings
+        for finding in findings[:3]:  # Only show first 3 findings
             print(f"🎯 {finding['group']}")
             print(f"   Pattern: {finding['pattern']}")
             print(f"   Match: {finding['match']}")
@@ -185,52 +404,114 @@ class KeywordHunter:
             print(f"   Context: {finding['line_context'][:300]}")
             print()
             
-        if len(self.findings) > 3:
-            print(f"... and {len(self.findings) - 3} more matches (showing first 3 only)")
+        if len(findings) > 3:
+            print(f"... and {len(findings) - 3} more matches (showing first 3 only)")
             print()
 
-    def notify_discord(self):
-        """Send findings to Discord via discord_notify"""
-        if not self.findings:
+    def notify_discord(self, findings=None, url=None):
+        """Queue findings for a Discord message with the other findings for the same target"""
+        if findings is None:
+            findings = self.findings
+
+        if not findings:
             return
             
-        webhook_url = self.config.get('discord_webhook_url')
-        if not webhook_url or 'YOUR_WEBHOOK_URL' in webhook_url:
+        if not self.notifier:
             print("Discord webhook not configured, skipping Discord notification")
             return
             
-        # Prepare Discord message
-        message = f"🔍 **Keyword Hunter Results** \n\n"
-        message += f"Found {len(self.findings)} matches:\n\n"
+        # Prepare the findings' part of the Discord message
+        url = url or findings[0]['source_url']
+        message = f"Found {len(findings)} matches on {url}:\n\n"
         
-        for finding in self.findings[:3]:  # Limit to first 3 findings
+        for finding in findings[:3]:  # Limit to first 3 findings
             message += f"**{finding['group']}**\n"
             message += f"• Match: `{finding['match'][:100]}...` \n"
             message += f"• Source: {finding['source_url']}\n"
             message += f"• Context: `{finding['line_context'][:300]}`\n"
             message += f"• Type: {finding['content_type']}\n\n"
             
-        if len(self.findings) > 3:
-            message += f"... and {len(self.findings) - 3} more matches\n"
+        if len(findings) > 3:
+            message += f"... and {len(findings) - 3} more matches\n"
         
+        self.notifier.queue(target_of(url), message.rstrip())
+
+    def run(self, urls, workers=1):
+        """Hunt urls and report the results: one URL in this thread, several in batch mode"""
+        self.findings = []
+        if len(urls) == 1:
+            self.hunt_url(urls[0])
+            self.output_findings()
+            self.notify_discord(url=urls[0])
+            self.print_stats()
+            print(self.metrics.summary())
+        else:
+            self.hunt_urls(urls, workers=max(1, workers))
+
+    def run_job(self, job):
+        """Daemon handler: run a job submitted by a client, with metrics of its own"""
+        self.metrics.reset()
+        self.run(job['urls'])
+        if job.get('metrics'):
+            self.write_metrics(job['metrics'])
+        return 0
+
+    def write_metrics(self, path):
         try:
-            # Use discord-notify library
-            notifier = Notifier(webhook_url)
-            notifier.send(message, print_message=False)
-            print("Discord notification sent successfully")
-                
-        except Exception as e:
-            print(f"Error sending Discord notification: {e}")
+            self.metrics.write(path)
+            print(f"Metrics written to {path}")
+        except OSError as e:
+            print(f"Error writing metrics to {path}: {e}")
 
     def cleanup(self):
-        """Cleanup webdriver"""
-        if self.driver:
-            self.driver.quit()
+        """Cleanup webdrivers and HTTP connections"""
+        if self.pool:
+            self.pool.shutdown()
+        self.http.close()
+        if self.cache:
+            self.cache.close()
+        if self.store:
+            self.store.close()
+        if self.notifier:
+            # Whatever Discord does not accept in time stays in the outbox for the next run
+            self.notifier.close()
+            print(self.notifier.summary())
+        for driver in self.drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+def read_urls(lines):
+    """Normalize URLs from an iterable of lines, skipping blanks and comments"""
+    urls = []
+    for line in lines:
+        url = line.strip()
+        if not url or url.startswith('#'):
+            continue
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        urls.append(url)
+    return urls
 
 def main():
     parser = argparse.ArgumentParser(description="Hunt for regex keywords in web pages and JS files")
     parser.add_argument('-u', '--url', help='URL to analyze')
+    parser.add_argument('-f', '--file', help='File with one URL per line to analyze in batch mode')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='Number of concurrent browsers in batch mode')
     parser.add_argument('-c', '--config', default='config.yaml', help='Config file path')
+    parser.add_argument('--no-cache', action='store_true', help='Do not use or update the JS cache')
+    parser.add_argument('--all-findings', action='store_true', help='Report every match, not only those missing from the findings store (nothing is recorded)')
+    parser.add_argument('--scan', nargs='+', metavar='PATH', help='Scan downloaded files (directories, globs or files) offline instead of URLs')
+    parser.add_argument('-j', '--jobs', type=int, help='Processes for --scan (default: one per core)')
+    parser.add_argument('--notify', action='store_true', help='Send --scan findings to Discord')
+    parser.add_argument('--render-profile', choices=['full', 'light'], help='Chrome profile: full, or light (no images, fonts, media or trackers); default from config')
+    parser.add_argument('--metrics', metavar='FILE', help='Write stage timings, counters and byte totals at exit: JSON, or a Prometheus textfile if FILE ends in .prom')
+    parser.add_argument('--profile', metavar='DIR', help='Write a cProfile dump per URL to DIR (URLs are then hunted one at a time; runs in this process)')
+    parser.add_argument('--daemon', action='store_true', help='Serve runs from other keyword_hunter.py invocations, keeping browsers and pools warm (-w browsers)')
+    parser.add_argument('--stop-daemon', action='store_true', help='Stop a running daemon after its queued jobs')
+    parser.add_argument('--no-daemon', action='store_true', help='Run in this process even if a daemon is listening')
+    parser.add_argument('--socket', help='Daemon socket path (default ~/.cache/bb-scripts/keyword_hunter.sock)')
     
     args = parser.parse_args()
     
@@ -238,28 +519,55 @@ def main():
     if not os.path.isabs(args.config):
         script_dir = os.path.dirname(os.path.abspath(__file__))
         args.config = os.path.join(script_dir, args.config)
+    if args.metrics:
+        args.metrics = os.path.abspath(args.metrics)
     
-    # Get URL from argument or stdin
+    if args.scan:
+        hunter = KeywordHunter(args.config, use_cache=False, use_store=not args.all_findings)
+        try:
+            hunter.hunt_files(args.scan, args.jobs, notify=args.notify)
+        except KeyboardInterrupt:
+            print("\nInterrupted by user")
+        finally:
+            hunter.cleanup()
+            if args.metrics:
+                hunter.write_metrics(args.metrics)
+        return
+    
+    socket_path = daemon.socket_path('keyword_hunter', args.socket)
+    if args.stop_daemon:
+        if not daemon.stop(socket_path):
+            print(f"No daemon listening on {socket_path}")
+        return
+    if args.daemon:
+        serve(args, socket_path)
+        return
+    
+    # Get URLs from argument, file or stdin
     if args.url:
-        url = args.url
+        urls = read_urls([args.url])
+    elif args.file:
+        with open(args.file, 'r') as f:
+            urls = read_urls(f)
     else:
-        url = sys.stdin.read().strip()
+        urls = read_urls(sys.stdin)
         
-    if not url:
-        print("Error: No URL provided. Use -u parameter or pipe URL to stdin.")
+    if not urls:
+        print("Error: No URL provided. Use -u or -f parameter or pipe URLs to stdin.")
         sys.exit(1)
-        
-    # Validate URL
-    if not url.startswith(('http://', 'https://')):
-        url = 'https://' + url
     
-    hunter = KeywordHunter(args.config)
+    # Hand the run to a daemon started with the same settings, if one is listening
+    if not args.no_daemon and not args.profile:
+        status = daemon.submit(socket_path, {'urls': urls, 'config': args.config, 'no_cache': args.no_cache, 'render_profile': args.render_profile, 'all_findings': args.all_findings, 'metrics': args.metrics})
+        if status is not None:
+            sys.exit(status)
+    
+    hunter = KeywordHunter(args.config, use_cache=not args.no_cache, render_profile=args.render_profile, use_store=not args.all_findings)
+    if args.profile:
+        hunter.metrics.enable_profiling(args.profile)
     
     try:
-        hunter.setup_webdriver()
-        hunter.hunt_url(url)
-        hunter.output_findings()
-        hunter.notify_discord()
+        hunter.run(urls, workers=args.workers)
         
     except KeyboardInterrupt:
         print("\nInterrupted by user")
@@ -267,6 +575,29 @@ def main():
         print(f"Error: {e}")
     finally:
         hunter.cleanup()
+        if args.metrics:
+            hunter.write_metrics(args.metrics)
+
+def serve(args, socket_path):
+    """Run as a daemon: one hunter, its browsers and pools serving every submitted job"""
+    hunter = KeywordHunter(args.config, use_cache=not args.no_cache, render_profile=args.render_profile, use_store=not args.all_findings)
+    hunter.start_pool(max(1, args.workers))
+    if args.profile:
+        hunter.metrics.enable_profiling(args.profile)
+
+    def accepts(job):
+        settings = (job.get('config'), job.get('no_cache'), job.get('render_profile'), job.get('all_findings'))
+        if settings != (args.config, args.no_cache, args.render_profile, args.all_findings):
+            return f"it runs with -c {args.config}{' --no-cache' if args.no_cache else ''}{' --all-findings' if args.all_findings else ''} --render-profile {hunter.browser.profile}"
+        return None
+
+    try:
+        daemon.JobServer(socket_path, hunter.run_job, accepts).serve_forever()
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        hunter.cleanup()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,60 @@
+"""
+Line Index - Position to line lookups for Keyword Hunter
+
+Records the offset of every newline in a document once, then resolves match
+positions to (line number, line slice) with a bisect instead of re-splitting
+the whole document for each match. Long lines (minified bundles are often a
+single line) are reduced to a bounded column window around the match.
+"""
+
+import re
+from bisect import bisect_left
+
+NEWLINE = re.compile('\n')
+
+
+class LineIndex:
+    def __init__(self, content, base_offset=0, base_line=0, line_start=0, complete=True):
+        """
+        content may be a window of a larger document when streaming: base_offset is the
+        absolute offset of content[0], base_line the number of newlines before it,
+        line_start the absolute offset where the line containing content[0] begins, and
+        complete is False when the document continues past the end of content.
+        """
+        self.content = content
+        self.base_offset = base_offset
+        self.base_line = base_line
+        self.line_start = line_start
+        self.complete = complete
+        self.newlines = [match.start() for match in NEWLINE.finditer(content)]
+
+    def line_number(self, position):
+        """1-based line number of the character at position"""
+        return self.base_line + bisect_left(self.newlines, position) + 1
+
+    def line_bounds(self, position):
+        """Return (line number, line start, line end) for position"""
+        index = bisect_left(self.newlines, position)
+        start = self.newlines[index - 1] + 1 if index > 0 else 0
+        end = self.newlines[index] if index < len(self.newlines) else len(self.content)
+        return self.base_line + index + 1, start, end
+
+    def context(self, position, window=None):
+        """Line context for position, limited to `window` characters either side of it"""
+        line_num, start, end = self.line_bounds(position)
+        # Absolute start of the line, which may lie before this window when streaming
+        absolute_start = self.base_offset + start if start > 0 else self.line_start
+        cut_before = absolute_start < self.base_offset + start
+        cut_after = end == len(self.content) and not self.complete
+
+        if not cut_before and not cut_after and (not window or end - start <= 2 * window):
+            return f"Line {line_num}: {self.content[start:end].strip()}"
+
+        window_start = max(start, position - window) if window else start
+        window_end = min(end, position + window) if window else end
+        snippet = self.content[window_start:window_end].strip()
+        if window_start > start or cut_before:
+            snippet = '...' + snippet
+        if window_end < end or cut_after:
+            snippet = snippet + '...'
+        return f"Line {line_num}, col {self.base_offset + position - absolute_start + 1}: {snippet}"
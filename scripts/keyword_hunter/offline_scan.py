@@ -0,0 +1,233 @@
+"""
+Offline Scan - Keyword Hunter over downloaded JS and HTML files
+
+Runs the keyword ruleset over local files without a browser or network: the
+`fetched-webpages/` directory written by js_downloader.py, the `.urlmonitor_files`
+kept by bin/urlmonitor, or any directory, glob or file. Files are scanned on a
+process pool so the regex work uses every core, and each worker compiles the
+ruleset once. Files up to the stream threshold are read whole. Larger ones are
+memory-mapped and scanned over overlapping windows like streamed downloads, so a
+worker never holds more than a chunk of them in memory.
+
+The `// Webpage URL:` / `// Source:` header (or `<!-- Webpage URL: -->` for saved
+pages) that js_downloader.py writes is stripped before scanning, so line numbers
+match the original file, and it becomes the finding's source. A `manifest.jsonl`
+next to the files lists every page that loaded a content-hashed bundle.
+"""
+
+import glob
+import hashlib
+import json
+import mmap
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from common.library_filter import LibraryFilter
+from js_cache import decode_chunks
+from pattern_engine import PatternEngine
+
+MANIFEST_FILE = 'manifest.jsonl'
+HEADER = re.compile(rb'(?://|<!--)[ \t]*(Webpage URL|Source):[ \t]*(.*?)[ \t]*(?:-->)?\r?\n')
+HEADER_BYTES = 8192
+GLOB_CHARS = re.compile(r'[*?\[]')
+SHA256_NAME = re.compile(r'^[0-9a-f]{64}$')
+CONTENT_TYPES = {
+    '.js': 'JavaScript', '.mjs': 'JavaScript', '.cjs': 'JavaScript',
+    '.html': 'HTML', '.htm': 'HTML', '.json': 'Response',
+}
+
+# The scanner of the current worker process, set by init_worker
+_scanner = None
+
+
+def expand_paths(paths):
+    """Files under directories, glob matches and plain files, in order and without repeats"""
+    files = []
+    for path in paths:
+        path = os.path.expanduser(path)
+        if GLOB_CHARS.search(path) and not os.path.exists(path):
+            matches = sorted(glob.glob(path, recursive=True))
+        else:
+            matches = [path]
+        for match in matches:
+            if os.path.isdir(match):
+                for root, dirs, names in os.walk(match):
+                    dirs.sort()
+                    files.extend(os.path.join(root, name) for name in sorted(names) if is_scannable(name))
+            else:
+                files.append(match)
+    return list(dict.fromkeys(files))
+
+
+def is_scannable(name):
+    # Manifests and js_downloader's partially written files are not content
+    return name != MANIFEST_FILE and not name.endswith('.tmp')
+
+
+def parse_header(head):
+    """Return (content offset, {'Webpage URL': ..., 'Source': ...}) from a file's first bytes"""
+    headers = {}
+    position = 0
+    while True:
+        match = HEADER.match(head, position)
+        if not match:
+            return position, headers
+        headers[match.group(1).decode()] = match.group(2).decode('utf-8', errors='replace')
+        position = match.end()
+
+
+class FileScanner:
+    def __init__(self, config, stream_threshold, chunk_size, overlap):
+        self.patterns = PatternEngine(config.get('keywords', []))
+        self.libraries = LibraryFilter.from_config(config)
+        self.window = config.get('context_window', 150)
+        self.stream_threshold = stream_threshold
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+
+    def scan(self, path):
+        """Scan one file, returning a result dict (never raises)"""
+        start = time.perf_counter()
+        result = {'path': path, 'size': 0, 'source_url': path, 'webpage_url': None, 'matches': [], 'skipped': None, 'error': None}
+        try:
+            with open(path, 'rb') as f:
+                result['size'] = size = os.fstat(f.fileno()).st_size
+                if not size:
+                    return result
+                if size <= self.stream_threshold:
+                    self.scan_buffer(result, f.read())
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        self.scan_buffer(result, mapped)
+        except Exception as e:
+            result['error'] = str(e)
+        result['seconds'] = time.perf_counter() - start
+        return result
+
+    def scan_buffer(self, result, data):
+        start, headers = parse_header(data[:HEADER_BYTES])
+        path = result['path']
+        source_url = headers.get('Source') or headers.get('Webpage URL')
+        result['webpage_url'] = headers.get('Webpage URL')
+        if source_url:
+            result['source_url'] = source_url
+
+        extension = os.path.splitext(path)[1].lower()
+        content_type = CONTENT_TYPES.get(extension) or ('HTML' if data[:4] == b'<!--' else 'JavaScript')
+        if content_type == 'JavaScript' and self.is_library(path, source_url, data, start):
+            result['skipped'] = 'library'
+            return
+
+        if isinstance(data, bytes):
+            content = data[start:].decode('utf-8', errors='replace')
+            matches = self.patterns.search(content, content_type, result['source_url'], self.window)
+        else:
+            # Memory-mapped: decode and scan one chunk at a time
+            chunks = (data[offset:offset + self.chunk_size] for offset in range(start, len(data), self.chunk_size))
+            matches = self.patterns.search_chunks(decode_chunks(chunks), content_type, result['source_url'], self.window, self.overlap)
+
+        for match in matches:
+            match['file'] = path
+        result['matches'] = matches
+
+    def is_library(self, path, source_url, data, start):
+        if source_url and self.libraries.is_library_url(source_url):
+            return True
+        if not self.libraries.hashes:
+            return False
+        # js_downloader names files by the SHA-256 of their content (without the header)
+        name = os.path.splitext(os.path.basename(path))[0]
+        if start and SHA256_NAME.match(name):
+            return self.libraries.is_library_hash(name)
+        with memoryview(data) as view, view[start:] as content:
+            return self.libraries.is_library_hash(hashlib.sha256(content).hexdigest())
+
+
+def init_worker(config, stream_threshold, chunk_size, overlap):
+    global _scanner
+    _scanner = FileScanner(config, stream_threshold, chunk_size, overlap)
+
+
+def scan_file(path):
+    return _scanner.scan(path)
+
+
+class Manifests:
+    """Pages that loaded each content-hashed bundle, from the manifest.jsonl of its directory"""
+
+    def __init__(self):
+        self.directories = {}
+
+    def load(self, directory):
+        pages = {}
+        try:
+            with open(os.path.join(directory, MANIFEST_FILE), 'r') as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        continue
+                    webpages = pages.setdefault(row.get('sha256'), [])
+                    if row.get('webpage') and row['webpage'] not in webpages:
+                        webpages.append(row['webpage'])
+        except FileNotFoundError:
+            pass
+        return pages
+
+    def webpages(self, path):
+        directory = os.path.dirname(os.path.abspath(path))
+        if directory not in self.directories:
+            self.directories[directory] = self.load(directory)
+        name = os.path.splitext(os.path.basename(path))[0]
+        return self.directories[directory].get(name, [])
+
+
+class OfflineScan:
+    def __init__(self, config, stream_threshold, chunk_size, overlap):
+        self.settings = (config, stream_threshold, chunk_size, overlap)
+        self.manifests = Manifests()
+        self.stats = Counter()
+        self.elapsed = 0
+
+    def run(self, files, jobs=None):
+        """Scan files on `jobs` processes (default: one per core), yielding results in file order"""
+        jobs = max(1, jobs or os.cpu_count() or 1)
+        # Batches of small files per task keep the pool busy without a round trip per file
+        chunksize = max(1, min(64, len(files) // (jobs * 8)))
+        start = time.time()
+        executor = ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=self.settings)
+        try:
+            for result in executor.map(scan_file, files, chunksize=chunksize):
+                self.count(result)
+                result['webpages'] = self.manifests.webpages(result['path'])
+                if result['webpage_url'] and result['webpage_url'] not in result['webpages']:
+                    result['webpages'].insert(0, result['webpage_url'])
+                yield result
+        finally:
+            executor.shutdown(cancel_futures=True)
+            self.elapsed += time.time() - start
+
+    def count(self, result):
+        self.stats['files'] += 1
+        self.stats['bytes'] += result['size']
+        if result['error']:
+            self.stats['errors'] += 1
+        elif result['skipped']:
+            self.stats['libraries'] += 1
+        elif result['matches']:
+            self.stats['with_findings'] += 1
+            self.stats['matches'] += len(result['matches'])
+
+    def summary(self):
+        """One-line throughput and findings for this scan"""
+        stats = self.stats
+        elapsed = max(self.elapsed, 1e-9)
+        return (
+            f"Scanned {stats['files']} files ({stats['bytes'] / 1024 / 1024:.1f} MB) in {self.elapsed:.1f}s "
+            f"({stats['files'] / elapsed:.0f} files/s, {stats['bytes'] / 1024 / 1024 / elapsed:.1f} MB/s): "
+            f"{stats['matches']} matches in {stats['with_findings']} files, "
+            f"{stats['libraries']} libraries skipped, {stats['errors']} errors"
+        )
@@ -0,0 +1,226 @@
+"""
+Pattern Engine - Compiled keyword ruleset for Keyword Hunter
+
+Compiles the `keywords` section of the config once and scans documents with a
+literal prefilter: every pattern that starts with a fixed string (`AKIA`, `AIza`,
+`xox`, `ghp_`, `eyJ`, ...) is only run when that string occurs in the document.
+Patterns without a usable literal prefix are always run.
+
+Patterns are still matched one by one with `finditer`, so overlapping matches
+between patterns (e.g. the JWT pattern and the bare `eyJ` pattern) are reported
+exactly as before, in config order.
+
+Large documents can be scanned from an iterable of text chunks with bounded
+memory: each pattern runs over a sliding window that keeps `overlap` characters
+after the committed region and before the next one, so any match up to `overlap`
+characters long is found exactly once, with absolute offsets and line numbers.
+
+`search` and `search_chunks` turn matches into the finding dicts Keyword Hunter
+reports, so the live hunter and offline scan workers build them the same way.
+"""
+
+import hashlib
+import re
+
+from line_index import LineIndex
+
+FLAGS = re.IGNORECASE | re.MULTILINE
+
+# Characters that end the literal prefix of a pattern
+_METACHARS = set('.^$*+?{}[]()|\\')
+_QUANTIFIERS = set('*?{')
+_LITERAL_ESCAPES = set('.-/:_"\'@#%&=,;<>!~` ')
+
+
+def literal_prefix(pattern):
+    """Return the fixed (casefolded) string every match of `pattern` starts with, or ''"""
+    if _has_top_level_alternation(pattern):
+        return ''
+
+    prefix = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            if i + 1 < len(pattern) and pattern[i + 1] in _LITERAL_ESCAPES:
+                literal = pattern[i + 1]
+                i += 2
+            else:
+                break
+        elif char in _METACHARS or not char.isascii():
+            break
+        else:
+            literal = char
+            i += 1
+
+        # A quantifier makes the preceding character optional or repeatable
+        if i < len(pattern) and pattern[i] in _QUANTIFIERS:
+            break
+        prefix.append(literal)
+
+    return ''.join(prefix).casefold()
+
+
+def _has_top_level_alternation(pattern):
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            i += 2
+            continue
+        if in_class:
+            if char == ']':
+                in_class = False
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+def normalize_for_prefilter(content):
+    """Casefold content so it contains every literal that re.IGNORECASE would match"""
+    folded = content.casefold()
+    # re.IGNORECASE treats dotless i as a case variant of 'i', casefold() does not
+    if not folded.isascii():
+        folded = folded.replace('ı', 'i')
+    return folded
+
+
+class CompiledPattern:
+    def __init__(self, group, pattern, regex):
+        self.group = group
+        self.pattern = pattern
+        self.regex = regex
+        self.literal = literal_prefix(pattern)
+
+
+class PatternEngine:
+    def __init__(self, keyword_groups):
+        self.patterns = []
+        self.literals = []
+
+        for keyword_group in keyword_groups or []:
+            group_name = keyword_group.get('name', 'Unknown')
+            for pattern in keyword_group.get('patterns', []):
+                try:
+                    regex = re.compile(pattern, FLAGS)
+                except re.error as e:
+                    print(f"Invalid regex pattern '{pattern}': {e}")
+                    continue
+                self.patterns.append(CompiledPattern(group_name, pattern, regex))
+
+        self.literals = sorted({p.literal for p in self.patterns if p.literal})
+        self.ruleset_hash = hashlib.sha256(
+            '\n'.join(f"{p.group}\0{p.pattern}" for p in self.patterns).encode()
+        ).hexdigest()
+
+    def present_literals(self, content):
+        """Return the set of prefilter literals that occur in content"""
+        if not self.literals:
+            return set()
+        folded = normalize_for_prefilter(content)
+        return {literal for literal in self.literals if literal in folded}
+
+    def finditer(self, content):
+        """Yield (CompiledPattern, re.Match) for every match, in config order"""
+        present = self.present_literals(content)
+        for compiled in self.patterns:
+            if compiled.literal and compiled.literal not in present:
+                continue
+            for match in compiled.regex.finditer(content):
+                yield compiled, match
+
+    def finditer_chunks(self, chunks, overlap=4096):
+        """
+        Yield (pattern index, CompiledPattern, re.Match, LineIndex) over an iterable of
+        text chunks. Match positions are relative to the LineIndex window, whose
+        base_offset gives the absolute offset. Matches longer than overlap may be
+        truncated; results come window by window, not in config order.
+        """
+        buffer = ''
+        offset = 0
+        base_line = 0
+        line_start = 0
+        scan_from = 0
+        resume = {}
+
+        chunks = iter(chunks)
+        final = False
+        while not final:
+            chunk = next(chunks, None)
+            if chunk is None:
+                final = True
+            else:
+                buffer += chunk
+
+            limit = len(buffer) if final else len(buffer) - overlap
+            if limit <= scan_from:
+                continue
+
+            line_index = None
+            present = self.present_literals(buffer)
+            for index, compiled in enumerate(self.patterns):
+                if compiled.literal and compiled.literal not in present:
+                    continue
+                position = max(scan_from, resume.get(index, 0) - offset)
+                for match in compiled.regex.finditer(buffer, position):
+                    if match.start() >= limit:
+                        break
+                    if line_index is None:
+                        line_index = LineIndex(buffer, offset, base_line, line_start, complete=final)
+                    resume[index] = offset + max(match.end(), match.start() + 1)
+                    yield index, compiled, match, line_index
+
+            # Keep `overlap` characters of context before the next scan position
+            drop = max(0, limit - overlap)
+            newline = buffer.rfind('\n', 0, drop)
+            if newline >= 0:
+                base_line += buffer.count('\n', 0, drop)
+                line_start = offset + newline + 1
+            offset += drop
+            buffer = buffer[drop:]
+            scan_from = limit - drop
+
+    def search(self, content, content_type, source_url, window=None):
+        """Finding dicts for every match in content, in config order"""
+        matches = []
+        line_index = None
+
+        for compiled, match in self.finditer(content):
+            if line_index is None:
+                line_index = LineIndex(content)
+            matches.append(finding(compiled, match, content_type, source_url, line_index.context(match.start(), window)))
+
+        return matches
+
+    def search_chunks(self, chunks, content_type, source_url, window=None, overlap=4096):
+        """Finding dicts for every match in an iterable of text chunks, with bounded memory"""
+        found = []
+
+        for index, compiled, match, line_index in self.finditer_chunks(chunks, overlap):
+            position = line_index.base_offset + match.start()
+            context = line_index.context(match.start(), window)
+            found.append((index, position, finding(compiled, match, content_type, source_url, context)))
+
+        # Report in the same order as search: config order, then position
+        found.sort(key=lambda item: item[:2])
+        return [match for _, _, match in found]
+
+
+def finding(compiled, match, content_type, source_url, line_context):
+    return {
+        'group': compiled.group,
+        'pattern': compiled.pattern,
+        'match': match.group(0),
+        'content_type': content_type,
+        'source_url': source_url,
+        'line_context': line_context,
+    }
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+
+"""
+Pipeline - Keyword hunting and AI webpage analysis from a single page load
+
+Runs keyword_hunter.py and webpage_analyzer.py over the same URLs while fetching
+(or rendering in headless Chrome) each page only once. A pool of page workers
+fetches each URL. Its page source is then handed to two independent stages that
+run concurrently: the keyword hunter (HTML and JS regex scan) on a thread pool,
+and the classifier (feature extraction and rate-limited async classification).
+Each tool keeps its own config, output format and Discord notifications, which are
+queued and sent in the background. Both tools record their stage timings in one
+set of metrics (--metrics), and --profile dumps a cProfile per page load.
+
+Usage:
+    python3 pipeline.py -f live.diff -w 4
+    cat live.diff | python3 pipeline.py -w 4 --hunter-config keyword_hunter/config.yaml --analyzer-config webpage_analyzer/config.yaml
+    python3 pipeline.py --daemon -w 4    # later runs are sent to this process
+    python3 pipeline.py -f live.diff -w 4 --metrics /var/lib/node_exporter/bb_pipeline.prom
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import os
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_DIR, 'keyword_hunter'))
+sys.path.insert(0, os.path.join(SCRIPT_DIR, 'webpage_analyzer'))
+
+from common import daemon
+from common.metrics import Metrics
+from keyword_hunter import KeywordHunter, read_urls
+from webpage_analyzer import WebpageAnalyzer
+
+
+class Pipeline:
+    def __init__(self, hunter_config, analyzer_config, use_cache=True, render_profile=None, use_store=True):
+        # Pages are rendered by the hunter, so its config (or render_profile) picks the profile
+        self.hunter = KeywordHunter(hunter_config, use_cache=use_cache, render_profile=render_profile, use_store=use_store)
+        self.analyzer = WebpageAnalyzer(analyzer_config, use_cache=use_cache, use_store=use_store)
+        self.analyzer.setup_ai_agent()
+        # One set of stage timings for both tools
+        self.metrics = self.hunter.metrics = self.analyzer.metrics = Metrics('pipeline')
+        self.pool = None
+        self.pool_workers = 0
+        self.hunt_pool = None
+        self.loop = None
+        self.hunts = []
+        self.classify = bool(self.analyzer.agent and self.analyzer.categories)
+
+    def start_pool(self, workers):
+        """Keep the page workers (and so their browsers) for every batch, as in daemon mode"""
+        self.pool = self.analyzer.pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        self.pool_workers = self.analyzer.pool_workers = workers
+
+    def fetch(self, url):
+        """Fetch url once for both tools, rendering it in the hunter's browsers when needed"""
+        try:
+            with self.metrics.stage('fetch'):
+                result = self.hunter.fetcher.fetch(url, self.hunter.render_page)
+            print(f"Fetched {url} via {result.tier} ({result.reason})")
+            self.metrics.count(f'fetched_{result.tier}')
+            self.metrics.add_bytes('pages', len(result.body))
+            return result
+        except Exception as e:
+            self.metrics.count('fetch_errors')
+            print(f"Error fetching {url}: {e}")
+            return None
+
+    def prepare_page(self, url):
+        """Page worker: fetch url, start its hunt and return its content for classification"""
+        with self.metrics.profile(url):
+            result = self.fetch(url)
+            if result is None:
+                return None
+
+            hunt = self.hunt_pool.submit(self.hunt, url, result)
+            self.hunts.append(asyncio.run_coroutine_threadsafe(self.report_hunt(url, hunt), self.loop))
+            if not self.classify:
+                return None
+            return self.analyzer.prepare_page(url, result)
+
+    def hunt(self, url, result):
+        with self.metrics.stage('hunt_page'):
+            matches = self.hunter.hunt_page(url, result)
+        self.metrics.count('matches', len(matches))
+        return self.hunter.new_findings(url, matches)
+
+    async def report_hunt(self, url, hunt):
+        # Reported on the event loop thread, like the analyzer's results, so that
+        # the two tools' result blocks do not interleave
+        try:
+            matches = await asyncio.wrap_future(hunt)
+        except Exception as e:
+            print(f"Error hunting {url}: {e}")
+            return
+        self.hunter.findings.extend(matches)
+        print(f"\n--- {url} ---")
+        self.hunter.output_findings(matches)
+        self.hunter.notify_discord(matches, url)
+
+    async def process(self, urls, workers):
+        self.loop = asyncio.get_running_loop()
+        self.hunts = []
+        self.hunt_pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        try:
+            scheduler = await self.analyzer.analyze_batch(urls, workers, prepare=self.prepare_page)
+            # Every page has been fetched by now, so the list of hunts is complete
+            await asyncio.gather(*(asyncio.wrap_future(hunt) for hunt in self.hunts))
+        finally:
+            self.hunt_pool.shutdown()
+        return scheduler
+
+    def run(self, urls, workers=1):
+        """Hunt and classify urls, fetching each page once"""
+        if self.pool:
+            workers = self.pool_workers
+        if not self.classify:
+            print("AI agent or categories not configured, only hunting keywords")
+        self.hunter.findings = []
+        self.analyzer.findings = []
+        self.analyzer.batch_stats.clear()
+
+        start = time.time()
+        scheduler = asyncio.run(self.process(urls, max(1, workers)))
+
+        elapsed = time.time() - start
+        rate = len(urls) / elapsed * 60 if elapsed > 0 else 0
+        self.hunter.print_stats()
+        if self.classify:
+            self.analyzer.print_stats(scheduler)
+        print(self.metrics.summary())
+        print(f"Processed {len(urls)} URLs in {elapsed:.1f}s ({rate:.1f} URLs/minute, {workers} workers)")
+
+    def run_job(self, job):
+        """Daemon handler: run a job submitted by a client, with metrics of its own"""
+        self.metrics.reset()
+        self.run(job['urls'])
+        if job.get('metrics'):
+            self.hunter.write_metrics(job['metrics'])
+        return 0
+
+    def cleanup(self):
+        if self.pool:
+            self.pool.shutdown()
+            self.pool = self.analyzer.pool = None
+        self.hunter.cleanup()
+        self.analyzer.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hunt keywords and classify web pages, loading each page once")
+    parser.add_argument('-u', '--url', help='URL to process')
+    parser.add_argument('-f', '--file', help='File with one URL per line')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='Number of concurrent page loads (browsers)')
+    parser.add_argument('--hunter-config', default='keyword_hunter/config.yaml', help='Keyword Hunter config file path')
+    parser.add_argument('--analyzer-config', default='webpage_analyzer/config.yaml', help='Webpage Analyzer config file path')
+    parser.add_argument('--no-cache', action='store_true', help='Do not use or update the JS and classification caches')
+    parser.add_argument('--all-findings', action='store_true', help='Report every finding, not only those missing from the findings store (nothing is recorded)')
+    parser.add_argument('--render-profile', choices=['full', 'light'], help='Chrome profile: full, or light (no images, fonts, media or trackers); default from the hunter config')
+    parser.add_argument('--metrics', metavar='FILE', help='Write stage timings, counters and byte totals at exit: JSON, or a Prometheus textfile if FILE ends in .prom')
+    parser.add_argument('--profile', metavar='DIR', help='Write a cProfile dump per page load to DIR (page loads then run one at a time; runs in this process)')
+    parser.add_argument('--daemon', action='store_true', help='Serve runs from other pipeline.py invocations, keeping browsers, patterns and the AI agent warm (-w browsers)')
+    parser.add_argument('--stop-daemon', action='store_true', help='Stop a running daemon after its queued jobs')
+    parser.add_argument('--no-daemon', action='store_true', help='Run in this process even if a daemon is listening')
+    parser.add_argument('--socket', help='Daemon socket path (default ~/.cache/bb-scripts/pipeline.sock)')
+
+    args = parser.parse_args()
+
+    # Relative config paths are relative to the script directory
+    if not os.path.isabs(args.hunter_config):
+        args.hunter_config = os.path.join(SCRIPT_DIR, args.hunter_config)
+    if not os.path.isabs(args.analyzer_config):
+        args.analyzer_config = os.path.join(SCRIPT_DIR, args.analyzer_config)
+    if args.metrics:
+        args.metrics = os.path.abspath(args.metrics)
+
+    socket_path = daemon.socket_path('pipeline', args.socket)
+    settings = {
+        'hunter_config': args.hunter_config,
+        'analyzer_config': args.analyzer_config,
+        'no_cache': args.no_cache,
+        'render_profile': args.render_profile,
+        'all_findings': args.all_findings,
+    }
+    if args.stop_daemon:
+        if not daemon.stop(socket_path):
+            print(f"No daemon listening on {socket_path}")
+        return
+    if args.daemon:
+        serve(args, socket_path, settings)
+        return
+
+    # Get URLs from argument, file or stdin
+    if args.url:
+        urls = read_urls([args.url])
+    elif args.file:
+        with open(args.file, 'r') as f:
+            urls = read_urls(f)
+    else:
+        urls = read_urls(sys.stdin)
+
+    if not urls:
+        print("Error: No URL provided. Use -u or -f parameter or pipe URLs to stdin.")
+        sys.exit(1)
+
+    # Hand the run to a daemon started with the same settings, if one is listening
+    if not args.no_daemon and not args.profile:
+        status = daemon.submit(socket_path, dict(settings, urls=urls, metrics=args.metrics))
+        if status is not None:
+            sys.exit(status)
+
+    pipeline = Pipeline(args.hunter_config, args.analyzer_config, use_cache=not args.no_cache, render_profile=args.render_profile, use_store=not args.all_findings)
+    if args.profile:
+        pipeline.metrics.enable_profiling(args.profile)
+
+    try:
+        pipeline.run(urls, workers=args.workers)
+    except KeyboardInterrupt:
+        print("\nInterrupted by user")
+    except Exception as e:
+        print(f"Error: {e}")
+    finally:
+        pipeline.cleanup()
+        if args.metrics:
+            pipeline.hunter.write_metrics(args.metrics)
+
+
+def serve(args, socket_path, settings):
+    """Run as a daemon: one hunter and analyzer, their browsers and AI agent serving every job"""
+    pipeline = Pipeline(args.hunter_config, args.analyzer_config, use_cache=not args.no_cache, render_profile=args.render_profile, use_store=not args.all_findings)
+    pipeline.start_pool(max(1, args.workers))
+    if args.profile:
+        pipeline.metrics.enable_profiling(args.profile)
+
+    def accepts(job):
+        if {key: job.get(key) for key in settings} != settings:
+            return f"it runs with {settings}"
+        return None
+
+    try:
+        daemon.JobServer(socket_path, pipeline.run_job, accepts).serve_forever()
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        pipeline.cleanup()
+
+
+if __name__ == '__main__':
+    main()
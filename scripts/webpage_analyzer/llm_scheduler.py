@@ -0,0 +1,104 @@
+"""
+LLM Scheduler - Rate-limit-aware async scheduling of model requests
+
+Runs `agent.run` calls for Webpage Analyzer's batch mode with at most `concurrency`
+requests in flight, paced by a token bucket. A 429 (or a 5xx / overloaded response)
+is retried with exponential backoff and jitter, honouring Retry-After when the
+error carries it, and pauses every other request for the same time so the whole
+batch slows down instead of each task hammering the API on its own.
+"""
+
+import asyncio
+import random
+import time
+from collections import Counter
+
+from common.rate_limit import AsyncTokenBucket
+
+RETRY_STATUS = {429, 500, 502, 503, 504, 529}
+
+
+def error_status(error):
+    """HTTP status of a model error (pydantic_ai's ModelHTTPError or a wrapped one), if any"""
+    while error is not None:
+        status = getattr(error, 'status_code', None)
+        if isinstance(status, int):
+            return status
+        error = error.__cause__
+    return None
+
+
+def retry_after(error):
+    """Seconds from a Retry-After header attached to a model error, if any"""
+    headers = getattr(error, 'headers', None) or {}
+    value = headers.get('retry-after') or headers.get('Retry-After')
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class LlmScheduler:
+    def __init__(self, concurrency=4, rate=1.0, burst=None, max_retries=5, base_delay=1.0, max_delay=60.0):
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.bucket = AsyncTokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.paused_until = 0.0
+        self.stats = Counter()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            concurrency=int(config.get('llm_concurrency', 4)),
+            rate=float(config.get('llm_rate', 1.0)),
+            burst=config.get('llm_burst'),
+            max_retries=int(config.get('llm_max_retries', 5)),
+        )
+
+    async def wait_for_pause(self):
+        while True:
+            remaining = self.paused_until - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining)
+
+    def backoff(self, attempt, error):
+        """Delay before retry number `attempt`, and pause the other requests for as long"""
+        delay = retry_after(error)
+        if delay is None:
+            delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+            delay = delay / 2 + random.uniform(0, delay / 2)
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        return delay
+
+    async def run(self, agent, prompt, **kwargs):
+        """agent.run(prompt) under the concurrency limit and rate limit, retrying rate-limited calls"""
+        attempt = 0
+        while True:
+            await self.wait_for_pause()
+            await self.bucket.acquire()
+            async with self.semaphore:
+                self.stats['requests'] += 1
+                try:
+                    return await agent.run(prompt, **kwargs)
+                except Exception as e:
+                    status = error_status(e)
+                    if status not in RETRY_STATUS or attempt >= self.max_retries:
+                        self.stats['failures'] += 1
+                        raise
+                    self.stats['rate_limited' if status == 429 else 'server_errors'] += 1
+                    delay = self.backoff(attempt, e)
+            attempt += 1
+            self.stats['retries'] += 1
+            await asyncio.sleep(delay)
+
+    def summary(self):
+        """One-line request statistics for this run"""
+        stats = self.stats
+        return (
+            f"LLM requests: {stats.get('requests', 0)} sent, {stats.get('retries', 0)} retried "
+            f"({stats.get('rate_limited', 0)} rate limited, {stats.get('server_errors', 0)} server errors), "
+            f"{stats.get('failures', 0)} failed"
+        )
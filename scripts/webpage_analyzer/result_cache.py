@@ -0,0 +1,175 @@
+"""
+Result Cache - Persistent classification cache for Webpage Analyzer
+
+Remembers each CategoryAnalysis under a hash of the page's normalized title and
+text plus a hash of the category config. Normalization lowercases the text and
+replaces hostnames/URLs, long random-looking tokens (CSRF tokens, session ids,
+asset hashes) and digits, so the same login portal, parking page or server default
+page served from many hosts hits the cache. Pages that still differ slightly are
+matched by a 64-bit SimHash of their word shingles within a small Hamming distance,
+found through four 16-bit band indexes.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    categories TEXT NOT NULL,
+    simhash INTEGER NOT NULL,
+    band0 INTEGER NOT NULL,
+    band1 INTEGER NOT NULL,
+    band2 INTEGER NOT NULL,
+    band3 INTEGER NOT NULL,
+    analysis TEXT NOT NULL,
+    url TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_band0 ON results (categories, band0);
+CREATE INDEX IF NOT EXISTS results_band1 ON results (categories, band1);
+CREATE INDEX IF NOT EXISTS results_band2 ON results (categories, band2);
+CREATE INDEX IF NOT EXISTS results_band3 ON results (categories, band3);
+"""
+
+URL_OR_HOST = re.compile(r'(?:[a-z][a-z0-9+.-]*://)?(?:[a-z0-9-]+\.)+[a-z]{2,}(?::\d+)?(?:/[^\s"\'<>]*)?')
+TOKEN = re.compile(r'\b(?=[\w-]*\d)(?=[\w-]*[a-z])[\w-]{16,}')
+DIGITS = re.compile(r'\d+')
+WHITESPACE = re.compile(r'\s+')
+
+BANDS = 4
+BAND_BITS = 64 // BANDS
+
+
+def normalize_content(content_data):
+    """Title and text with hosts, URLs, random tokens and numbers masked out"""
+    text = f"{content_data['title']}\n{content_data['content']}".lower()
+    text = URL_OR_HOST.sub(' host ', text)
+    text = TOKEN.sub(' token ', text)
+    text = DIGITS.sub('0', text)
+    return WHITESPACE.sub(' ', text).strip()
+
+
+def simhash(text, shingle=3):
+    """64-bit SimHash over word shingles"""
+    words = text.split()
+    features = Counter(
+        ' '.join(words[i:i + shingle]) for i in range(max(1, len(words) - shingle + 1))
+    )
+    weights = [0] * 64
+    for feature, count in features.items():
+        value = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            weights[bit] += count if value >> bit & 1 else -count
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def to_signed(value):
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def bands(value):
+    return [value >> (BAND_BITS * i) & ((1 << BAND_BITS) - 1) for i in range(BANDS)]
+
+
+class ResultCache:
+    def __init__(self, path, categories_key, max_distance=3):
+        self.path = os.path.expanduser(path)
+        self.categories_key = categories_key
+        # Any two hashes within BANDS - 1 bits share at least one band exactly
+        self.max_distance = min(max_distance, BANDS - 1)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.stats = Counter()
+
+    @classmethod
+    def from_config(cls, config, categories_key):
+        return cls(
+            config.get('classification_cache_file', '~/.cache/bb-scripts/classifications.sqlite'),
+            categories_key,
+            max_distance=int(config.get('simhash_max_distance', 3)),
+        )
+
+    def key(self, normalized):
+        return hashlib.sha256(f"{self.categories_key}\0{normalized}".encode()).hexdigest()
+
+    def content_key(self, content_data):
+        """Exact-match key of a page: pages with the same key get the same classification"""
+        return self.key(normalize_content(content_data))
+
+    def lookup(self, content_data):
+        """Return (analysis dict, url it was classified for, 'exact' or 'near'), or None"""
+        normalized = normalize_content(content_data)
+        with self.lock:
+            row = self.db.execute(
+                'SELECT analysis, url FROM results WHERE key = ?', (self.key(normalized),)
+            ).fetchone()
+            if row:
+                self.stats['exact'] += 1
+                return json.loads(row[0]), row[1], 'exact'
+
+            if self.max_distance > 0:
+                value = simhash(normalized)
+                candidates = self.db.execute(
+                    'SELECT simhash, analysis, url FROM results WHERE categories = ? AND '
+                    '(band0 = ? OR band1 = ? OR band2 = ? OR band3 = ?)',
+                    (self.categories_key, *bands(value)),
+                ).fetchall()
+                best = None
+                for signed, analysis, url in candidates:
+                    distance = bin((signed & ((1 << 64) - 1)) ^ value).count('1')
+                    if distance <= self.max_distance and (best is None or distance < best[0]):
+                        best = (distance, analysis, url)
+                if best:
+                    self.stats['near'] += 1
+                    return json.loads(best[1]), best[2], 'near'
+
+            self.stats['misses'] += 1
+        return None
+
+    def hit(self, kind='exact'):
+        """Count a page answered without a request of its own, e.g. a duplicate still in flight"""
+        with self.lock:
+            self.stats[kind] += 1
+
+    def store(self, content_data, analysis):
+        """Remember a successful analysis (a dict) for this page's normalized content"""
+        normalized = normalize_content(content_data)
+        value = simhash(normalized)
+        with self.lock:
+            self.db.execute(
+                'INSERT OR REPLACE INTO results '
+                '(key, categories, simhash, band0, band1, band2, band3, analysis, url, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    self.key(normalized), self.categories_key, to_signed(value), *bands(value),
+                    json.dumps(analysis), content_data['url'], time.time(),
+                ),
+            )
+            self.db.commit()
+
+    def summary(self):
+        """One-line hit rate and LLM calls saved this run"""
+        with self.lock:
+            stats = dict(self.stats)
+        hits = stats.get('exact', 0) + stats.get('near', 0)
+        total = hits + stats.get('misses', 0)
+        rate = hits / total * 100 if total else 0.0
+        return (
+            f"Classification cache: {stats.get('exact', 0)} exact hits, "
+            f"{stats.get('near', 0)} near-duplicate hits, {stats.get('misses', 0)} misses "
+            f"({rate:.0f}% hit rate, ~{hits} LLM calls saved)"
+        )
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -11,34 +11,53 @@ Features:
 - Dynamic content analysis with Selenium WebDriver
 - AI-powered categorization using AI via PydanticAI
 - Configurable category definitions and notification filters
-- Discord notifications via discord-notify library
+- Discord notifications coalesced per target through a durable outbox
+- Batch mode: concurrent extraction, rate-limited async classification, packing of short pages
+- Daemon mode that keeps browsers and the AI agent warm between runs
+- Findings store that only reports classifications not seen in earlier runs
+- Per-stage timings and counters (--metrics) and per-URL cProfile dumps (--profile)
 - Integration with reconnaissance pipelines
 
 Usage:
     python3 webpage_analyzer.py -u https://example.com -c config.yaml
     echo "https://example.com" | python3 webpage_analyzer.py
+    python3 webpage_analyzer.py -f urls.txt -w 4
+    python3 webpage_analyzer.py --daemon -w 4    # later runs are sent to this process
+    python3 webpage_analyzer.py -f urls.txt --metrics analyzer.json --profile profiles/
 """
 
 import argparse
+import asyncio
+import concurrent.futures
+import hashlib
 import os
 import sys
+import threading
 import time
+from collections import Counter
 from typing import Dict, List, Optional
 from urllib.parse import urljoin, urlparse
 
 import requests
 import yaml
-from bs4 import BeautifulSoup
-from discord_notify import Notifier
 from pydantic import BaseModel
-from pydantic_ai import Agent
-from pydantic_ai.models.google import GoogleModel
-from pydantic_ai.providers.google import GoogleProvider
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# PydanticAI and Selenium are imported where they are used, so that a run handed to a
+# daemon does not pay for them
+from common import daemon
+from common.browser import BrowserProfile
+from common.fetcher import TieredFetcher
+from common.findings_store import FindingsStore, target_of
+from common.metrics import Metrics
+from common.notify import Notifier
+from common.page_features import CHARS_PER_TOKEN, extract_features
+from common.settle import PageSettler
+from llm_scheduler import LlmScheduler
+from result_cache import ResultCache
+
+GEMINI_MODEL = "gemini-2.0-flash-lite"
 
 
 class CategoryAnalysis(BaseModel):
@@ -49,12 +68,62 @@ class CategoryAnalysis(BaseModel):
     summary: str
 
 
+class PageCategoryAnalysis(CategoryAnalysis):
+    """Result for one page of a packed request"""
+
+    url: str
+
+
+class PackedCategoryAnalysis(BaseModel):
+    """Result structure for several short pages analyzed in one request"""
+
+    pages: List[PageCategoryAnalysis]
+
+
 class WebpageAnalyzer:
-    def __init__(self, config_file="config.yaml"):
+    def __init__(
+        self, config_file="config.yaml", use_cache=True, render_profile=None, use_store=True
+    ):
         self.config = self.load_config(config_file)
-        self.driver = None
+        self.settler = PageSettler.from_config(self.config)
+        self.fetcher = TieredFetcher.from_config(self.config)
+        self.browser = BrowserProfile.from_config(self.config, render_profile)
+        self.token_budget = int(self.config.get("content_token_budget", 500))
+        self.drivers = []
+        self.local = threading.local()
         self.finding = None
+        self.findings = []
+        self.batch_stats = Counter()
+        self.metrics = Metrics("webpage_analyzer")
         self.agent = None
+        self.pool = None
+        self.pool_workers = 0
+
+        # The category part of the prompt is the same for every page
+        self.categories = self.config.get("categories", {})
+        self.category_definitions = "\n".join(
+            [
+                f"- {cat_id}: {cat_info['description']}"
+                for cat_id, cat_info in self.categories.items()
+            ]
+        )
+        self.available_categories = list(self.categories.keys())
+
+        # Cached classifications are only valid for the same model and category config
+        self.categories_key = hashlib.sha256(
+            f"{GEMINI_MODEL}\0{self.category_definitions}".encode()
+        ).hexdigest()[:16]
+        self.cache = (
+            ResultCache.from_config(self.config, self.categories_key)
+            if use_cache and self.config.get("classification_cache", True)
+            else None
+        )
+        self.notifier = Notifier.from_config(self.config, "🤖 **Webpage Analysis Result**")
+        self.store = (
+            FindingsStore.from_config(self.config)
+            if use_store and self.config.get("findings_store", True)
+            else None
+        )
 
     def load_config(self, config_file):
         try:
@@ -87,9 +156,13 @@ Provide confidence scores between 0.0 and 1.0 for each matching category. Only i
 Summarize the page purpose in 1-2 sentences."""
 
         try:
+            from pydantic_ai import Agent
+            from pydantic_ai.models.google import GoogleModel
+            from pydantic_ai.providers.google import GoogleProvider
+
             provider = GoogleProvider(api_key=api_key)
             self.agent = Agent(
-                model=GoogleModel("gemini-2.0-flash-lite", provider=provider),
+                model=GoogleModel(GEMINI_MODEL, provider=provider),
                 output_type=CategoryAnalysis,
                 system_prompt=PROMPT,
             )
@@ -99,110 +172,164 @@ Summarize the page purpose in 1-2 sentences."""
             print(f"Failed to initialize AI agent: {e}")
             return False
 
-    def setup_webdriver(self):
-        options = Options()
-        options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument(
-            "--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
+    def create_webdriver(self):
+        driver = self.browser.create_driver()
+        self.drivers.append(driver)
+        return driver
 
-        self.driver = webdriver.Chrome(options=options)
-        self.driver.set_page_load_timeout(30)
+    def get_thread_webdriver(self):
+        """Return the webdriver owned by the current thread, launching it on first use"""
+        driver = getattr(self.local, "driver", None)
+        if driver is None:
+            driver = self.create_webdriver()
+            self.local.driver = driver
+        return driver
 
-    def extract_content(self, url):
-        """Extract and clean webpage content for analysis"""
-        try:
-            # Load page with Selenium to handle dynamic content
-            self.driver.get(url)
+    def render_page(self, url):
+        """Load url in a browser and return the page source after JS execution"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        driver = self.get_thread_webdriver()
+
+        # Load page with Selenium to handle dynamic content
+        self.browser.start_page(driver)
+        with self.metrics.stage("render"):
+            driver.get(url)
 
             # Wait for page to load and execute JavaScript
-            WebDriverWait(self.driver, 10).until(
+            WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
 
-            # Wait a bit more for async content to load
-            time.sleep(3)
-
-            # Get final page source after JS execution
-            page_source = self.driver.page_source
-            soup = BeautifulSoup(page_source, "html.parser")
+        # Wait until async content has finished loading and the DOM is quiet
+        with self.metrics.stage("settle"):
+            settle_time = self.settler.wait(driver, url)
+        print(f"Page settled in {settle_time:.2f}s")
+        self.browser.finish_page(driver, url)
 
-            # Extract text content and metadata
-            title = soup.find("title").get_text() if soup.find("title") else ""
+        # Get final page source after JS execution
+        return driver.page_source
 
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
+    def extract_content(self, url, result=None):
+        """Extract and clean webpage content for analysis, fetching url unless result is given"""
+        with self.metrics.stage("extract_content"):
+            return self.fetch_and_extract(url, result)
 
-            # Get main text content
-            text_content = soup.get_text()
-
-            # Clean up text
-            lines = (line.strip() for line in text_content.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text_content = " ".join(chunk for chunk in chunks if chunk)
+    def fetch_and_extract(self, url, result=None):
+        try:
+            # Fetch statically, rendering with Selenium only when the page needs JS
+            if result is None:
+                with self.metrics.stage("fetch"):
+                    result = self.fetcher.fetch(url, self.render_page)
+                print(f"Fetched via {result.tier} ({result.reason})")
+                self.metrics.count(f"fetched_{result.tier}")
+                self.metrics.add_bytes("pages", len(result.body))
+
+            if result.is_html:
+                # Meta tags, headings, forms, links and text, by priority within the token budget
+                with self.metrics.stage("extract_features"):
+                    features = extract_features(result.body, self.token_budget)
+                title = features.title or ""
+                text_content = features.render(self.token_budget)
+                if not features.complete:
+                    print(
+                        f"Token budget filled after {features.scanned // 1024} of "
+                        f"{len(result.body) // 1024} KB"
+                    )
+            else:
+                # JSON, plain text and other non-HTML responses are analyzed as-is
+                title = ""
+                text_content = " ".join(result.body[: self.token_budget * CHARS_PER_TOKEN * 2].split())
+                text_content = text_content[: self.token_budget * CHARS_PER_TOKEN]
 
             return {
                 "title": title.strip(),
-                "content": text_content[:5000],  # Limit content for AI analysis
+                "content": text_content,
                 "url": url,
             }
 
         except Exception as e:
+            self.metrics.count("extract_errors")
             print(f"Error extracting content from {url}: {e}")
             return None
 
-    def analyze_content(self, content_data):
-        """Analyze webpage content using Google Gemini"""
-        if not self.agent:
-            print("AI agent not configured, skipping analysis")
-            return None
-
-        categories = self.config.get("categories", {})
-        if not categories:
-            print("No categories configured")
-            return None
-
-        # Prepare prompt with category definitions
-        category_definitions = "\n".join(
-            [
-                f"- {cat_id}: {cat_info['description']}"
-                for cat_id, cat_info in categories.items()
-            ]
-        )
-
-        available_categories = list(categories.keys())
-
-        input_prompt = f"""Analyze the following webpage and categorize it using ONLY these predefined categories:
+    def build_prompt(self, content_data):
+        """Classification prompt for a single page"""
+        return f"""Analyze the following webpage and categorize it using ONLY these predefined categories:
 
 AVAILABLE CATEGORIES:
-{category_definitions}
+{self.category_definitions}
 
 WEBPAGE DATA:
 Title: {content_data['title']}
 URL: {content_data['url']}
-Content: {content_data['content'][:3000]}
+Content:
+{content_data['content']}
 
-IMPORTANT: You must select the matched_category from this exact list: {available_categories}
+IMPORTANT: You must select the matched_category from this exact list: {self.available_categories}
 
 If none of the predefined categories fit well, choose the closest match from the available options.
 
 Return the results in the specified format with:
-- matched_category: Must be one of these exact category IDs: {available_categories}
+- matched_category: Must be one of these exact category IDs: {self.available_categories}
 - confidence_score: Confidence score (0.0-1.0) for the matched category
 - summary: Brief description of what this webpage appears to be (1-2 sentences)
 
 Choose only ONE category from the predefined list that best represents the primary purpose or nature of this webpage."""
 
+    def build_packed_prompt(self, pages):
+        """Classification prompt for several short pages in one request"""
+        webpages = "\n\n".join(
+            f"""WEBPAGE {index}:
+Title: {content_data['title']}
+URL: {content_data['url']}
+Content:
+{content_data['content']}"""
+            for index, content_data in enumerate(pages, 1)
+        )
+
+        return f"""Analyze each of the following {len(pages)} webpages separately and categorize each one using ONLY these predefined categories:
+
+AVAILABLE CATEGORIES:
+{self.category_definitions}
+
+{webpages}
+
+IMPORTANT: You must select each matched_category from this exact list: {self.available_categories}
+
+If none of the predefined categories fit well, choose the closest match from the available options.
+
+Return one entry in pages per webpage, in the same order, with:
+- url: The exact URL of the webpage
+- matched_category: Must be one of these exact category IDs: {self.available_categories}
+- confidence_score: Confidence score (0.0-1.0) for the matched category
+- summary: Brief description of what this webpage appears to be (1-2 sentences)
+
+Choose only ONE category per webpage from the predefined list that best represents its primary purpose or nature."""
+
+    def analyze_content(self, content_data):
+        """Analyze webpage content using Google Gemini"""
+        if not self.agent:
+            print("AI agent not configured, skipping analysis")
+            return None
+
+        if not self.categories:
+            print("No categories configured")
+            return None
+
+        input_prompt = self.build_prompt(content_data)
+        self.metrics.count("model_requests")
+        self.metrics.add_bytes("prompts", len(input_prompt))
+
         try:
-            result = self.agent.run_sync(input_prompt)
+            with self.metrics.stage("analyze_content"):
+                result = self.agent.run_sync(input_prompt)
             return result.output
 
         except Exception as e:
+            self.metrics.count("analysis_errors")
             print(f"Error during AI analysis: {e}")
             return CategoryAnalysis(
                 matched_category="",
@@ -210,28 +337,246 @@ Choose only ONE category from the predefined list that best represents the prima
                 summary=f"Analysis failed: {str(e)}",
             )
 
+    def cached_analysis(self, content_data):
+        """Classification of an identical or near-duplicate page from an earlier run, if any"""
+        if not self.cache:
+            return None
+        cached = self.cache.lookup(content_data)
+        if not cached:
+            return None
+        analysis, source_url, kind = cached
+        self.metrics.count("cached_classifications")
+        label = "near-duplicate of" if kind == "near" else "same content as"
+        print(f"Cached classification for {content_data['url']} ({label} {source_url})")
+        return CategoryAnalysis(**analysis)
+
+    def remember(self, content_data, analysis):
+        """Cache a successful classification; failures are retried next time"""
+        if self.cache and analysis.matched_category:
+            self.cache.store(content_data, analysis.model_dump())
+
     def analyze_url(self, url):
         """Main analysis function for a single URL"""
         print(f"Analyzing webpage: {url}")
+        self.metrics.count("urls")
+
+        with self.metrics.profile(url), self.metrics.stage("analyze_url"):
+            # Extract content
+            content_data = self.extract_content(url)
+            if not content_data:
+                return
+
+            if len(content_data["content"]) < 100:
+                print(f"Webpage content ({url}) does not contain enough data for analysis")
+                return
+
+            # Reuse the classification of a page with the same normalized content
+            analysis = self.cached_analysis(content_data)
+            if not analysis:
+                # Analyze with AI
+                analysis = self.analyze_content(content_data)
+                if analysis:
+                    self.remember(content_data, analysis)
+            if analysis:
+                finding = self.make_finding(content_data, analysis)
+                if self.is_new(finding):
+                    self.finding = finding
+
+    def make_finding(self, content_data, analysis):
+        return {
+            "url": content_data["url"],
+            "title": content_data["title"],
+            "analysis": analysis,
+            "timestamp": time.time(),
+        }
+
+    def is_new(self, finding):
+        """Record a classification, returning False if it was reported in an earlier run"""
+        if self.store and not self.store.record_classification(finding):
+            print(
+                f"Already reported: {finding['url']} ({finding['analysis'].matched_category})"
+            )
+            return False
+        return True
 
-        # Extract content
-        content_data = self.extract_content(url)
-        if not content_data:
-            return
+    async def classify(self, scheduler, content_data):
+        """Classify one page through the batch scheduler"""
+        prompt = self.build_prompt(content_data)
+        self.metrics.count("model_requests")
+        self.metrics.add_bytes("prompts", len(prompt))
+        try:
+            # Includes the time spent waiting for the scheduler's rate limit
+            with self.metrics.stage("classify"):
+                result = await scheduler.run(self.agent, prompt)
+            return result.output
 
-        if len(content_data["content"]) < 100:
+        except Exception as e:
+            self.metrics.count("analysis_errors")
+            print(f"Error during AI analysis of {content_data['url']}: {e}")
+            return CategoryAnalysis(
+                matched_category="",
+                confidence_score=0.0,
+                summary=f"Analysis failed: {str(e)}",
+            )
+
+    async def classify_pages(self, scheduler, pages):
+        """Classify pages in one packed request, falling back to one request per page"""
+        results = {}
+        if len(pages) > 1:
+            self.batch_stats["packed_requests"] += 1
+            self.batch_stats["packed_pages"] += len(pages)
+            prompt = self.build_packed_prompt(pages)
+            self.metrics.count("model_requests")
+            self.metrics.add_bytes("prompts", len(prompt))
+            try:
+                with self.metrics.stage("classify_packed"):
+                    result = await scheduler.run(
+                        self.agent, prompt, output_type=PackedCategoryAnalysis
+                    )
+                for page in result.output.pages:
+                    results.setdefault(
+                        page.url, CategoryAnalysis(**page.model_dump(exclude={"url"}))
+                    )
+            except Exception as e:
+                print(f"Error during packed AI analysis of {len(pages)} pages: {e}")
+
+        # Pages the packed answer left out (or got wrong) are classified on their own
+        missing = [page for page in pages if page["url"] not in results]
+        if len(pages) > 1 and missing:
+            self.batch_stats["unpacked_pages"] += len(missing)
+        analyses = await asyncio.gather(*(self.classify(scheduler, page) for page in missing))
+        results.update(zip((page["url"] for page in missing), analyses))
+        return [(page, results[page["url"]]) for page in pages]
+
+    async def report(self, content_data, analysis):
+        finding = self.make_finding(content_data, analysis)
+        if not self.is_new(finding):
+            return
+        self.findings.append(finding)
+        self.output_findings(finding)
+        self.notify_discord(finding)
+
+    async def classify_and_report(self, scheduler, pages, pending):
+        for content_data, analysis in await self.classify_pages(scheduler, pages):
+            self.remember(content_data, analysis)
+            # Pages with the same content extracted meanwhile wait on this result
+            key = content_data.get("cache_key")
+            if key in pending:
+                pending.pop(key).set_result(analysis)
+            await self.report(content_data, analysis)
+
+    async def report_duplicate(self, content_data, classification):
+        await self.report(content_data, await classification)
+
+    def prepare_page(self, url, result=None):
+        """Extract a page for batch classification, or None if there is nothing to analyze"""
+        print(f"Analyzing webpage: {url}")
+        self.metrics.count("urls")
+        with self.metrics.profile(url):
+            content_data = self.extract_content(url, result)
+        if content_data and len(content_data["content"]) < 100:
             print(f"Webpage content ({url}) does not contain enough data for analysis")
+            return None
+        return content_data
+
+    async def analyze_batch(self, urls, workers, prepare=None):
+        """
+        Extract pages on a thread pool and classify each one as soon as it is ready.
+        prepare(url) -> content_data replaces prepare_page, e.g. to reuse a page fetched
+        for another tool.
+        """
+        prepare = prepare or self.prepare_page
+        scheduler = LlmScheduler.from_config(self.config)
+        pack_max_pages = int(self.config.get("pack_max_pages", 1))
+        pack_short_chars = int(self.config.get("pack_short_chars", 1500))
+        loop = asyncio.get_running_loop()
+        tasks = []
+        pack = []
+        # Content keys of pages being classified, to futures for their analysis
+        pending = {}
+
+        executor = self.pool or concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        try:
+            extractions = [
+                loop.run_in_executor(executor, prepare, url) for url in urls
+            ]
+            for extraction in asyncio.as_completed(extractions):
+                content_data = await extraction
+                if not content_data:
+                    continue
+
+                if self.cache:
+                    key = self.cache.content_key(content_data)
+                    if key in pending:
+                        self.cache.hit()
+                        print(f"Same content as a page being classified: {content_data['url']}")
+                        tasks.append(asyncio.ensure_future(self.report_duplicate(content_data, pending[key])))
+                        continue
+                    analysis = self.cached_analysis(content_data)
+                    if analysis:
+                        tasks.append(asyncio.ensure_future(self.report(content_data, analysis)))
+                        continue
+                    content_data["cache_key"] = key
+                    pending[key] = loop.create_future()
+
+                # Short pages wait until there are enough to share one request
+                if pack_max_pages > 1 and len(content_data["content"]) < pack_short_chars:
+                    pack.append(content_data)
+                    if len(pack) < pack_max_pages:
+                        continue
+                    pages, pack = pack, []
+                else:
+                    pages = [content_data]
+                tasks.append(asyncio.ensure_future(self.classify_and_report(scheduler, pages, pending)))
+        finally:
+            if executor is not self.pool:
+                executor.shutdown()
+
+        if pack:
+            tasks.append(asyncio.ensure_future(self.classify_and_report(scheduler, pack, pending)))
+        await asyncio.gather(*tasks)
+        return scheduler
+
+    def start_pool(self, workers):
+        """Keep one pool of extraction threads (and so their browsers) for every batch"""
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        self.pool_workers = workers
+
+    def analyze_urls(self, urls, workers=1):
+        """Analyze many URLs: concurrent extraction, rate-limited async classification"""
+        if self.pool:
+            workers = self.pool_workers
+        if not self.agent:
+            print("AI agent not configured, skipping analysis")
+            return
+        if not self.categories:
+            print("No categories configured")
             return
 
-        # Analyze with AI
-        analysis = self.analyze_content(content_data)
-        if analysis:
-            self.finding = {
-                "url": url,
-                "title": content_data["title"],
-                "analysis": analysis,
-                "timestamp": time.time(),
-            }
+        start = time.time()
+        scheduler = asyncio.run(self.analyze_batch(urls, workers))
+
+        elapsed = time.time() - start
+        rate = len(urls) / elapsed * 60 if elapsed > 0 else 0
+        print(self.fetcher.summary())
+        print(self.settler.summary())
+        print(self.browser.summary())
+        self.print_stats(scheduler)
+        print(self.metrics.summary())
+        print(f"Analyzed {len(urls)} URLs in {elapsed:.1f}s ({rate:.1f} URLs/minute, {workers} workers)")
+
+    def print_stats(self, scheduler):
+        """Print classification request, packing and cache statistics for a batch"""
+        print(scheduler.summary())
+        print(
+            f"Packed {self.batch_stats['packed_pages']} short pages into "
+            f"{self.batch_stats['packed_requests']} requests "
+            f"({self.batch_stats['unpacked_pages']} retried on their own)"
+        )
+        if self.cache:
+            print(self.cache.summary())
+        if self.store:
+            print(self.store.summary())
 
     def should_notify(self, analysis):
         """Check if analysis results warrant notification"""
@@ -241,57 +586,112 @@ Choose only ONE category from the predefined list that best represents the prima
 
         return analysis.matched_category in notify_categories
 
-    def output_findings(self):
+    def output_findings(self, finding=None):
         """Output findings to STDOUT"""
-        if not self.finding:
+        finding = finding or self.finding
+        if not finding:
             print("No analysis results.")
             return
 
         print(f"\n=== WEBPAGE ANALYSIS RESULTS ===")
 
-        print(f"🌐 {self.finding['title']}")
-        print(f"   URL: {self.finding['url']}")
+        print(f"🌐 {finding['title']}")
+        print(f"   URL: {finding['url']}")
         print(
-            f"   Category: {self.finding['analysis'].matched_category} (confidence: {self.finding['analysis'].confidence_score:.2f})"
+            f"   Category: {finding['analysis'].matched_category} (confidence: {finding['analysis'].confidence_score:.2f})"
         )
-        print(f"   Summary: {self.finding['analysis'].summary}")
+        print(f"   Summary: {finding['analysis'].summary}")
         print()
 
-    def notify_discord(self):
-        """Send findings to Discord via discord_notify"""
-        if not self.finding:
+    def notify_discord(self, finding=None):
+        """Queue a finding for a Discord message with the other findings for the same target"""
+        finding = finding or self.finding
+        if not finding:
             return
 
         # Check if finding should be notified
-        if not self.should_notify(self.finding["analysis"]):
+        if not self.should_notify(finding["analysis"]):
             print("Finding does not match notification criteria")
             return
 
-        webhook_url = self.config.get("discord_webhook_url")
-        if not webhook_url or "YOUR_WEBHOOK_URL" in webhook_url:
+        if not self.notifier:
             print("Discord webhook not configured, skipping Discord notification")
             return
 
-        # Prepare Discord message
-        message = f"🤖 **Webpage Analysis Result** \n\n"
-        message += f"**{self.finding['title']}**\n"
-        message += f"• Category: {self.finding['analysis'].matched_category} (confidence: {self.finding['analysis'].confidence_score:.2f})\n"
-        message += f"• URL: {self.finding['url']}\n"
-        message += f"• Summary: {self.finding['analysis'].summary}\n\n"
+        # Prepare the finding's part of the Discord message
+        message = f"**{finding['title']}**\n"
+        message += f"• Category: {finding['analysis'].matched_category} (confidence: {finding['analysis'].confidence_score:.2f})\n"
+        message += f"• URL: {finding['url']}\n"
+        message += f"• Summary: {finding['analysis'].summary}"
 
-        try:
-            # Use discord-notify library
-            notifier = Notifier(webhook_url)
-            notifier.send(message, print_message=False)
-            print("Discord notification sent successfully")
+        self.notifier.queue(target_of(finding["url"]), message)
 
-        except Exception as e:
-            print(f"Error sending Discord notification: {e}")
+    def run(self, urls, workers=1):
+        """Analyze urls and report the results: one URL in this thread, several in batch mode"""
+        self.finding = None
+        self.findings = []
+        self.batch_stats = Counter()
+        if len(urls) == 1:
+            self.analyze_url(urls[0])
+            self.output_findings()
+            self.notify_discord()
+            if self.cache:
+                print(self.cache.summary())
+            if self.store:
+                print(self.store.summary())
+            print(self.metrics.summary())
+        else:
+            self.analyze_urls(urls, workers=max(1, workers))
+
+    def run_job(self, job):
+        """Daemon handler: run a job submitted by a client, with metrics of its own"""
+        self.metrics.reset()
+        self.run(job["urls"])
+        if job.get("metrics"):
+            self.write_metrics(job["metrics"])
+        return 0
+
+    def write_metrics(self, path):
+        try:
+            self.metrics.write(path)
+            print(f"Metrics written to {path}")
+        except OSError as e:
+            print(f"Error writing metrics to {path}: {e}")
 
     def cleanup(self):
-        """Cleanup webdriver"""
-        if self.driver:
-            self.driver.quit()
+        """Cleanup webdrivers and the classification cache"""
+        if self.pool:
+            self.pool.shutdown()
+        for driver in self.drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self.drivers = []
+        if self.cache:
+            self.cache.close()
+            self.cache = None
+        if self.store:
+            self.store.close()
+            self.store = None
+        if self.notifier:
+            # Whatever Discord does not accept in time stays in the outbox for the next run
+            self.notifier.close()
+            print(self.notifier.summary())
+            self.notifier = None
+
+
+def read_urls(lines):
+    """Normalize URLs from an iterable of lines, skipping blanks and comments"""
+    urls = []
+    for line in lines:
+        url = line.strip()
+        if not url or url.startswith("#"):
+            continue
+        if not url.startswith(("http://", "https://")):
+            url = "https://" + url
+        urls.append(url)
+    return urls
 
 
 def main():
@@ -299,9 +699,63 @@ def main():
         description="Analyze and categorize webpages using AI"
     )
     parser.add_argument("-u", "--url", help="URL to analyze")
+    parser.add_argument(
+        "-f", "--file", help="File with one URL per line to analyze in batch mode"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of concurrent page extractions (browsers) in batch mode",
+    )
     parser.add_argument(
         "-c", "--config", default="config.yaml", help="Config file path"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not use or update the classification cache",
+    )
+    parser.add_argument(
+        "--all-findings",
+        action="store_true",
+        help="Report every classification, not only those missing from the findings store (nothing is recorded)",
+    )
+    parser.add_argument(
+        "--render-profile",
+        choices=["full", "light"],
+        help="Chrome profile: full, or light (no images, fonts, media or trackers); default from config",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="Write stage timings, counters and byte totals at exit: JSON, or a Prometheus textfile if FILE ends in .prom",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        help="Write a cProfile dump per URL to DIR (page extractions then run one at a time; runs in this process)",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Serve runs from other webpage_analyzer.py invocations, keeping browsers and the AI agent warm (-w browsers)",
+    )
+    parser.add_argument(
+        "--stop-daemon",
+        action="store_true",
+        help="Stop a running daemon after its queued jobs",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Run in this process even if a daemon is listening",
+    )
+    parser.add_argument(
+        "--socket",
+        help="Daemon socket path (default ~/.cache/bb-scripts/webpage_analyzer.sock)",
+    )
 
     args = parser.parse_args()
 
@@ -309,29 +763,59 @@ def main():
     if not os.path.isabs(args.config):
         script_dir = os.path.dirname(os.path.abspath(__file__))
         args.config = os.path.join(script_dir, args.config)
-
-    # Get URL from argument or stdin
+    if args.metrics:
+        args.metrics = os.path.abspath(args.metrics)
+
+    socket_path = daemon.socket_path("webpage_analyzer", args.socket)
+    if args.stop_daemon:
+        if not daemon.stop(socket_path):
+            print(f"No daemon listening on {socket_path}")
+        return
+    if args.daemon:
+        serve(args, socket_path)
+        return
+
+    # Get URLs from argument, file or stdin
     if args.url:
-        url = args.url
+        urls = read_urls([args.url])
+    elif args.file:
+        with open(args.file, "r") as f:
+            urls = read_urls(f)
     else:
-        url = sys.stdin.read().strip()
+        urls = read_urls(sys.stdin)
 
-    if not url:
-        print("Error: No URL provided. Use -u parameter or pipe URL to stdin.")
+    if not urls:
+        print("Error: No URL provided. Use -u or -f parameter or pipe URLs to stdin.")
         sys.exit(1)
 
-    # Validate URL
-    if not url.startswith(("http://", "https://")):
-        url = "https://" + url
-
-    analyzer = WebpageAnalyzer(args.config)
+    # Hand the run to a daemon started with the same settings, if one is listening
+    if not args.no_daemon and not args.profile:
+        status = daemon.submit(
+            socket_path,
+            {
+                "urls": urls,
+                "config": args.config,
+                "no_cache": args.no_cache,
+                "render_profile": args.render_profile,
+                "all_findings": args.all_findings,
+                "metrics": args.metrics,
+            },
+        )
+        if status is not None:
+            sys.exit(status)
+
+    analyzer = WebpageAnalyzer(
+        args.config,
+        use_cache=not args.no_cache,
+        render_profile=args.render_profile,
+        use_store=not args.all_findings,
+    )
+    if args.profile:
+        analyzer.metrics.enable_profiling(args.profile)
 
     try:
         analyzer.setup_ai_agent()
-        analyzer.setup_webdriver()
-        analyzer.analyze_url(url)
-        analyzer.output_findings()
-        analyzer.notify_discord()
+        analyzer.run(urls, workers=args.workers)
 
     except KeyboardInterrupt:
         print("\nInterrupted by user")
@@ -339,6 +823,45 @@ def main():
         print(f"Error: {e}")
     finally:
         analyzer.cleanup()
+        if args.metrics:
+            analyzer.write_metrics(args.metrics)
+
+
+def serve(args, socket_path):
+    """Run as a daemon: one analyzer, its browsers and AI agent serving every submitted job"""
+    analyzer = WebpageAnalyzer(
+        args.config,
+        use_cache=not args.no_cache,
+        render_profile=args.render_profile,
+        use_store=not args.all_findings,
+    )
+    analyzer.setup_ai_agent()
+    analyzer.start_pool(max(1, args.workers))
+    if args.profile:
+        analyzer.metrics.enable_profiling(args.profile)
+
+    def accepts(job):
+        settings = (
+            job.get("config"),
+            job.get("no_cache"),
+            job.get("render_profile"),
+            job.get("all_findings"),
+        )
+        if settings != (args.config, args.no_cache, args.render_profile, args.all_findings):
+            return (
+                f"it runs with -c {args.config}{' --no-cache' if args.no_cache else ''}"
+                f"{' --all-findings' if args.all_findings else ''} "
+                f"--render-profile {analyzer.browser.profile}"
+            )
+        return None
+
+    try:
+        daemon.JobServer(socket_path, analyzer.run_job, accepts).serve_forever()
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        analyzer.cleanup()
 
 
 if __name__ == "__main__":